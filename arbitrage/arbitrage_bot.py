@@ -7,6 +7,9 @@ import os
 # --- CORRECTED IMPORTS based on your file structure ---
 # Assuming OrderBookManager is defined in data/order_book.py
 from data.order_book import OrderBookManager 
+from arbitrage.lifecycle import OpportunityTracker
+from arbitrage.sizing import basket_size, depth_arrays, max_profitable_size, notional_at
+from arbitrage.event_index import PRICE_UNITS, EventIndex
 
 # --- CONFIGURATION (Copied from your provided code) ---
 logger = logging.getLogger(__name__)
@@ -17,37 +20,141 @@ class ArbitrageBot:
     # Constants should be defined within the class or imported, using class attributes here
     FEE_POLYMARKET = 0.003
     FEE_LIMITLESS = 0.003
+    # Kalshi charges 0.07 * p * (1 - p) per contract, a rate of 0.07 * (1 - p) of the price (see _venue_fee)
+    KALSHI_FEE_COEFFICIENT = 0.07
     MIN_PROFIT_THRESHOLD = 0.005
     MIN_DOLLAR_PROFIT_THRESHOLD = 1.00
     MAX_VALID_PRICE = 1.00
     MIN_VALID_PRICE = 0.00
     MIN_SAFE_DENOMINATOR = 0.05 
+    INTERNAL_ARB_THRESHOLD = 1.003  # YES Bid + NO Bid must exceed this (0.3% threshold)
+    MIN_CROSS_VOLUME_SHARES = 10
+    # Short venue names used in opportunity types and descriptions
+    VENUE_LABELS = {"polymarket": "Poly", "limitless": "Limitless", "kalshi": "Kalshi"}
+    # Venues checked against Polymarket in the cross-platform checks
+    CROSS_VENUES = ("limitless", "kalshi")
+    # Scan engines: "python" (scalar per-market checks) or "numpy" (VectorizedScanner)
+    SCAN_ENGINES = ("python", "numpy")
     
-    def __init__(self, order_book_manager: OrderBookManager):
+    def __init__(self, order_book_manager: OrderBookManager, engine="python"):
         """
         Initializes the ArbitrageBot using dependency injection.
-        We only track two lists now: opportunities (current scan) and opp_log (historical).
+        We track the current scan in `opportunities`; every opportunity found is
+        also appended to the optional historical `opp_log` (an OpportunityLog).
+        
+        Args:
+            order_book_manager: The OrderBookManager providing the combined view.
+            engine: "python" for the scalar checks, "numpy" for the vectorized scanner.
         """
+        if engine not in self.SCAN_ENGINES:
+            raise ValueError(f"Unknown scan engine '{engine}', expected one of {self.SCAN_ENGINES}")
+        
         self.order_book_manager = order_book_manager
-        self.opportunities = [] # Opportunities found in the current scan (RESET EACH SCAN)
-        self.opp_log = []       # Historical log of completed opportunities
+        self.engine = engine
+        self.opportunities = [] # Current opportunities (full scans reset it; incremental scans replace changed markets)
+        self.opp_log = None     # Optional arbitrage.opportunity_log.OpportunityLog of every opportunity found
+        self.metrics = None     # Optional monitoring.BotMetrics (scan/end-to-end latency, scan duration)
+        self.lifecycle = OpportunityTracker()  # Open/close of every opportunity across scans (only transitions are logged)
+        self.last_checked = None  # Markets (and event keys) the last scan re-evaluated (None = every market)
+        
+        # negRisk events of the tracked markets, checked as baskets of all their outcomes
+        event_index = EventIndex(order_book_manager)
+        self.events = event_index if event_index.events else None
+        
+        self._scanner = None
+        if engine == "numpy":
+            # Imported lazily so NumPy is only needed when the vectorized engine is used
+            from arbitrage.vector_scanner import VectorizedScanner
+            self._scanner = VectorizedScanner(self)
     
-    def find_arbitrage_opportunities(self):
-        """Looks for internal and cross-platform arbitrage opportunities."""
+    def find_arbitrage_opportunities(self, market_slugs=None):
+        """
+        Looks for internal and cross-platform arbitrage opportunities.
         
-        # CLEAR the list of opportunities from the previous scan
-        self.opportunities = [] 
+        Args:
+            market_slugs: Optional iterable of markets whose books changed. Only
+                those markets are re-evaluated; opportunities of other markets
+                are kept from earlier scans. None re-checks every tracked market.
         
-        comparison = self.order_book_manager.compare_specific_markets() 
+        Every opportunity carries the latency trace of the book change that led
+        to it (see _stamp_latency) and its lifecycle (see arbitrage/lifecycle.py):
+        opportunities of the re-evaluated markets that were not found again are closed.
+        """
+        if market_slugs is not None and not isinstance(market_slugs, (set, frozenset)):
+            market_slugs = set(market_slugs)
+        started = time.perf_counter()
         
-        all_tracked_markets = self.order_book_manager.get_market_list()
-        common_markets = self.order_book_manager.get_common_market_slugs() 
-        has_common_markets = bool(common_markets)
+        # Only the events with a changed member are re-checked, unless every market is
+        event_keys = set()
+        if self.events is not None:
+            event_keys = self.events.update(market_slugs)
+            if market_slugs is None or self._scanner is not None:
+                event_keys = set(self.events.events)
         
-        if not has_common_markets:
-            logger.warning("No common market slugs available for cross-platform arbitrage checks.")
+        # The vectorized engine re-evaluates every market on each scan
+        checked = None
+        if market_slugs is not None and self._scanner is None:
+            checked = market_slugs | event_keys if event_keys else market_slugs
+        self.last_checked = checked
+        self.lifecycle.begin_scan(checked)
+        self._scan(market_slugs)
+        if event_keys:
+            self._scan_events(event_keys)
+        self.lifecycle.end_scan()
+        if self.metrics is not None:
+            mode = "full" if market_slugs is None else "incremental"
+            self.metrics.scan_seconds.labels(mode).observe(time.perf_counter() - started)
+    
+    def merge_scan(self, market_slugs, opportunities, seconds=None):
+        """
+        Takes over the results of a scan that ran elsewhere (a shard worker, see
+        arbitrage/parallel_scanner.py) as if this bot had run it: the current
+        opportunities of `market_slugs` are replaced by `opportunities`, which
+        go through the lifecycle, the metrics and the historical log.
+        
+        Args:
+            market_slugs: Set of the markets (and event keys) whose results changed.
+            opportunities: Their new, already stamped records.
+            seconds: Duration of the remote scan, for the metrics.
+        """
+        self.lifecycle.begin_scan(market_slugs)
+        self.opportunities = [opp for opp in self.opportunities if opp['slug'] not in market_slugs]
+        for opp_data in opportunities:
+            if self.metrics is not None:
+                self._observe_opp(opp_data, opp_data["kind"])
+            self._store_opp(opp_data)
+        self.lifecycle.end_scan()
+        if self.metrics is not None and seconds is not None:
+            self.metrics.scan_seconds.labels("shard").observe(seconds)
+    
+    def _scan(self, market_slugs):
+        if self._scanner is not None:
+            # Vectorized engine: refresh only the changed rows, then scan the whole universe
+            self._scanner.refresh(market_slugs)
+            self.opportunities = []
+            self._scanner.scan()
+            return
         
-        for market_slug in all_tracked_markets:
+        comparison = self.order_book_manager.compare_specific_markets() 
+        cross_slugs = self.order_book_manager.cross_slugs
+        cross_venues = [venue for venue in self.CROSS_VENUES if cross_slugs.get(venue)]
+        has_common_markets = bool(cross_venues)
+        
+        if market_slugs is None:
+            # Full scan: CLEAR the list of opportunities from the previous scan
+            self.opportunities = [] 
+            markets_to_check = self.order_book_manager.get_market_list()
+            
+            if not has_common_markets:
+                logger.warning("No common market slugs available for cross-platform arbitrage checks.")
+        else:
+            # Incremental scan: drop only the stale results of the changed markets
+            markets_to_check = market_slugs
+            if not markets_to_check:
+                return
+            self.opportunities = [opp for opp in self.opportunities if opp['slug'] not in markets_to_check]
+        
+        for market_slug in markets_to_check:
             market_data = comparison.get(market_slug)
             
             if not market_data:
@@ -57,15 +164,18 @@ class ArbitrageBot:
             question = market_info.get('question', market_slug)
 
             poly_data = market_data.get('polymarket')
-            limitless_data = market_data.get('limitless')
 
             # A. Internal Polymarket Arbitrage
             if poly_data:
                 self._check_internal_polymarket_arb(market_slug, question, poly_data)
 
-            # B. Cross-Platform Arbitrage
-            if has_common_markets and poly_data and limitless_data and market_slug in common_markets:
-                self._check_cross_platform_arb(market_slug, question, poly_data, limitless_data)
+            # B. Cross-Platform Arbitrage, against every venue listing the market
+            if not poly_data:
+                continue
+            for venue in cross_venues:
+                venue_data = market_data.get(venue)
+                if venue_data and market_slug in cross_slugs[venue]:
+                    self._check_cross_platform_arb(market_slug, question, poly_data, venue_data, venue)
         
         # Note: Since we removed the "Active Log", we no longer need check_expired.
 
@@ -86,157 +196,398 @@ class ArbitrageBot:
         best_yes_bid = yes_bids[0][0]
         best_no_bid = no_bids[0][0]
         
-        if best_yes_bid + best_no_bid > 1.003:  # 0.3% threshold
-            profit_percent = (best_yes_bid + best_no_bid - 1.00) * 100
-            
-            # Estimate volume and profit for internal arb
-            max_volume_shares = min(yes_bids[0][1], no_bids[0][1])
-            net_profit_per_share = best_yes_bid + best_no_bid - 1.00 - (1.00 * self.FEE_POLYMARKET * 2)
-            total_net_profit_usd = max_volume_shares * net_profit_per_share
-            
-            opp_data = {
-                "market": question,
-                "slug": slug,
-                "formula": "YES Bid + NO Bid > 1.00",
-                "type": "Internal Polymarket Arbitrage",
-                "profit": profit_percent,
-                "yes_bid": best_yes_bid,
-                "no_bid": best_no_bid,
-                "max_volume_shares": max_volume_shares,
-                "total_net_profit": total_net_profit_usd,
-                "details": f"Sell YES @ ${best_yes_bid:.4f} and Sell NO @ ${best_no_bid:.4f}"
-            }
-            
-            # Append ALL opportunities found to the list
-            if total_net_profit_usd >= self.MIN_DOLLAR_PROFIT_THRESHOLD:
-                self.opportunities.append(opp_data)
-                logger.info(f"🚨 ARB FOUND! {slug} | Type: {opp_data['type']} | Profit: {profit_percent:.4f}% | Net Profit: ${total_net_profit_usd:.2f}")
+        # Top of book decides whether there is an opportunity; depth decides its size
+        if best_yes_bid + best_no_bid > self.INTERNAL_ARB_THRESHOLD:  # 0.3% threshold
+            self._size_internal_opp(slug, question, yes_bids, no_bids)
 
-    def _check_cross_platform_arb(self, slug, question, poly_data, limitless_data):
+    def _check_cross_platform_arb(self, slug, question, poly_data, venue_data, venue="limitless"):
         """
-        Scans for arbitrage between Polymarket (Poly) and Limitless (Limitless).
+        Scans for arbitrage between Polymarket (Poly) and another venue (Limitless or Kalshi).
         """
-        
         # Get Order Book Data
-        best_poly_bid = poly_data['yes']['bids'][0][0] if poly_data['yes']['bids'] else 0
-        best_poly_ask = poly_data['yes']['asks'][0][0] if poly_data['yes']['asks'] else 1.0
-        poly_bid_size = poly_data['yes']['bids'][0][1] if poly_data['yes']['bids'] else 0
-        poly_ask_size = poly_data['yes']['asks'][0][1] if poly_data['yes']['asks'] else 0
-        
-        best_limitless_bid = limitless_data['yes']['bids'][0][0] if limitless_data['yes']['bids'] else 0
-        best_limitless_ask = limitless_data['yes']['asks'][0][0] if limitless_data['yes']['asks'] else 1.0
-        limitless_bid_size = limitless_data['yes']['bids'][0][1] if limitless_data['yes']['bids'] else 0
-        limitless_ask_size = limitless_data['yes']['asks'][0][1] if limitless_data['yes']['asks'] else 0
+        poly_bids, poly_asks = poly_data['yes']['bids'], poly_data['yes']['asks']
+        venue_bids, venue_asks = venue_data['yes']['bids'], venue_data['yes']['asks']
+        best_poly_bid = poly_bids[0][0] if poly_bids else 0
+        best_poly_ask = poly_asks[0][0] if poly_asks else 1.0
+        best_venue_bid = venue_bids[0][0] if venue_bids else 0
+        best_venue_ask = venue_asks[0][0] if venue_asks else 1.0
 
 
-        # ARB TYPE 1: Buy LOW on POLY, Sell HIGH on LIMITLESS (YES token)
-        if self.MIN_VALID_PRICE <= best_limitless_bid <= self.MAX_VALID_PRICE:
-            raw_spread = best_limitless_bid - best_poly_ask
-            fee_cost = (best_poly_ask * self.FEE_POLYMARKET) + (best_limitless_bid * self.FEE_LIMITLESS)
+        # ARB TYPE 1: Buy LOW on POLY, Sell HIGH on the VENUE (YES token)
+        if self.MIN_VALID_PRICE <= best_venue_bid <= self.MAX_VALID_PRICE:
+            raw_spread = best_venue_bid - best_poly_ask
+            fee_cost = (best_poly_ask * self.FEE_POLYMARKET) + (best_venue_bid * self._venue_fee(venue, best_venue_bid))
             net_profit_per_share = raw_spread - fee_cost
             
+            # The best first share is profitable: walk both books for the full size
             if net_profit_per_share > 0.0:
-                max_volume_shares = min(poly_ask_size, limitless_bid_size)
-                total_net_profit_usd = max_volume_shares * net_profit_per_share
-                
-                buy_price = best_poly_ask
-                safe_buy_price = buy_price if buy_price > 0.0001 else self.MIN_SAFE_DENOMINATOR
-                profit_percent = (net_profit_per_share / safe_buy_price) * 100
-                
-                if total_net_profit_usd >= self.MIN_DOLLAR_PROFIT_THRESHOLD and profit_percent >= self.MIN_PROFIT_THRESHOLD and max_volume_shares > 10:
-                    opp_data = {
-                        "market": question,
-                        "slug": slug,
-                        "type": "Cross-Platform (Poly -> Limitless) YES",
-                        "formula": f"Buy Poly@{best_poly_ask:.4f} / Sell Limitless@{best_limitless_bid:.4f}",
-                        "profit": profit_percent,
-                        "max_volume_shares": max_volume_shares,
-                        "total_net_profit": total_net_profit_usd,
-                        "details": f"Buy YES @ ${best_poly_ask:.4f} (Poly), Sell YES @ ${best_limitless_bid:.4f} (Limitless)"
-                    }
-                    # Append ALL opportunities found to the list
-                    self.opportunities.append(opp_data)
-                    logger.info(f"🚨 ARB FOUND! {slug} | Type: {opp_data['type']} | Profit: {profit_percent:.4f}% | Net Profit: ${total_net_profit_usd:.2f}")
-
-
-        # ARB TYPE 2: Buy LOW on LIMITLESS, Sell HIGH on POLY (YES token)
-        if self.MIN_VALID_PRICE <= best_limitless_ask <= self.MAX_VALID_PRICE:
-            raw_spread = best_poly_bid - best_limitless_ask
-            fee_cost = (best_limitless_ask * self.FEE_LIMITLESS) + (best_poly_bid * self.FEE_POLYMARKET)
+                self._size_cross_opp(slug, question, "polymarket", venue, poly_asks, venue_bids)
+
+
+        # ARB TYPE 2: Buy LOW on the VENUE, Sell HIGH on POLY (YES token)
+        if self.MIN_VALID_PRICE <= best_venue_ask <= self.MAX_VALID_PRICE:
+            raw_spread = best_poly_bid - best_venue_ask
+            fee_cost = (best_venue_ask * self._venue_fee(venue, best_venue_ask)) + (best_poly_bid * self.FEE_POLYMARKET)
             net_profit_per_share = raw_spread - fee_cost
 
             if net_profit_per_share > 0.0:
-                max_volume_shares = min(limitless_ask_size, poly_bid_size)
-                total_net_profit_usd = max_volume_shares * net_profit_per_share
-                
-                buy_price = best_limitless_ask
-                safe_buy_price = buy_price if buy_price > 0.0001 else self.MIN_SAFE_DENOMINATOR
-                profit_percent = (net_profit_per_share / safe_buy_price) * 100
-                
-                if total_net_profit_usd >= self.MIN_DOLLAR_PROFIT_THRESHOLD and profit_percent >= self.MIN_PROFIT_THRESHOLD and max_volume_shares > 10:
-                    opp_data = {
-                        "market": question,
-                        "slug": slug,
-                        "type": "Cross-Platform (Limitless -> Poly) YES",
-                        "formula": f"Buy Limitless@{best_limitless_ask:.4f} / Sell Poly@{best_poly_bid:.4f}",
-                        "profit": profit_percent,
-                        "max_volume_shares": max_volume_shares,
-                        "total_net_profit": total_net_profit_usd,
-                        "details": f"Buy YES @ ${best_limitless_ask:.4f} (Limitless), Sell YES @ ${best_poly_bid:.4f} (Poly)"
-                    }
-                    # Append ALL opportunities found to the list
-                    self.opportunities.append(opp_data)
-                    logger.info(f"🚨 ARB FOUND! {slug} | Type: {opp_data['type']} | Profit: {profit_percent:.4f}% | Net Profit: ${total_net_profit_usd:.2f}")
+                self._size_cross_opp(slug, question, venue, "polymarket", venue_asks, poly_bids)
+
+    def _scan_events(self, event_keys):
+        """
+        Checks the given negRisk events (see arbitrage/event_index.py), whose
+        best-quote sums are already current, for basket arbitrage:
+        selling YES on every outcome for more than 1 (at most one pays out), or
+        buying YES on every outcome of a complete event for less than 1
+        (exactly one pays out 1).
+        """
+        self.opportunities = [opp for opp in self.opportunities if opp['slug'] not in event_keys]
+        fee = self.FEE_POLYMARKET
+        events = self.events.events
+        
+        for key in event_keys:
+            basket = events[key]
+            
+            # A. Sell YES on every outcome that has a bid (a subset is enough: at most one of them pays out)
+            if basket.bid_count >= 2 and basket.bid_sum * (1.0 - fee) > PRICE_UNITS:
+                self._size_event_opp(basket, "sell")
+            
+            # B. Buy YES on every outcome (only if all of them are tracked and offered)
+            if basket.complete and basket.missing_asks == 0 and basket.ask_sum * (1.0 + fee) < PRICE_UNITS:
+                self._size_event_opp(basket, "buy")
+
+    # ----------------------------------------------------------------------
+    # DEPTH-AWARE SIZING (shared by every scan engine)
+    # ----------------------------------------------------------------------
+
+    def _size_internal_opp(self, slug, question, yes_bids, no_bids):
+        """
+        Sizes an internal opportunity across the full depth of both bid sides
+        (every share pair with YES + NO - 1 - fees > 0) and records it if it
+        clears the thresholds.
+        """
+        fee_cost = 1.00 * self.FEE_POLYMARKET * 2
+        max_volume_shares, yes_notional, no_notional = max_profitable_size(
+            yes_bids, no_bids, 1.0, 1.0, -(1.00 + fee_cost))
+        if max_volume_shares <= 0:
+            return None
+        
+        total_net_profit_usd = yes_notional + no_notional - max_volume_shares * (1.00 + fee_cost)
+        yes_vwap = yes_notional / max_volume_shares
+        no_vwap = no_notional / max_volume_shares
+        profit_percent = (yes_vwap + no_vwap - 1.00) * 100
+        
+        if total_net_profit_usd >= self.MIN_DOLLAR_PROFIT_THRESHOLD:
+            return self._record_internal_opp(slug, question, yes_bids[0][0], no_bids[0][0], profit_percent,
+                                             max_volume_shares, total_net_profit_usd, yes_vwap, no_vwap)
+        return None
+
+    def _size_cross_opp(self, slug, question, buy_venue, sell_venue, buy_asks, sell_bids):
+        """
+        Sizes a cross-platform opportunity by walking the buy venue's asks
+        against the sell venue's bids until the marginal spread after fees
+        turns negative, and records it if it clears the thresholds.
+        """
+        buy_levels, buy_weight = self._net_of_fees(buy_venue, buy_asks, buying=True)
+        sell_levels, sell_weight = self._net_of_fees(sell_venue, sell_bids, buying=False)
+        max_volume_shares, buy_net, sell_net = max_profitable_size(buy_levels, sell_levels, buy_weight, sell_weight)
+        if max_volume_shares <= 0:
+            return None
+        
+        total_net_profit_usd = sell_net * sell_weight + buy_net * buy_weight
+        buy_vwap = notional_at(depth_arrays(buy_asks), max_volume_shares) / max_volume_shares
+        sell_vwap = notional_at(depth_arrays(sell_bids), max_volume_shares) / max_volume_shares
+        safe_buy_price = buy_vwap if buy_vwap > 0.0001 else self.MIN_SAFE_DENOMINATOR
+        profit_percent = (total_net_profit_usd / max_volume_shares / safe_buy_price) * 100
+        
+        if total_net_profit_usd >= self.MIN_DOLLAR_PROFIT_THRESHOLD and profit_percent >= self.MIN_PROFIT_THRESHOLD and max_volume_shares > self.MIN_CROSS_VOLUME_SHARES:
+            return self._record_cross_opp(slug, question, buy_venue, sell_venue, buy_asks[0][0], sell_bids[0][0],
+                                          profit_percent, max_volume_shares, total_net_profit_usd, buy_vwap, sell_vwap)
+        return None
+
+    def _size_event_opp(self, basket, side):
+        """
+        Sizes an event basket (one YES share of each member per basket) across
+        the depth of every member's book and records it if it clears the thresholds.
+        """
+        fee = self.FEE_POLYMARKET
+        comparison = self.order_book_manager.compare_specific_markets()
+        if side == "sell":
+            members = [slug for slug in basket.members if self.events.has_bid(slug)]
+            sides = [comparison[slug]['polymarket']['yes']['bids'] for slug in members]
+            baskets, notional = basket_size(sides, 1.0 - fee, -1.0)
+            total_net_profit_usd = notional * (1.0 - fee) - baskets
+            cost = baskets
+            price_sum = basket.bid_sum / PRICE_UNITS
+        else:
+            members = list(basket.members)
+            sides = [comparison[slug]['polymarket']['yes']['asks'] for slug in members]
+            baskets, notional = basket_size(sides, -(1.0 + fee), 1.0)
+            total_net_profit_usd = baskets - notional * (1.0 + fee)
+            cost = notional * (1.0 + fee)
+            price_sum = basket.ask_sum / PRICE_UNITS
+        if baskets <= 0:
+            return None
+        
+        profit_percent = total_net_profit_usd / cost * 100
+        if total_net_profit_usd >= self.MIN_DOLLAR_PROFIT_THRESHOLD and profit_percent >= self.MIN_PROFIT_THRESHOLD:
+            return self._record_event_opp(basket, side, members, price_sum, notional / baskets, profit_percent,
+                                          baskets, total_net_profit_usd)
+        return None
+
+    def cross_gap(self, slug, venue="limitless"):
+        """
+        Returns how far a market's best cross-venue trade (YES, either
+        direction) is from breaking even after fees, per share: > 0 is the
+        price move still missing, <= 0 means it is profitable now. None if
+        either book is missing or one-sided. Used to prioritise REST polling.
+        """
+        market_data = self.order_book_manager.compare_specific_markets().get(slug) or {}
+        poly_data = market_data.get('polymarket')
+        venue_data = market_data.get(venue)
+        if not poly_data or not venue_data:
+            return None
+        
+        fee_poly = self.FEE_POLYMARKET
+        poly_bids, poly_asks = poly_data['yes']['bids'], poly_data['yes']['asks']
+        venue_bids, venue_asks = venue_data['yes']['bids'], venue_data['yes']['asks']
+        
+        gaps = []
+        if poly_asks and venue_bids:
+            buy_price, sell_price = poly_asks[0][0], venue_bids[0][0]
+            gaps.append(buy_price - sell_price + buy_price * fee_poly + sell_price * self._venue_fee(venue, sell_price))
+        if venue_asks and poly_bids:
+            buy_price, sell_price = venue_asks[0][0], poly_bids[0][0]
+            gaps.append(buy_price - sell_price + buy_price * self._venue_fee(venue, buy_price) + sell_price * fee_poly)
+        return min(gaps) if gaps else None
+
+    # ----------------------------------------------------------------------
+    # OPPORTUNITY RECORDS (shared by every scan engine)
+    # ----------------------------------------------------------------------
+
+    def _stamp_latency(self, opp_data, kind):
+        """
+        Adds detected_at and, if the market changed in the drain being scanned,
+        the trace of that change to an opportunity (monotonic seconds):
+        trigger_venue, received_at, changed_at and latency (received -> detected).
+        """
+        detected_at = time.monotonic()
+        opp_data["detected_at"] = detected_at
+        # Event baskets are traced through the member whose change triggered the check
+        trace = self.order_book_manager.get_trace(opp_data.get("trigger_slug") or opp_data["slug"])
+        if trace is not None:
+            venue, received_at, changed_at = trace
+            opp_data["trigger_venue"] = venue
+            opp_data["received_at"] = received_at
+            opp_data["changed_at"] = changed_at
+            opp_data["latency"] = detected_at - received_at
+        
+        if self.metrics is not None:
+            self._observe_opp(opp_data, kind)
+
+    def _observe_opp(self, opp_data, kind):
+        """Counts a stamped opportunity and its scan/end-to-end latency in the metrics."""
+        self.metrics.opportunities.labels(kind).inc()
+        if opp_data.get("received_at") is not None:
+            venue = opp_data["trigger_venue"]
+            self.metrics.observe_stage("scan", venue, opp_data["detected_at"] - opp_data["changed_at"])
+            self.metrics.observe_stage("end_to_end", venue, opp_data["detected_at"] - opp_data["received_at"])
+
+    def _venue_fee(self, venue, price):
+        """
+        Returns a venue's fee as a rate of the price paid or received, at that
+        price (a float, or a NumPy array for the vectorized engine): the flat
+        FEE_<VENUE> class attribute, or 0.07 * (1 - p) on Kalshi.
+        """
+        if venue == "kalshi":
+            return self.KALSHI_FEE_COEFFICIENT * (1.0 - price)
+        return getattr(self, f"FEE_{venue.upper()}")
+
+    def _net_of_fees(self, venue, levels, buying):
+        """
+        Returns (levels, weight) such that weight * price, summed over shares,
+        is the cash flow of one side of a trade after the venue's fee (see
+        max_profitable_size). Flat fees go into the weight, so the live levels
+        and their cached depth are used as is; Kalshi's price-dependent fee is
+        folded into a copy of the level prices (buying stays increasing and
+        selling decreasing in price, so the sizing walk still holds).
+        """
+        if venue == "kalshi":
+            k = self.KALSHI_FEE_COEFFICIENT
+            if buying:
+                return [(price * (1.0 + k * (1.0 - price)), size) for price, size in levels], -1.0
+            return [(price * (1.0 - k * (1.0 - price)), size) for price, size in levels], 1.0
+        fee = getattr(self, f"FEE_{venue.upper()}")
+        return levels, (-(1.0 + fee) if buying else 1.0 - fee)
+
+    def _store_opp(self, opp_data):
+        """Adds a new record to the current scan, its lifecycle (which logs openings) and the historical log."""
+        self.lifecycle.observe(opp_data)
+        self.opportunities.append(opp_data)
+        if self.opp_log is not None:
+            self.opp_log.record(opp_data)
+
+    def _record_internal_opp(self, slug, question, best_yes_bid, best_no_bid, profit_percent,
+                             max_volume_shares, total_net_profit_usd, yes_vwap=None, no_vwap=None):
+        """
+        Builds and stores an internal (YES Bid + NO Bid) opportunity record.
+        The VWAPs are the average fill prices over max_volume_shares (default: the best bids).
+        """
+        yes_vwap = best_yes_bid if yes_vwap is None else yes_vwap
+        no_vwap = best_no_bid if no_vwap is None else no_vwap
+        opp_data = {
+            "market": question,
+            "slug": slug,
+            "kind": "internal",
+            "direction": "",
+            "formula": "YES Bid + NO Bid > 1.00",
+            "type": "Internal Polymarket Arbitrage",
+            "profit": profit_percent,
+            "yes_bid": best_yes_bid,
+            "no_bid": best_no_bid,
+            "yes_vwap": yes_vwap,
+            "no_vwap": no_vwap,
+            "max_volume_shares": max_volume_shares,
+            "total_net_profit": total_net_profit_usd,
+            "details": f"Sell YES @ ${best_yes_bid:.4f} and Sell NO @ ${best_no_bid:.4f} (VWAP ${yes_vwap:.4f} / ${no_vwap:.4f})"
+        }
+        self._stamp_latency(opp_data, "internal")
+        self._store_opp(opp_data)
+        return opp_data
+
+    def _record_cross_opp(self, slug, question, buy_venue, sell_venue, buy_price, sell_price, profit_percent,
+                          max_volume_shares, total_net_profit_usd, buy_vwap=None, sell_vwap=None):
+        """
+        Builds and stores a cross-platform opportunity record (buy YES on one venue, sell on the other).
+        The VWAPs are the average fill prices over max_volume_shares (default: the best prices).
+        """
+        buy_vwap = buy_price if buy_vwap is None else buy_vwap
+        sell_vwap = sell_price if sell_vwap is None else sell_vwap
+        buy_label = self.VENUE_LABELS.get(buy_venue, buy_venue)
+        sell_label = self.VENUE_LABELS.get(sell_venue, sell_venue)
+        opp_data = {
+            "market": question,
+            "slug": slug,
+            "kind": "cross",
+            "direction": f"{buy_venue}->{sell_venue}",
+            "type": f"Cross-Platform ({buy_label} -> {sell_label}) YES",
+            "formula": f"Buy {buy_label}@{buy_price:.4f} / Sell {sell_label}@{sell_price:.4f}",
+            "profit": profit_percent,
+            "max_volume_shares": max_volume_shares,
+            "total_net_profit": total_net_profit_usd,
+            "buy_venue": buy_venue,
+            "sell_venue": sell_venue,
+            "buy_price": buy_price,
+            "sell_price": sell_price,
+            "buy_vwap": buy_vwap,
+            "sell_vwap": sell_vwap,
+            "details": f"Buy YES @ ${buy_price:.4f} ({buy_label}), Sell YES @ ${sell_price:.4f} ({sell_label}) "
+                       f"(VWAP ${buy_vwap:.4f} / ${sell_vwap:.4f})"
+        }
+        self._stamp_latency(opp_data, "cross")
+        self._store_opp(opp_data)
+        return opp_data
+
+    def _record_event_opp(self, basket, side, members, price_sum, vwap_sum, profit_percent,
+                          baskets, total_net_profit_usd):
+        """
+        Builds and stores a negRisk event basket record (buy or sell YES on every
+        listed member). price_sum is the sum of the members' best prices, vwap_sum
+        the average basket price over `baskets`.
+        """
+        action = "Buy" if side == "buy" else "Sell"
+        opp_data = {
+            "market": basket.title,
+            "slug": basket.key,
+            "kind": "event",
+            "direction": side,
+            "type": f"NegRisk Event Basket ({action} all YES)",
+            "formula": f"Sum of {len(members)} YES {'Asks' if side == 'buy' else 'Bids'} {'<' if side == 'buy' else '>'} 1.00",
+            "profit": profit_percent,
+            "event_id": basket.event_id,
+            "members": members,
+            "price_sum": price_sum,
+            "vwap_sum": vwap_sum,
+            "max_volume_shares": baskets,
+            "total_net_profit": total_net_profit_usd,
+            "trigger_slug": basket.last_changed,
+            "details": f"{action} YES on {len(members)} outcomes @ sum ${price_sum:.4f} (VWAP sum ${vwap_sum:.4f})"
+        }
+        self._stamp_latency(opp_data, "event")
+        self._store_opp(opp_data)
+        return opp_data
     
     # ----------------------------------------------------------------------
     # LOGGING AND CLEANUP METHODS 
     # ----------------------------------------------------------------------
 
-    def print_opportunities(self):
+    def format_opportunities(self, opportunities=None):
         """
-        Prints the current scan results, ranked by Absolute Profit. 
-        All opportunities found in the current scan are displayed.
+        Renders scan results, ranked by Absolute Profit, as a list of text lines.
+        Pure formatting, so it can run off the detection path (see display/).
+        
+        Args:
+            opportunities: The opportunities to render (default: the current scan).
         """
+        if opportunities is None:
+            opportunities = self.opportunities
         
         # 1. RANKING - Current Scan (Rank by Absolute Profit)
         # This list holds ALL valid opportunities found in the *current* scan.
         rankable_opportunities = [
-            opp for opp in self.opportunities if opp.get('total_net_profit') is not None
+            opp for opp in opportunities if opp.get('total_net_profit') is not None
         ]
         
         # Sort them all by profit
         rankable_opportunities.sort(key=lambda x: x['total_net_profit'], reverse=True)
 
+        if not rankable_opportunities:
+            return ["", f"[INFO] No current opportunities found above the ${self.MIN_DOLLAR_PROFIT_THRESHOLD:.2f} threshold."]
 
-        if rankable_opportunities:
-            print(f"\n==================================================")
-            print(f"🥇 CURRENT SCAN: RANKED BY ABSOLUTE PROFIT (Top {len(rankable_opportunities)})")
-            print(f"==================================================")
-            # Iterate and print every opportunity in the list
-            for i, opp in enumerate(rankable_opportunities):
-                print(f"--- RANK #{i+1} ---")
-                print(f"Market:  {opp['market']}")
-                print(f"Type:    {opp['type']}")
-                print(f"Profit:  {opp['profit']:.2f}%")
-                
-                total_profit = opp.get('total_net_profit', 0)
-                volume = opp.get('max_volume_shares', 0)
-                
-                print(f"Action:  {opp['details']}")
-                print(f"Volume:  ${volume:.0f} shares | **ABS PROFIT: ${total_profit:.2f}**")
-                print(f"--------------------------------------------------")
-        else:
-            print(f"\n[INFO] No current opportunities found above the ${self.MIN_DOLLAR_PROFIT_THRESHOLD:.2f} threshold.")
+        lines = [
+            "",
+            f"==================================================",
+            f"🥇 CURRENT SCAN: RANKED BY ABSOLUTE PROFIT (Top {len(rankable_opportunities)})",
+            f"==================================================",
+        ]
+        # One block per opportunity in the list
+        for i, opp in enumerate(rankable_opportunities):
+            total_profit = opp.get('total_net_profit', 0)
+            volume = opp.get('max_volume_shares', 0)
+            lines.append(f"--- RANK #{i+1} ---")
+            lines.append(f"Market:  {opp['market']}")
+            lines.append(f"Type:    {opp['type']}")
+            lines.append(f"Profit:  {opp['profit']:.2f}%")
+            lines.append(f"Action:  {opp['details']}")
+            lines.append(f"Volume:  ${volume:.0f} shares | **ABS PROFIT: ${total_profit:.2f}**")
+            if opp.get('opened_at') is not None:
+                lines.append(f"Open:    {time.monotonic() - opp['opened_at']:.1f}s | Peak ABS PROFIT: ${opp['peak_net_profit']:.2f}")
+            if opp.get('latency') is not None:
+                trigger = self.VENUE_LABELS.get(opp.get('trigger_venue'), opp.get('trigger_venue') or "?")
+                lines.append(f"Latency: {opp['latency'] * 1000:.1f}ms from {trigger} data to detection")
+            lines.append(f"--------------------------------------------------")
+        return lines
+
+    def print_opportunities(self):
+        """
+        Prints the current scan results, ranked by Absolute Profit. 
+        All opportunities found in the current scan are displayed.
+        The live bot renders through display.DisplaySink instead, off the detection path.
+        """
+        print("\n".join(self.format_opportunities()))
 
 
     def _write_log_to_csv(self):
-        """Simulates writing the historical log (opp_log) to a CSV file."""
-        if not self.opp_log:
+        """Flushes the historical log (opp_log) and exports all of it to a CSV file in logs/."""
+        if self.opp_log is None:
             return
 
-        filename = f"arbitrage_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        # In this environment, we simulate the CSV writing
-        logger.info(f"📝 Historical arbitrage log (Total {len(self.opp_log)} entries) would be written to logs/{filename}")
+        from arbitrage.opportunity_log import export_csv
+        self.opp_log.close()
+        filename = os.path.join("logs", f"arbitrage_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        os.makedirs("logs", exist_ok=True)
+        rows = export_csv(self.opp_log.directory, filename)
+        logger.info(f"📝 Historical arbitrage log (Total {rows} entries) written to {filename}")
 
 
 # ----------------------------------------------------------------------
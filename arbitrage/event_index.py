@@ -0,0 +1,137 @@
+# File: arbitrage/event_index.py
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Prices are summed as integer micro-dollars, so the running sums never drift
+PRICE_UNITS = 1_000_000
+EVENT_KEY_PREFIX = "event:"
+
+
+def _units(levels):
+    return round(levels[0][0] * PRICE_UNITS) if levels else None
+
+
+class EventBasket:
+    """
+    One negRisk event: mutually exclusive binary markets, exactly one of
+    which resolves YES. Keeps running sums of its members' best YES bids and
+    asks (and how many members have none), maintained by EventIndex.update.
+    """
+    __slots__ = ("key", "event_id", "title", "members", "complete",
+                 "bid_sum", "ask_sum", "missing_bids", "missing_asks", "last_changed")
+
+    def __init__(self, event_id, event_slug, title, members, complete):
+        self.key = f"{EVENT_KEY_PREFIX}{event_slug}"
+        self.event_id = event_id
+        self.title = title
+        self.members = members          # Market slugs
+        self.complete = complete        # Every outcome is tracked, so buying all of them pays exactly 1
+        self.bid_sum = 0                # PRICE_UNITS
+        self.ask_sum = 0
+        self.missing_bids = len(members)
+        self.missing_asks = len(members)
+        self.last_changed = None        # Member whose change last touched the sums
+
+    @property
+    def bid_count(self):
+        return len(self.members) - self.missing_bids
+
+
+class EventIndex:
+    """
+    Groups the tracked Polymarket markets into negRisk events (from the
+    event_id of their mapping entries, see gamma_fetch.complete_neg_risk_events)
+    and keeps every event's best-YES-bid and best-YES-ask sums current.
+
+    update() is called with the markets whose books changed; each one costs
+    O(1): its old best quotes are subtracted from its event's sums and the
+    new ones added. Only the events it touched need a look afterwards, so the
+    scan never re-adds the quotes of every event on each tick.
+    """
+    def __init__(self, order_book_manager, min_members=2):
+        """
+        Args:
+            order_book_manager: The OrderBookManager whose Polymarket mapping and books are used.
+            min_members: Events with fewer tracked markets than this are ignored.
+        """
+        self.order_book_manager = order_book_manager
+        self.events = {}        # { event key: EventBasket }
+        self.event_of = {}      # { market slug: EventBasket }
+        self._bid = {}          # { market slug: best YES bid in PRICE_UNITS or None }
+        self._ask = {}
+
+        groups = {}
+        for slug, entry in order_book_manager.poly_mapping.items():
+            if entry.get("event_id"):
+                groups.setdefault(entry["event_id"], []).append(slug)
+
+        for event_id, members in groups.items():
+            if len(members) < min_members:
+                continue
+            entry = order_book_manager.poly_mapping[members[0]]
+            complete = (all(order_book_manager.poly_mapping[slug].get("event_size") == len(members) for slug in members)
+                        and not entry.get("neg_risk_augmented"))
+            basket = EventBasket(event_id, entry.get("event_slug", event_id), entry.get("event_title", event_id),
+                                 members, complete)
+            self.events[basket.key] = basket
+            for slug in members:
+                self.event_of[slug] = basket
+                self._bid[slug] = self._ask[slug] = None
+
+        if self.events:
+            complete_count = sum(1 for basket in self.events.values() if basket.complete)
+            logger.info(f"Tracking {len(self.events)} negRisk events ({complete_count} complete) "
+                        f"over {len(self.event_of)} markets.")
+
+    def update(self, market_slugs=None):
+        """
+        Re-reads the best YES quotes of the given markets (all if None) and
+        adjusts their events' sums.
+
+        Returns:
+            Set[str]: Keys of the events that were touched.
+        """
+        comparison = self.order_book_manager.compare_specific_markets()
+        event_of = self.event_of
+        touched = set()
+        for slug in (event_of if market_slugs is None else market_slugs):
+            basket = event_of.get(slug)
+            if basket is None:
+                continue
+            poly_data = (comparison.get(slug) or {}).get('polymarket')
+            yes = poly_data['yes'] if poly_data else None
+            bid = _units(yes['bids']) if yes else None
+            ask = _units(yes['asks']) if yes else None
+
+            old = self._bid[slug]
+            if bid != old:
+                if old is None:
+                    basket.missing_bids -= 1
+                else:
+                    basket.bid_sum -= old
+                if bid is None:
+                    basket.missing_bids += 1
+                else:
+                    basket.bid_sum += bid
+                self._bid[slug] = bid
+
+            old = self._ask[slug]
+            if ask != old:
+                if old is None:
+                    basket.missing_asks -= 1
+                else:
+                    basket.ask_sum -= old
+                if ask is None:
+                    basket.missing_asks += 1
+                else:
+                    basket.ask_sum += ask
+                self._ask[slug] = ask
+
+            basket.last_changed = slug
+            touched.add(basket.key)
+        return touched
+
+    def has_bid(self, slug):
+        return self._bid.get(slug) is not None
@@ -0,0 +1,158 @@
+# File: arbitrage/lifecycle.py
+
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = 10_000     # Closed lifecycles kept in memory for the duration statistics
+
+
+def opportunity_key(opp):
+    """(slug, kind, direction): one lifecycle per market, check and trade direction."""
+    return (opp["slug"], opp["kind"], opp.get("direction", ""))
+
+
+class Lifecycle:
+    """One opportunity from the scan it first appeared in to the scan it disappeared in."""
+    __slots__ = ("key", "market", "type", "opened_at", "opened_wall", "last_seen", "closed_at",
+                 "updates", "profit", "net_profit", "peak_profit", "peak_net_profit")
+
+    def __init__(self, key, opp, now):
+        self.key = key
+        self.market = opp["market"]
+        self.type = opp["type"]
+        self.opened_at = now            # Monotonic seconds
+        self.opened_wall = time.time()
+        self.last_seen = now
+        self.closed_at = None
+        self.updates = 0                # Scans that saw it again after the opening one
+        self.profit = self.peak_profit = opp["profit"]
+        self.net_profit = self.peak_net_profit = opp["total_net_profit"]
+
+    @property
+    def duration(self):
+        """Seconds open: until it closed, or until it was last seen while still open."""
+        return (self.closed_at if self.closed_at is not None else self.last_seen) - self.opened_at
+
+
+class OpportunityTracker:
+    """
+    Live table of open opportunities, keyed by opportunity_key.
+
+    A scan is bracketed by begin_scan (with the markets it re-evaluates) and
+    end_scan. Every opportunity the scan records is passed to observe(),
+    which opens a lifecycle for a new key or updates the open one (O(1)
+    dict operations). end_scan closes the open lifecycles of the re-evaluated
+    markets that the scan did not see again. Only the transitions (open and
+    close) are logged; closed lifecycles are kept in a bounded history for
+    duration (half-life) statistics.
+    """
+    def __init__(self, history=DEFAULT_HISTORY):
+        self.open = {}                    # { key: Lifecycle }
+        self.closed = deque(maxlen=history)
+        self.opened_count = 0
+        self.closed_count = 0
+        self.metrics = None               # Optional monitoring.BotMetrics (open gauge, lifetime histogram)
+        self._by_slug = {}                # { slug: {key, ...} } of the open lifecycles
+        self._checked = None              # Markets of the running scan (None = every market)
+        self._seen = set()
+
+    # ----------------------------------------------------------------------
+    # SCAN EVENTS
+    # ----------------------------------------------------------------------
+
+    def begin_scan(self, market_slugs=None):
+        """Starts a scan of the given markets (a set; None = every market)."""
+        self._checked = market_slugs
+        self._seen = set()
+
+    def observe(self, opp):
+        """
+        Registers an opportunity recorded by the running scan and stamps it
+        with its lifecycle (opened_at, peak_net_profit).
+
+        Returns:
+            str: "open" for a new opportunity, "update" for one already open.
+        """
+        key = opportunity_key(opp)
+        now = opp.get("detected_at") or time.monotonic()
+        self._seen.add(key)
+        life = self.open.get(key)
+        if life is None:
+            life = self.open[key] = Lifecycle(key, opp, now)
+            self._by_slug.setdefault(key[0], set()).add(key)
+            self.opened_count += 1
+            event = "open"
+            logger.info(f"🚨 ARB OPENED! {key[0]} | Type: {life.type} | Profit: {life.profit:.4f}% | Net Profit: ${life.net_profit:.2f}")
+        else:
+            life.last_seen = now
+            life.updates += 1
+            life.profit = opp["profit"]
+            life.net_profit = opp["total_net_profit"]
+            if life.net_profit > life.peak_net_profit:
+                life.peak_net_profit = life.net_profit
+            if life.profit > life.peak_profit:
+                life.peak_profit = life.profit
+            event = "update"
+
+        opp["opened_at"] = life.opened_at
+        opp["peak_net_profit"] = life.peak_net_profit
+        return event
+
+    def end_scan(self):
+        """Closes the open lifecycles of the scanned markets that were not seen again."""
+        now = time.monotonic()
+        seen = self._seen
+        if self._checked is None:
+            stale = [key for key in self.open if key not in seen]
+        else:
+            stale = [key for slug in self._checked for key in self._by_slug.get(slug, ()) if key not in seen]
+        for key in stale:
+            self._close(key, now)
+        self._checked = None
+        self._seen = set()
+        if self.metrics is not None:
+            self.metrics.open_opportunities.labels().set(len(self.open))
+
+    def _close(self, key, now):
+        life = self.open.pop(key)
+        keys = self._by_slug[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._by_slug[key[0]]
+        life.closed_at = now
+        self.closed.append(life)
+        self.closed_count += 1
+        if self.metrics is not None:
+            self.metrics.observe_lifetime(key[1], life.duration)
+        logger.info(f"✅ ARB CLOSED {key[0]} | Type: {life.type} | Lasted {life.duration:.1f}s over {life.updates + 1} scans | "
+                    f"Peak: {life.peak_profit:.4f}% / ${life.peak_net_profit:.2f}")
+
+    # ----------------------------------------------------------------------
+    # STATISTICS
+    # ----------------------------------------------------------------------
+
+    def duration_stats(self, kind=None):
+        """
+        Lifetime statistics of the closed opportunities in the history.
+
+        Args:
+            kind: Only opportunities of this kind ("internal", "cross", "event"), or all if None.
+
+        Returns:
+            dict: count, mean, half_life (the median lifetime), p90 and max, in
+                seconds; None if nothing closed yet.
+        """
+        durations = sorted(life.duration for life in self.closed if kind is None or life.key[1] == kind)
+        if not durations:
+            return None
+        n = len(durations)
+        return {
+            "count": n,
+            "mean": sum(durations) / n,
+            "half_life": durations[n // 2] if n % 2 else (durations[n // 2 - 1] + durations[n // 2]) / 2,
+            "p90": durations[min(int(n * 0.9), n - 1)],
+            "max": durations[-1],
+        }
@@ -0,0 +1,238 @@
+# File: arbitrage/opportunity_log.py
+"""
+Persists every detected opportunity as compressed, columnar NumPy files.
+
+    python -m arbitrage.opportunity_log logs/opportunities export.csv   # CSV export
+"""
+
+import argparse
+import csv
+import glob
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# --- LOG SETTINGS ---
+DEFAULT_CAPACITY = 100_000       # Rows held in memory at most; the oldest are dropped beyond that
+DEFAULT_FLUSH_ROWS = 20_000      # Write a file once this many rows are waiting...
+DEFAULT_FLUSH_SECONDS = 60.0     # ...or after this long, whichever comes first
+FILE_PREFIX = "opportunities-"
+FILE_SUFFIX = ".npz"
+
+# Column name -> NumPy dtype of every file. Fields an opportunity does not
+# have are stored as "" or NaN (e.g. yes_bid/no_bid only exist on internal ones).
+COLUMNS = (
+    ("time", "f8"),                 # Wall clock time of detection (epoch seconds)
+    ("slug", "U"),
+    ("market", "U"),
+    ("type", "U"),
+    ("profit", "f8"),               # Percent
+    ("max_volume_shares", "f8"),
+    ("total_net_profit", "f8"),     # USD
+    ("buy_venue", "U"),
+    ("sell_venue", "U"),
+    ("buy_price", "f8"),
+    ("sell_price", "f8"),
+    ("yes_bid", "f8"),
+    ("no_bid", "f8"),
+    ("trigger_venue", "U"),
+    ("latency", "f8"),              # Seconds from the triggering frame/response to detection
+)
+_NAN = math.nan
+_FILE_SEQUENCE = itertools.count()
+
+
+class OpportunityLog:
+    """
+    Records opportunities into a bounded in-memory ring that a background
+    thread flushes in batches to rotating files (one compressed .npz of
+    column arrays per flush, see COLUMNS).
+
+    record() only appends a tuple to the ring, so it is cheap on the scan
+    path and safe from any thread. If the writer falls behind by more than
+    `capacity` rows, the oldest rows are dropped (counted in `dropped`)
+    instead of growing memory. A crash loses at most the rows of one flush
+    interval. Load the files with load_opportunities or export them with
+    export_csv.
+    """
+    def __init__(self, directory, capacity=DEFAULT_CAPACITY, flush_rows=DEFAULT_FLUSH_ROWS,
+                 flush_seconds=DEFAULT_FLUSH_SECONDS, max_files=None, max_bytes=None):
+        """
+        Args:
+            directory: Where the files are written (created if missing).
+            capacity: Max rows held in memory.
+            flush_rows: Rows that trigger a write before flush_seconds is up.
+            flush_seconds: Max time rows wait in memory.
+            max_files: Keep only the newest this many files in the directory (None = no limit).
+            max_bytes: Keep only the newest files that fit in this many bytes (None = no limit).
+                Both limits cover the files of earlier runs too; the newest file is always kept.
+        """
+        self.directory = directory
+        self.flush_rows = min(flush_rows, capacity)
+        self.flush_seconds = flush_seconds
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self.recorded = 0
+        self.written = 0
+        self._writing = 0      # Rows taken from the ring by the writer and not written yet
+        self._ring = deque(maxlen=capacity)
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = threading.Thread(target=self._write_forever, name="opportunity-log", daemon=True)
+        self._thread.start()
+        logger.info(f"Logging opportunities to {directory}")
+
+    @property
+    def dropped(self):
+        """Rows lost because the ring was full (or their file could not be written)."""
+        return self.recorded - self.written - self._writing - len(self._ring)
+
+    # ----------------------------------------------------------------------
+    # HOT PATH
+    # ----------------------------------------------------------------------
+
+    def record(self, opp):
+        """Queues one opportunity record (as built by ArbitrageBot)."""
+        get = opp.get
+        self._ring.append((
+            time.time(), opp["slug"], opp["market"], opp["type"], opp["profit"],
+            opp["max_volume_shares"], opp["total_net_profit"],
+            get("buy_venue", ""), get("sell_venue", ""), get("buy_price", _NAN), get("sell_price", _NAN),
+            get("yes_bid", _NAN), get("no_bid", _NAN), get("trigger_venue") or "", get("latency", _NAN),
+        ))
+        self.recorded += 1
+        if len(self._ring) >= self.flush_rows:
+            self._wake.set()
+
+    def close(self):
+        """Writes every queued row and stops the writer."""
+        if self._thread.is_alive():
+            self._closing = True
+            self._wake.set()
+            self._thread.join()
+
+    # ----------------------------------------------------------------------
+    # WRITER THREAD
+    # ----------------------------------------------------------------------
+
+    def _write_forever(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            closing = self._closing
+            try:
+                self._flush()
+            except Exception as e:
+                logger.error(f"Failed to write the opportunity log: {e}")
+            if closing:
+                return
+
+    def _flush(self):
+        ring = self._ring
+        rows = []
+        for _ in range(len(ring)):
+            rows.append(ring.popleft())
+            self._writing += 1
+        if not rows:
+            return
+        try:
+            self._write_file(rows)
+            self.written += len(rows)
+        finally:
+            self._writing = 0
+        self._prune()
+
+    def _write_file(self, rows):
+        columns = {name: np.array(values, dtype=dtype) for (name, dtype), values in zip(COLUMNS, zip(*rows))}
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        # Pid and a process-wide sequence number: logs started in the same second never share a file name
+        path = os.path.join(self.directory, f"{FILE_PREFIX}{stamp}-{os.getpid()}-{next(_FILE_SEQUENCE):05d}{FILE_SUFFIX}")
+        # Written under a temporary name, so readers never see a partial file
+        with open(path + ".tmp", "wb") as f:
+            np.savez_compressed(f, **columns)
+        os.replace(path + ".tmp", path)
+
+    def _prune(self):
+        """Removes the oldest files of the directory beyond max_files / max_bytes."""
+        if self.max_files is None and self.max_bytes is None:
+            return
+        files = list_files(self.directory)
+        sizes = {}
+        for path in files:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                sizes[path] = 0
+        total = sum(sizes.values())
+        while len(files) > 1 and ((self.max_files is not None and len(files) > self.max_files)
+                                  or (self.max_bytes is not None and total > self.max_bytes)):
+            old = files.pop(0)
+            total -= sizes[old]
+            try:
+                os.remove(old)
+            except OSError as e:
+                logger.warning(f"Could not remove old opportunity log {old}: {e}")
+
+
+# ----------------------------------------------------------------------
+# READING
+# ----------------------------------------------------------------------
+
+def list_files(directory):
+    """Returns a log's files in writing order."""
+    return sorted(glob.glob(os.path.join(directory, f"{FILE_PREFIX}*{FILE_SUFFIX}")))
+
+
+def load_opportunities(directory):
+    """
+    Loads every file of a log into one array per column (see COLUMNS), in
+    writing order.
+
+    Returns:
+        Dict[str, np.ndarray]: Column name -> values (empty arrays if no files).
+    """
+    parts = {name: [] for name, _ in COLUMNS}
+    for path in list_files(directory):
+        with np.load(path) as data:
+            for name in parts:
+                parts[name].append(data[name])
+    return {
+        name: np.concatenate(values) if values else np.array([], dtype=dtype)
+        for (name, dtype), values in zip(COLUMNS, parts.values())
+    }
+
+
+def export_csv(directory, path):
+    """Writes every row of a log to one CSV file. Returns the number of rows."""
+    columns = load_opportunities(directory)
+    names = list(columns)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(columns[name].tolist() for name in names)))
+    return len(columns["time"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Opportunity log directory")
+    parser.add_argument("csv_path", help="CSV file to write")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    rows = export_csv(args.directory, args.csv_path)
+    logger.info(f"Exported {rows} opportunities to {args.csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+# File: arbitrage/parallel_scanner.py
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import time
+import zlib
+
+from arbitrage.arbitrage_bot import ArbitrageBot
+from data.price_levels import PriceLevels
+
+logger = logging.getLogger(__name__)
+
+# --- SHARDING SETTINGS ---
+# Workers start from a fresh interpreter: the parent runs threads (display,
+# opportunity log, metrics) that a forked child would inherit in a random state
+DEFAULT_START_METHOD = "spawn"
+STOP_TIMEOUT = 5.0              # Seconds a worker gets to shut down cleanly before it is terminated
+QUEUE_POLL_INTERVAL = 0.1       # Seconds a blocking queue read waits before re-checking for shutdown
+STATS_REPORT_INTERVAL = 5.0     # Seconds between two Polymarket connection stats a worker sends the parent
+
+
+def shard_of(slug, entry, workers):
+    """
+    Worker index of a market. Members of a negRisk event share a worker (the
+    event basket check needs all of them), other markets go by slug. crc32
+    keeps the assignment stable across runs and processes.
+    """
+    key = entry.get("event_id") or slug
+    return zlib.crc32(str(key).encode("utf-8")) % workers
+
+
+def partition_mappings(poly_mapping, workers, *venue_mappings):
+    """
+    Splits the Polymarket mapping, and every venue mapping keyed by the same
+    slugs, into `workers` shards.
+
+    Returns:
+        List[Tuple[dict, ...]]: One (poly_mapping, *venue_mappings) tuple per shard.
+    """
+    shards = [tuple({} for _ in range(1 + len(venue_mappings))) for _ in range(workers)]
+    owner = {}
+    for slug, entry in poly_mapping.items():
+        owner[slug] = shard_of(slug, entry, workers)
+        shards[owner[slug]][0][slug] = entry
+    for k, mapping in enumerate(venue_mappings, start=1):
+        for slug, entry in mapping.items():
+            shard = owner.get(slug)
+            if shard is None:
+                shard = shard_of(slug, {}, workers)
+            shards[shard][k][slug] = entry
+    return shards
+
+
+class ShardBot(ArbitrageBot):
+    """
+    The ArbitrageBot of one shard, in a worker process. It scans like any bot
+    (and stamps its records with the worker's traces), but only collects the
+    records: lifecycles, the historical log and the metrics stay with the
+    parent's bot, which receives them through scan() reports, along with the
+    cross gaps its Limitless poll scheduler needs (see cross_gap).
+    """
+    def __init__(self, order_book_manager, engine="python"):
+        super().__init__(order_book_manager, engine=engine)
+        self._reported = set()  # Slugs whose opportunities the parent currently holds
+
+    def _store_opp(self, opp_data):
+        self.opportunities.append(opp_data)
+
+    def scan(self, market_slugs=None):
+        """
+        Runs one scan and returns what the parent needs to merge it
+        (ArbitrageBot.merge_scan), or None if nothing it holds changed.
+
+        Returns:
+            Tuple[set, list, float, dict] | None: (slugs whose results changed,
+                their new records, scan seconds, {slug: cross_gap} of the
+                scanned Limitless markets).
+        """
+        started = time.perf_counter()
+        self.find_arbitrage_opportunities(market_slugs)
+        seconds = time.perf_counter() - started
+
+        checked = self.last_checked
+        found = [opp for opp in self.opportunities if checked is None or opp['slug'] in checked]
+        found_slugs = {opp['slug'] for opp in found}
+        # Only markets that had or have opportunities matter to the parent
+        changed = (set(self._reported) if checked is None else self._reported & checked) | found_slugs
+        cross = self.order_book_manager.cross_slugs['limitless']
+        gaps = {slug: self.cross_gap(slug) for slug in (cross if checked is None else cross & set(checked))}
+        if not changed and not gaps:
+            return None
+        self._reported = (self._reported - changed) | found_slugs
+        return changed, found, seconds, gaps
+
+
+# ----------------------------------------------------------------------
+# PARENT SIDE
+# ----------------------------------------------------------------------
+
+class ShardedScanner:
+    """
+    Runs the detection of a universe on a pool of worker processes, one per
+    shard of the tracked markets (see partition_mappings), so it is not held
+    to one core by the GIL.
+
+    Each worker runs `target(shard_id, args, results, stop, inbox)`: it
+    ingests and keeps the books of its own markets and scans them with a
+    ShardBot (see run_live_shard), then puts (shard_id, changed slugs, records,
+    seconds, gaps, connection stats or None) reports on the shared results
+    queue. The parent only merges the reports into its own bot (collect() then
+    apply()), whose opportunities are the one ranked list shown and logged. Shards never share a market, so
+    their reports never overlap. `inbox` is the worker's own queue of venue
+    books relayed by the parent (see BookRelay).
+    """
+    def __init__(self, bot, shard_args, target=None, start_method=DEFAULT_START_METHOD):
+        """
+        Args:
+            bot: The parent's ArbitrageBot, which holds the merged opportunities.
+            shard_args: One picklable argument per worker, passed to target.
+            target: Worker entry point (default run_live_shard).
+            start_method: multiprocessing start method for the workers.
+        """
+        self.bot = bot
+        self.shard_args = shard_args
+        self.target = target or run_live_shard
+        self._context = multiprocessing.get_context(start_method)
+        self.results = self._context.Queue()
+        self.inboxes = [self._context.Queue() for _ in shard_args]
+        self.stop_event = self._context.Event()
+        self.processes = []
+        self.reports = 0
+        self.gaps = {}  # Latest cross gap of every Limitless market, as reported by its worker
+        self.shard_stats = {}  # { worker index: its Polymarket connection stats, as last reported }
+
+    @property
+    def workers(self):
+        return len(self.shard_args)
+
+    def start(self):
+        for shard_id, args in enumerate(self.shard_args):
+            process = self._context.Process(target=self.target, name=f"arb-shard-{shard_id}",
+                                            args=(shard_id, args, self.results, self.stop_event, self.inboxes[shard_id]),
+                                            daemon=True)
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Started {self.workers} scan worker processes.")
+        return self
+
+    def stop(self):
+        """Asks every worker to stop, then terminates the ones still running after STOP_TIMEOUT."""
+        self.stop_event.set()
+        deadline = time.monotonic() + STOP_TIMEOUT
+        # A worker only exits once the reports it queued are read: keep merging them meanwhile
+        while self.is_alive() and time.monotonic() < deadline:
+            self.apply(self.collect(timeout=QUEUE_POLL_INTERVAL))
+        for process in self.processes:
+            if process.is_alive():
+                logger.warning(f"Scan worker {process.name} did not stop in time, terminating it.")
+                process.terminate()
+            process.join()
+        self.apply(self.collect(timeout=0))
+        # Books relayed to a worker that is gone are dropped rather than waited on at exit
+        for inbox in self.inboxes:
+            inbox.cancel_join_thread()
+        self.processes = []
+
+    def is_alive(self):
+        return any(process.is_alive() for process in self.processes)
+
+    def collect(self, timeout=None):
+        """Waits up to `timeout` seconds for a report and returns every report waiting (blocking, run it off the loop)."""
+        reports = []
+        try:
+            reports.append(self.results.get(timeout=timeout))
+            while True:
+                reports.append(self.results.get_nowait())
+        except queue.Empty:
+            pass
+        return reports
+
+    def apply(self, reports):
+        """Merges worker reports into the parent's bot, in arrival order."""
+        for shard_id, changed, opportunities, seconds, gaps, stats in reports:
+            if changed:
+                self.bot.merge_scan(changed, opportunities, seconds)
+            self.gaps.update(gaps)
+            if stats is not None:
+                self.shard_stats[shard_id] = stats
+        self.reports += len(reports)
+
+    def get_shard_stats(self):
+        """
+        The workers' Polymarket connection counters (see PolymarketShard.stats),
+        as last reported, with "shard" labelled "<worker>.<connection>". Lets
+        the parent stand in for a PolymarketClient in BotMetrics.watch_clients.
+        """
+        return [dict(stats, shard=f"{shard_id}.{stats['shard']}")
+                for shard_id, worker_stats in sorted(list(self.shard_stats.items()))
+                for stats in worker_stats]
+
+
+class BookRelay:
+    """
+    Forwards the books of the parent's venue clients (one Limitless poller and
+    one Kalshi WebSocket for the whole universe) to the workers owning their
+    markets, so the workers do not each open their own connections and split
+    the rate limits. Installed as the clients' on_book_update listener.
+
+    Changes are coalesced per event loop iteration: a flush sends every
+    changed book once, as {outcome: {side: {price: size}}}, in one batch per
+    worker.
+    """
+    def __init__(self, inboxes, owners):
+        """
+        Args:
+            inboxes: The workers' queues (ShardedScanner.inboxes).
+            owners: { venue: { client key (slug / ticker): worker index } }.
+        """
+        self.inboxes = inboxes
+        self.owners = owners
+        self.clients = {}
+        self._pending = {}          # (venue, key) -> received_at of its first unsent change
+        self._loop = None
+        self._flush_scheduled = False
+
+    def attach(self, venue, client):
+        """Starts relaying a venue client's book changes (call on the event loop feeding it)."""
+        if client is None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self.clients[venue] = client
+        client.on_book_update = lambda key, received_at=None: self.on_book_update(venue, key, received_at)
+
+    def on_book_update(self, venue, key, received_at=None):
+        if key not in self.owners.get(venue, ()):
+            return
+        self._pending.setdefault((venue, key), time.monotonic() if received_at is None else received_at)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self.flush)
+
+    def publish_all(self):
+        """Sends every book the clients hold (e.g. once the workers started)."""
+        for venue, client in self.clients.items():
+            for key in list(client.order_books):
+                self._pending.setdefault((venue, key), time.monotonic())
+        self.flush()
+
+    def flush(self):
+        self._flush_scheduled = False
+        batches = {}
+        for (venue, key), received_at in self._pending.items():
+            book = self.clients[venue].order_books.get(key)
+            if book is None:
+                continue
+            sides = {outcome: {side: {price: size for price, size in levels} for side, levels in book_sides.items()}
+                     for outcome, book_sides in book.items()}
+            batches.setdefault(self.owners[venue][key], []).append((venue, key, sides, received_at))
+        self._pending.clear()
+        for shard, batch in batches.items():
+            self.inboxes[shard].put(batch)
+
+
+# ----------------------------------------------------------------------
+# WORKER SIDE
+# ----------------------------------------------------------------------
+
+class RelayedBooks:
+    """
+    Stands in for a venue client in a worker: holds the books the parent's
+    BookRelay sends (same shape and on_book_update listener as the Limitless
+    and Kalshi clients), updated in place on the worker's event loop.
+    """
+    is_polling = True  # Books are pushed by the parent, OrderBookManager never fetches them
+
+    def __init__(self):
+        self.order_books = {}
+        self.on_book_update = None
+
+    def get_book(self, key):
+        return self.order_books.get(key)
+
+    def apply(self, key, sides, received_at=None):
+        """Replaces a book's sides ({outcome: {side: {price: size}}}) and notifies the listener."""
+        book = self.order_books.get(key)
+        if book is None:
+            book = {
+                "yes": {"bids": PriceLevels(descending=True), "asks": PriceLevels(descending=False)},
+                "no": {"bids": PriceLevels(descending=True), "asks": PriceLevels(descending=False)},
+            }
+            self.order_books[key] = book
+        for outcome, outcome_sides in sides.items():
+            for side, sizes in outcome_sides.items():
+                book[outcome][side].replace_sizes(sizes)
+        if self.on_book_update is not None:
+            self.on_book_update(key, received_at)
+
+
+def run_live_shard(shard_id, config, results, stop, inbox):
+    """
+    Worker entry point of the live bot: connects to Polymarket for one shard's
+    markets (its own WebSocket connections), receives their Limitless and
+    Kalshi books from the parent through `inbox` (see BookRelay), and scans
+    them on every book change until `stop` is set.
+
+    Args:
+        config: dict with "mappings" (poly, limitless, kalshi), "engine",
+            "ws_shard_size" and "idle_timeout".
+    """
+    # The spawned interpreter re-ran the parent's logging setup: tag this worker's lines
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s - %(levelname)s - [worker {shard_id}] %(message)s",
+                        force=True)
+    try:
+        asyncio.run(_live_shard(shard_id, config, results, stop, inbox))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _live_shard(shard_id, config, results, stop, inbox):
+    # Imported here, so only the workers of the live bot need the venue clients
+    from data.order_book import OrderBookManager
+    from polymarket import PolymarketClient
+
+    poly_mapping, limitless_mapping, kalshi_mapping = config["mappings"]
+    polymarket_client = PolymarketClient(token_ids=poly_mapping, shard_size=config["ws_shard_size"])
+    polymarket_client.start()
+    if not await polymarket_client.wait_for_initial_data(timeout=60):
+        logger.error("🚨 Failed to receive initial Polymarket data, stopping this shard.")
+        await polymarket_client.stop()
+        return
+
+    relayed = {"limitless": RelayedBooks(), "kalshi": RelayedBooks()}
+    manager = OrderBookManager(polymarket_client, relayed["limitless"], poly_mapping, limitless_mapping,
+                               kalshi_client=relayed["kalshi"] if kalshi_mapping else None,
+                               kalshi_mapping=kalshi_mapping)
+    bot = ShardBot(manager, engine=config.get("engine", "python"))
+    receiver = asyncio.create_task(_receive_books(inbox, relayed, stop))
+
+    try:
+        manager.update_order_books()
+        _report(results, shard_id, bot.scan())
+        manager.drain_dirty()
+        logger.info(f"Scanning {len(poly_mapping)} markets ({len(limitless_mapping)} Limitless, {len(kalshi_mapping)} Kalshi).")
+
+        next_stats = 0.0
+        while not stop.is_set():
+            dirty = await manager.wait_for_changes(timeout=config["idle_timeout"])
+            stats = None
+            if time.monotonic() >= next_stats:
+                stats = polymarket_client.get_shard_stats()
+                next_stats = time.monotonic() + STATS_REPORT_INTERVAL
+            _report(results, shard_id, bot.scan(dirty) if dirty else None, stats)
+    finally:
+        receiver.cancel()
+        await polymarket_client.stop()
+
+
+async def _receive_books(inbox, relayed, stop):
+    """Applies the parent's book batches on this loop, so books never change under a scan."""
+    while not stop.is_set():
+        try:
+            batch = await asyncio.to_thread(inbox.get, True, QUEUE_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        for venue, key, sides, received_at in batch:
+            relayed[venue].apply(key, sides, received_at)
+
+
+def _report(results, shard_id, report, stats=None):
+    """Sends a scan report and/or connection stats to the parent (nothing if both are None)."""
+    if report is None and stats is None:
+        return
+    changed, opportunities, seconds, gaps = report or (set(), [], 0.0, {})
+    results.put((shard_id, changed, opportunities, seconds, gaps, stats))
@@ -0,0 +1,126 @@
+# File: arbitrage/sizing.py
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from operator import mul
+
+_EMPTY = ([], [], [])
+
+
+def depth_arrays(levels):
+    """
+    Best-first (prices, cumulative sizes, cumulative notionals) of one book
+    side: cached on a PriceLevels, built on the fly for any other sequence of
+    (price, size) levels (e.g. a plain list).
+    """
+    cumulative = getattr(levels, "cumulative", None)
+    if cumulative is not None:
+        return cumulative()
+    if not levels:
+        return _EMPTY
+    prices = [price for price, _ in levels]
+    sizes = [size for _, size in levels]
+    return prices, list(accumulate(sizes)), list(accumulate(map(mul, prices, sizes)))
+
+
+def notional_at(depth, size):
+    """Sum of price * size over the first `size` shares of a side (size <= its total)."""
+    prices, cum_sizes, cum_notional = depth
+    i = min(bisect_left(cum_sizes, size), len(cum_sizes) - 1)
+    if i == 0:
+        return size * prices[0]
+    return cum_notional[i - 1] + (size - cum_sizes[i - 1]) * prices[i]
+
+
+def max_profitable_size(levels_a, levels_b, weight_a, weight_b, edge=0.0):
+    """
+    Walks two book sides together, one share of each per unit of size, and
+    returns the largest size whose every share is still profitable.
+
+    The q-th share earns weight_a * price_a(q) + weight_b * price_b(q) + edge,
+    where price_x(q) is the price of the level holding share q of that side.
+    The weights must make this non-increasing in q (e.g. buying up an ask side
+    with a negative weight, selling into a bid side with a positive one), so
+    the profitable shares are a prefix and its end is found by binary search
+    over the levels (O(log^2 n) on the cached prefix sums) instead of a
+    level-by-level loop.
+
+    Args:
+        levels_a, levels_b: Best-first book sides (PriceLevels or (price, size) sequences).
+        weight_a, weight_b: Per-share weight of each side's price.
+        edge: Constant per-share term (e.g. a payout or a fee).
+
+    Returns:
+        Tuple[float, float, float]: (size, notional of side a, notional of side b)
+            over that size; all zeros if not even the first share is profitable.
+    """
+    depth_a, depth_b = depth_arrays(levels_a), depth_arrays(levels_b)
+    prices_a, cum_a, _ = depth_a
+    prices_b, cum_b, _ = depth_b
+    if not prices_a or not prices_b:
+        return 0.0, 0.0, 0.0
+    n_b = len(prices_b)
+
+    # 1. Number of side-a levels whose first share is profitable
+    lo, hi = 0, len(prices_a)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        j = bisect_right(cum_b, cum_a[mid - 1] if mid else 0.0)
+        if j < n_b and weight_a * prices_a[mid] + weight_b * prices_b[j] + edge > 0:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo == 0:
+        return 0.0, 0.0, 0.0
+
+    # 2. Within the last of them, the last side-b level that is still profitable
+    i = lo - 1
+    first = bisect_right(cum_b, cum_a[i - 1] if i else 0.0)
+    lo, hi = first + 1, min(bisect_left(cum_b, cum_a[i]), n_b - 1) + 1
+    price_a = weight_a * prices_a[i] + edge
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if price_a + weight_b * prices_b[mid] > 0:
+            lo = mid + 1
+        else:
+            hi = mid
+    size = min(cum_a[i], cum_b[lo - 1])
+    return size, notional_at(depth_a, size), notional_at(depth_b, size)
+
+
+def basket_size(sides, weight, edge):
+    """
+    Walks several book sides together, one share of each per basket, and
+    returns the largest number of baskets whose every basket is still
+    profitable: the q-th basket earns weight * sum(price_i(q)) + edge, which
+    must be non-increasing in q (see max_profitable_size). The walk visits
+    each level boundary once, so it is meant for the few events that already
+    passed a top-of-book check.
+
+    Returns:
+        Tuple[float, float]: (baskets, total notional of all legs over them);
+            zeros if not even the first basket is profitable or a side is empty.
+    """
+    depths = [depth_arrays(side) for side in sides]
+    if not depths or not all(prices for prices, _, _ in depths):
+        return 0.0, 0.0
+
+    positions = [0] * len(depths)
+    size = notional = 0.0
+    while True:
+        price_sum = sum(prices[i] for (prices, _, _), i in zip(depths, positions))
+        if weight * price_sum + edge <= 0:
+            break
+        # Up to the nearest level boundary every leg's price stays the same
+        boundary = min(cum_sizes[i] for (_, cum_sizes, _), i in zip(depths, positions))
+        notional += (boundary - size) * price_sum
+        size = boundary
+        exhausted = False
+        for k, (prices, cum_sizes, _) in enumerate(depths):
+            if cum_sizes[positions[k]] <= boundary:
+                positions[k] += 1
+                if positions[k] == len(prices):
+                    exhausted = True
+        if exhausted:
+            break
+    return size, notional
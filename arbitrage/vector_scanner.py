@@ -0,0 +1,164 @@
+# File: arbitrage/vector_scanner.py
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorizedScanner:
+    """
+    A NumPy scan engine for ArbitrageBot.
+
+    Top-of-book prices and sizes for every tracked market and venue live in
+    contiguous float64 arrays (one row per market). A scan evaluates the
+    internal YES+NO condition and both cross-venue directions, including fees,
+    size caps and thresholds, for the whole universe in a handful of array
+    operations. The arrays act as a prefilter: only rows whose best first
+    share is profitable are sized across full book depth and turned into
+    opportunity records, through the bot's own sizing and record builders, so
+    output matches the scalar checks.
+
+    Empty sides use the same defaults as the scalar checks: a missing bid is
+    0.0, a missing ask is 1.0 and a missing size is 0.0.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.order_book_manager = bot.order_book_manager
+        self.slugs = self.order_book_manager.get_market_list()
+        self.index = {slug: i for i, slug in enumerate(self.slugs)}
+        n = len(self.slugs)
+
+        # --- Polymarket (internal + the Poly leg of every cross check) ---
+        self.poly_present = np.zeros(n, dtype=bool)
+        self.has_yes_bid = np.zeros(n, dtype=bool)
+        self.has_no_bid = np.zeros(n, dtype=bool)
+        self.yes_bid = np.zeros(n)
+        self.yes_bid_size = np.zeros(n)
+        self.yes_ask = np.ones(n)
+        self.yes_ask_size = np.zeros(n)
+        self.no_bid = np.zeros(n)
+        self.no_bid_size = np.zeros(n)
+
+        # --- Other venues (YES side only, like the scalar cross check) ---
+        cross_slugs = self.order_book_manager.cross_slugs
+        self.venues = {}
+        for venue in bot.CROSS_VENUES:
+            common = cross_slugs.get(venue, ())
+            self.venues[venue] = {
+                "eligible": np.array([slug in common for slug in self.slugs], dtype=bool),
+                "present": np.zeros(n, dtype=bool),
+                "bid": np.zeros(n),
+                "bid_size": np.zeros(n),
+                "ask": np.ones(n),
+                "ask_size": np.zeros(n),
+            }
+
+        self.refresh()
+
+    # ----------------------------------------------------------------------
+    # ARRAY MAINTENANCE
+    # ----------------------------------------------------------------------
+
+    def refresh(self, market_slugs=None):
+        """Copies top-of-book from the combined view into the arrays (all markets, or just the given ones)."""
+        comparison = self.order_book_manager.compare_specific_markets()
+        slugs = self.slugs if market_slugs is None else market_slugs
+
+        for slug in slugs:
+            i = self.index.get(slug)
+            if i is None:
+                continue
+            market_data = comparison.get(slug) or {}
+            self._load_poly_row(i, market_data.get('polymarket'))
+            for venue, arrays in self.venues.items():
+                self._load_venue_row(i, arrays, market_data.get(venue))
+
+    def _load_poly_row(self, i, poly_data):
+        self.poly_present[i] = bool(poly_data)
+        if not poly_data:
+            self.has_yes_bid[i] = self.has_no_bid[i] = False
+            self.yes_bid[i] = self.yes_bid_size[i] = self.no_bid[i] = self.no_bid_size[i] = 0.0
+            self.yes_ask[i], self.yes_ask_size[i] = 1.0, 0.0
+            return
+
+        yes_bids = poly_data['yes'].get("bids", [])
+        yes_asks = poly_data['yes'].get("asks", [])
+        no_bids = poly_data['no'].get("bids", [])
+
+        self.has_yes_bid[i] = bool(yes_bids)
+        self.yes_bid[i], self.yes_bid_size[i] = yes_bids[0] if yes_bids else (0.0, 0.0)
+        self.yes_ask[i], self.yes_ask_size[i] = yes_asks[0] if yes_asks else (1.0, 0.0)
+        self.has_no_bid[i] = bool(no_bids)
+        self.no_bid[i], self.no_bid_size[i] = no_bids[0] if no_bids else (0.0, 0.0)
+
+    @staticmethod
+    def _load_venue_row(i, arrays, venue_data):
+        arrays["present"][i] = bool(venue_data)
+        bids = venue_data['yes']['bids'] if venue_data else None
+        asks = venue_data['yes']['asks'] if venue_data else None
+        arrays["bid"][i], arrays["bid_size"][i] = bids[0] if bids else (0.0, 0.0)
+        arrays["ask"][i], arrays["ask_size"][i] = asks[0] if asks else (1.0, 0.0)
+
+    # ----------------------------------------------------------------------
+    # SCAN
+    # ----------------------------------------------------------------------
+
+    def scan(self):
+        """
+        Evaluates every market at once and records qualifying opportunities on
+        the bot, in the same order as the scalar engine (by market, then check).
+        """
+        bot = self.bot
+        comparison = self.order_book_manager.compare_specific_markets()
+        hits = []  # (row, check order, sizing callback)
+
+        # A. Internal Polymarket Arbitrage: YES Bid + NO Bid > threshold, first share pair profitable
+        bid_sum = self.yes_bid + self.no_bid
+        internal_net = bid_sum - 1.00 - (1.00 * bot.FEE_POLYMARKET * 2)
+        internal_hit = (self.has_yes_bid & self.has_no_bid
+                        & (bid_sum > bot.INTERNAL_ARB_THRESHOLD)
+                        & (internal_net > 0.0))
+
+        for i in np.flatnonzero(internal_hit):
+            def size_internal(i=i):
+                poly_data = comparison[self.slugs[i]]['polymarket']
+                bot._size_internal_opp(self.slugs[i], self._question(i),
+                                       poly_data['yes']['bids'], poly_data['no']['bids'])
+            hits.append((i, 0, size_internal))
+
+        # B. Cross-Platform Arbitrage, both directions for every venue
+        for order, (venue, arrays) in enumerate(self.venues.items(), start=1):
+            eligible = arrays["eligible"] & self.poly_present & arrays["present"]
+
+            # Buy YES on Poly (ask), sell YES on the venue (bid); Kalshi's fee rate depends on the price
+            self._cross_direction(hits, comparison, 2 * order - 1, eligible, arrays["bid"], "polymarket", venue,
+                                  self.yes_ask, bot.FEE_POLYMARKET, arrays["bid"], bot._venue_fee(venue, arrays["bid"]))
+            # Buy YES on the venue (ask), sell YES on Poly (bid)
+            self._cross_direction(hits, comparison, 2 * order, eligible, arrays["ask"], venue, "polymarket",
+                                  arrays["ask"], bot._venue_fee(venue, arrays["ask"]), self.yes_bid, bot.FEE_POLYMARKET)
+
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        for _, _, size in hits:
+            size()
+
+    def _cross_direction(self, hits, comparison, order, eligible, venue_price, buy_venue, sell_venue,
+                         buy_price, buy_fee, sell_price, sell_fee):
+        """Prefilters one cross direction; venue_price is the non-Poly quote that must be a valid price."""
+        bot = self.bot
+        valid = eligible & (venue_price >= bot.MIN_VALID_PRICE) & (venue_price <= bot.MAX_VALID_PRICE)
+        raw_spread = sell_price - buy_price
+        fee_cost = (buy_price * buy_fee) + (sell_price * sell_fee)
+        net = raw_spread - fee_cost
+
+        for i in np.flatnonzero(valid & (net > 0.0)):
+            def size_cross(i=i):
+                market_data = comparison[self.slugs[i]]
+                bot._size_cross_opp(self.slugs[i], self._question(i), buy_venue, sell_venue,
+                                    market_data[buy_venue]['yes']['asks'], market_data[sell_venue]['yes']['bids'])
+            hits.append((i, order, size_cross))
+
+    def _question(self, i):
+        slug = self.slugs[i]
+        return self.order_book_manager.get_market_info(slug).get('question', slug)
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Reproducible benchmarks for the ingestion and detection hot paths.
+# Run them from the repository root, e.g. `python -m benchmarks.bench_vector_scanner`.
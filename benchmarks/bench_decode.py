@@ -0,0 +1,109 @@
+# File: benchmarks/bench_decode.py
+"""
+Measures the Polymarket WebSocket decode path (PolymarketClient._on_message):
+messages per second and transient bytes allocated per message, for every
+installed JSON backend, on a synthetic mix of 'book' snapshots and
+'price_change' deltas.
+
+    python -m benchmarks.bench_decode --messages 20000 --depth 20
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_poly_book_message
+from polymarket import decode
+from polymarket.polymarket_client import PolymarketClient
+
+
+def build_frames(n_messages, n_assets, depth, snapshot_rate, seed=7):
+    """Builds raw text frames as they arrive on the socket (a JSON list per frame, like Polymarket)."""
+    rng = random.Random(seed)
+    asset_ids = [f"{10 ** 20 + a}" for a in range(n_assets)]
+    frames = []
+    for _ in range(n_messages):
+        asset_id = rng.choice(asset_ids)
+        mid = round(rng.uniform(0.1, 0.9), 2)
+        if rng.random() < snapshot_rate:
+            frames.append(json.dumps([make_poly_book_message(rng, asset_id, mid, depth)]))
+        else:
+            change = {
+                "asset_id": asset_id,
+                "price": f"{mid:.2f}",
+                "size": f"{rng.choice([0, rng.randint(5, 500)]):.2f}",
+                "side": rng.choice(["BUY", "SELL"]),
+            }
+            frames.append(json.dumps({"event_type": "price_change", "price_changes": [change]}))
+    return frames
+
+
+def measure_rate(frames, repeat):
+    """Returns the best messages/sec over `repeat` passes on a fresh client each time."""
+    best = 0.0
+    for _ in range(repeat):
+        client = PolymarketClient(token_ids=[])
+        on_message = client._on_message
+        start = time.perf_counter()
+        for frame in frames:
+            on_message(frame)
+        best = max(best, len(frames) / (time.perf_counter() - start))
+    return best
+
+
+def measure_allocations(frames):
+    """
+    Returns the mean transient bytes allocated per message: the traced peak
+    while handling each frame, above what was allocated before it (warm books,
+    so replacing a snapshot is measured in steady state).
+    """
+    client = PolymarketClient(token_ids=[])
+    for frame in frames:
+        client._on_message(frame)
+
+    total = 0
+    tracemalloc.start()
+    try:
+        for frame in frames:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            client._on_message(frame)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--snapshot-rate", type=float, default=0.2, help="Fraction of frames that are full book snapshots")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    frames = build_frames(args.messages, args.assets, args.depth, args.snapshot_rate)
+    mean_size = sum(len(f) for f in frames) / len(frames)
+    print(f"{len(frames)} frames, {args.snapshot_rate:.0%} snapshots at depth {args.depth}, {mean_size:.0f} bytes/frame on average")
+
+    print(f"\n{'backend':<10}{'msg/s':>12}{'bytes/msg':>12}")
+    for name in decode.JSON_BACKENDS:
+        if decode._import_loads(name) is None:
+            print(f"{name:<10}{'not installed':>24}")
+            continue
+        decode.set_json_backend(name)
+        rate = measure_rate(frames, args.repeat)
+        allocated = measure_allocations(frames)
+        print(f"{name:<10}{rate:>12,.0f}{allocated:>12,.0f}")
+    decode.set_json_backend()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# File: benchmarks/bench_matching.py
+"""
+Times the cross-venue MarketMatcher on two synthetic universes of worded
+markets: a cold match (everything scored), a warm restart from the cache
+with a few new markets, and the precision of the matches.
+
+    python -m benchmarks.bench_matching --markets 30000 --new 100
+"""
+
+import argparse
+import logging
+import random
+import time
+
+from matching import Listing, MarketMatcher
+
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December")
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+class MemoryCache:
+    """The part of MarketCache the matcher uses, kept in memory."""
+    def __init__(self):
+        self.venues = {}
+        self.meta = {}
+
+    def records(self, venue):
+        return self.venues.setdefault(venue, {})
+
+    def replace_all(self, venue, records):
+        self.venues[venue] = dict(records)
+
+    def get_meta(self, venue, key, default=None):
+        return self.meta.get((venue, key), default)
+
+    def set_meta(self, venue, key, value):
+        self.meta[(venue, key)] = value
+
+
+def build_listings(rng, names, start, count, match_rate):
+    """
+    Polymarket and Kalshi listings worded differently: a `match_rate` share of
+    the Kalshi ones restate a Polymarket market, the others a made-up one.
+
+    Returns:
+        (polymarket listings, kalshi listings, { kalshi id: true polymarket id })
+    """
+    poly, kalshi, truth = [], [], {}
+    for i in range(start, start + count):
+        first, second = rng.sample(names, 2)
+        month, year = rng.choice(MONTHS), rng.choice((2025, 2026))
+        strike = rng.randint(1, 200) * 1000
+        end_time = 1.75e9 + rng.randint(0, 365) * 86400
+        poly.append(Listing("polymarket", f"poly-{i}", f"Will {first} {second} reach ${strike // 1000}k by {month} {year}?", end_time))
+        if rng.random() < match_rate:
+            kalshi.append(Listing("kalshi", f"KX-{i}", f"{first.title()} {second.title()} above {strike:,} before {month[:3]} {year}",
+                                  end_time + 3600))
+            truth[f"KX-{i}"] = f"poly-{i}"
+        else:
+            first, second = rng.sample(names, 2)
+            kalshi.append(Listing("kalshi", f"KY-{i}", f"Will {first} {second} reach ${strike // 1000}k by {month} {year}?"))
+    return poly, kalshi, truth
+
+
+def _match(poly, kalshi, cache=None):
+    started = time.perf_counter()
+    matcher = MarketMatcher()
+    if cache is not None:
+        matcher.load(cache)
+    matcher.sync("polymarket", poly)
+    matcher.sync("kalshi", kalshi)
+    matched = matcher.match("kalshi")
+    return matcher, matched, time.perf_counter() - started
+
+
+def _precision(matched, truth):
+    correct = sum(1 for slug, listing in matched.items() if truth.get(listing.id) == slug)
+    return f"{len(matched)} matched, {correct}/{len(truth)} true pairs found, {len(matched) - correct} wrong"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=30000, help="Markets per venue")
+    parser.add_argument("--new", type=int, default=100, help="Markets per venue added before the warm restart")
+    parser.add_argument("--match-rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    names = ["".join(rng.choice(LETTERS) for _ in range(7)) for _ in range(max(1000, args.markets // 2))]
+    poly, kalshi, truth = build_listings(rng, names, 0, args.markets, args.match_rate)
+
+    print(f"Matching {len(kalshi)} Kalshi listings to {len(poly)} Polymarket markets...")
+    matcher, matched, cold = _match(poly, kalshi)
+    print(f"cold match:   {cold:8.2f}s   {_precision(matched, truth)}")
+
+    cache = MemoryCache()
+    matcher.save(cache)
+    new_poly, new_kalshi, new_truth = build_listings(rng, names, args.markets, args.new, args.match_rate)
+    truth.update(new_truth)
+    _, matched, warm = _match(poly + new_poly, kalshi + new_kalshi, cache)
+    print(f"warm restart: {warm:8.2f}s   {_precision(matched, truth)} (+{args.new} markets per venue)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# File: benchmarks/bench_parallel_scanner.py
+"""
+Replays a synthetic Polymarket update stream through the single-process bot
+and through ShardedScanner with 1, 2, 4... worker processes, checks that the
+merged opportunities are identical, and prints the throughput.
+
+Each worker owns its shard end to end, as in the live bot: it decodes the
+raw frames of its markets, updates its books and scans them, and the parent
+only merges the reports. Scaling is bounded by the cores available.
+
+    python -m benchmarks.bench_parallel_scanner --markets 20000 --updates 50000 --workers 1 2 4
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+
+from arbitrage.arbitrage_bot import ArbitrageBot
+from arbitrage.parallel_scanner import ShardBot, ShardedScanner, partition_mappings, shard_of
+from benchmarks.synthetic import StaticVenueClient, build_universe, generate_updates
+from data.order_book import OrderBookManager
+from data.price_levels import PriceLevels
+from polymarket.polymarket_client import PolymarketClient
+
+LOAD_TIMEOUT = 600  # Seconds the workers get to build their shards
+
+
+def _book_frame(asset_id, book):
+    """A raw 'book' frame re-creating one live Polymarket book."""
+    return json.dumps({
+        "event_type": "book",
+        "asset_id": asset_id,
+        "bids": [{"price": str(p), "size": str(s)} for p, s in book["bids"]],
+        "asks": [{"price": str(p), "size": str(s)} for p, s in book["asks"]],
+    })
+
+
+def _frame_asset(message):
+    if message["event_type"] == "book":
+        return message["asset_id"]
+    return message["price_changes"][0]["asset_id"]
+
+
+def build_replay(n_markets, n_updates, depth, seed=7):
+    """
+    Builds a universe and the raw frames to replay over it.
+
+    Returns:
+        (poly_mapping, venue_mapping, initial frames, venue levels, update frames),
+        frames being (asset_id, JSON string) pairs.
+    """
+    poly_mapping, venue_mapping, client, venue_client, _ = build_universe(n_markets, depth=depth, seed=seed)
+    initial = [(asset_id, _book_frame(asset_id, book)) for asset_id, book in client.order_books.items()]
+    venue_levels = {slug: {outcome: {side: list(levels) for side, levels in sides.items()} for outcome, sides in book.items()}
+                    for slug, book in venue_client.order_books.items()}
+    messages = generate_updates(random.Random(seed + 1), poly_mapping, n_updates, depth=depth)
+    updates = [(_frame_asset(message), json.dumps(message)) for message in messages]
+    return poly_mapping, venue_mapping, initial, venue_levels, updates
+
+
+def _load_shard(poly_mapping, venue_mapping, initial, venue_levels):
+    """Builds a live client and manager for a universe (or one shard of it) from raw frames."""
+    client = PolymarketClient(token_ids=[])
+    for _, frame in initial:
+        client._on_message(frame)
+    venue_books = {slug: {outcome: {side: PriceLevels(side == "bids", levels) for side, levels in sides.items()}
+                          for outcome, sides in venue_levels[slug].items()}
+                   for slug in venue_mapping}
+    manager = OrderBookManager(client, StaticVenueClient(venue_books), poly_mapping, venue_mapping)
+    manager.update_order_books()
+    for slug in venue_books:
+        manager.on_limitless_update(slug)
+    manager.drain_dirty()
+    return client, manager
+
+
+def _replay(client, manager, bot, updates, batch, report=None):
+    """Feeds the frames to the client `batch` at a time, scanning the changed markets after each batch."""
+    for start in range(0, len(updates), batch):
+        for _, frame in updates[start:start + batch]:
+            client._on_message(frame)
+        dirty = manager.drain_dirty()
+        if dirty:
+            result = bot.scan(dirty) if report else bot.find_arbitrage_opportunities(dirty)
+            if report and result is not None:
+                report(result)
+
+
+def replay_shard(shard_id, args, results, stop, inbox):
+    """
+    ShardedScanner target: loads one shard, waits for every worker, then
+    replays its frames. Its venue books are static, so the inbox stays unused.
+    """
+    logging.getLogger().setLevel(logging.WARNING)
+    poly_mapping, venue_mapping, initial, venue_levels, updates, batch, barrier = args
+    client, manager = _load_shard(poly_mapping, venue_mapping, initial, venue_levels)
+    bot = ShardBot(manager)
+    report = bot.scan()
+    if report is not None:
+        results.put((shard_id, *report, None))
+    barrier.wait()
+    _replay(client, manager, bot, updates, batch, lambda result: results.put((shard_id, *result, None)))
+
+
+def _key(opp):
+    return (opp["slug"], opp["type"], opp["profit"], opp["max_volume_shares"], opp["total_net_profit"])
+
+
+def run_single(replay, batch):
+    poly_mapping, venue_mapping, initial, venue_levels, updates = replay
+    client, manager = _load_shard(poly_mapping, venue_mapping, initial, venue_levels)
+    bot = ArbitrageBot(manager)
+    bot.find_arbitrage_opportunities()
+    started = time.perf_counter()
+    _replay(client, manager, bot, updates, batch)
+    return time.perf_counter() - started, sorted(_key(opp) for opp in bot.opportunities)
+
+
+def run_sharded(replay, batch, workers):
+    poly_mapping, venue_mapping, initial, venue_levels, updates = replay
+    shards = partition_mappings(poly_mapping, workers, venue_mapping)
+    # Frames go to the worker owning their market, in stream order
+    owner = {}
+    for slug, entry in poly_mapping.items():
+        shard = shard_of(slug, entry, workers)
+        owner[entry["yes_token_id"]] = owner[entry["no_token_id"]] = shard
+    initial_of = [[] for _ in range(workers)]
+    updates_of = [[] for _ in range(workers)]
+    for asset_id, frame in initial:
+        initial_of[owner[asset_id]].append((asset_id, frame))
+    for asset_id, frame in updates:
+        updates_of[owner[asset_id]].append((asset_id, frame))
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers + 1)
+    shard_args = [(shard_poly, shard_venue, initial_of[k], {slug: venue_levels[slug] for slug in shard_venue},
+                   updates_of[k], batch, barrier)
+                  for k, (shard_poly, shard_venue) in enumerate(shards)]
+    bot = ArbitrageBot(OrderBookManager(None, None, poly_mapping, venue_mapping))
+    scanner = ShardedScanner(bot, shard_args, target=replay_shard).start()
+
+    # A worker that fails to load breaks the barrier instead of hanging the benchmark
+    barrier.wait(timeout=LOAD_TIMEOUT)
+    started = time.perf_counter()
+    while scanner.is_alive():
+        scanner.apply(scanner.collect(timeout=0.05))
+    # Reports still queued when the last worker exited
+    scanner.apply(scanner.collect(timeout=0.05))
+    seconds = time.perf_counter() - started
+    scanner.stop()
+    return seconds, sorted(_key(opp) for opp in bot.opportunities)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=20000)
+    parser.add_argument("--updates", type=int, default=50000)
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=100, help="Frames ingested between two scans")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print(f"Building synthetic replay: {args.markets} markets, {args.updates} frames, depth {args.depth} "
+          f"({os.cpu_count()} CPUs)...")
+    replay = build_replay(args.markets, args.updates, args.depth)
+
+    seconds, expected = run_single(replay, args.batch)
+    print(f"\n{'mode':<24}{'seconds':>10}{'frames/s':>12}")
+    print(f"{'single process':<24}{seconds:>10.2f}{args.updates / seconds:>12.0f}   (1.0x)")
+    baseline = seconds
+
+    for workers in args.workers:
+        seconds, merged = run_sharded(replay, args.batch, workers)
+        if merged != expected:
+            raise SystemExit(f"MISMATCH with {workers} workers: {len(merged)} opportunities, expected {len(expected)}")
+        print(f"{f'{workers} worker(s)':<24}{seconds:>10.2f}{args.updates / seconds:>12.0f}   "
+              f"({baseline / seconds:.1f}x)")
+    print(f"\nResults identical: {len(expected)} opportunities.")
+
+
+if __name__ == "__main__":
+    main()
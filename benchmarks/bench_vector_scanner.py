@@ -0,0 +1,71 @@
+# File: benchmarks/bench_vector_scanner.py
+"""
+Compares the scalar (python) and vectorized (numpy) ArbitrageBot scan engines
+on a synthetic universe, checks they report identical opportunities, and
+prints the timings.
+
+    python -m benchmarks.bench_vector_scanner --markets 10000 --repeat 20
+"""
+
+import argparse
+import logging
+import time
+
+from arbitrage.arbitrage_bot import ArbitrageBot
+from benchmarks.synthetic import build_universe
+
+
+def _time(fn, repeat):
+    """Returns the best and mean wall time of `repeat` calls, in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples), sum(samples) / len(samples)
+
+
+def _key(opp):
+    return (opp["slug"], opp["type"], opp["profit"], opp["max_volume_shares"], opp["total_net_profit"], opp["details"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print(f"Building synthetic universe: {args.markets} markets, depth {args.depth}...")
+    _, _, _, _, manager = build_universe(args.markets, depth=args.depth)
+
+    python_bot = ArbitrageBot(manager, engine="python")
+    numpy_bot = ArbitrageBot(manager, engine="numpy")
+
+    python_bot.find_arbitrage_opportunities()
+    numpy_bot.find_arbitrage_opportunities()
+    python_keys = [_key(o) for o in python_bot.opportunities]
+    numpy_keys = [_key(o) for o in numpy_bot.opportunities]
+    if python_keys != numpy_keys:
+        raise SystemExit(f"MISMATCH: python found {len(python_keys)} opportunities, numpy found {len(numpy_keys)}")
+    print(f"Results identical: {len(python_keys)} opportunities.")
+
+    scanner = numpy_bot._scanner
+    rows = [
+        ("python full scan", lambda: python_bot.find_arbitrage_opportunities()),
+        ("numpy refresh all + scan", lambda: numpy_bot.find_arbitrage_opportunities()),
+        ("numpy scan only", lambda: (numpy_bot.opportunities.clear(), scanner.scan())),
+    ]
+
+    print(f"\n{'engine':<28}{'best ms':>10}{'mean ms':>10}")
+    baseline = None
+    for name, fn in rows:
+        best, mean = _time(fn, args.repeat)
+        baseline = baseline or best
+        print(f"{name:<28}{best:>10.2f}{mean:>10.2f}   ({baseline / best:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# File: benchmarks/compare.py
+"""
+Compares two benchmark suite result files (see benchmarks/suite.py) case by
+case and flags regressions.
+
+    python -m benchmarks.compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+
+import argparse
+import json
+
+
+def _load(path):
+    with open(path) as f:
+        data = json.load(f)
+    rows = {(row["case"], row["markets"], row["depth"], row["update_rate"]): row for row in data["results"]}
+    return data["environment"], rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p50_us", choices=("p50_us", "p99_us", "mean_us", "peak_memory_kb"))
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as a regression")
+    args = parser.parse_args()
+
+    base_env, base = _load(args.baseline)
+    cand_env, cand = _load(args.candidate)
+    print(f"{args.metric}: {base_env['commit']} -> {cand_env['commit']}")
+    print(f"\n{'case':<48}{'markets':>9}{'baseline':>12}{'candidate':>12}{'change':>10}")
+
+    regressions = 0
+    for key, row in cand.items():
+        if key not in base:
+            continue
+        before, after = base[key][args.metric], row[args.metric]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  improved"
+        print(f"{key[0]:<48}{key[1]:>9}{before:>12.1f}{after:>12.1f}{change:>+10.1%}{flag}")
+
+    if regressions:
+        raise SystemExit(f"\n{regressions} case(s) regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# File: benchmarks/suite.py
+"""
+Reproducible benchmark suite for the ingestion-to-detection hot paths, on a
+synthetic universe scaled by market count, book depth and update rate:
+
+  - PolymarketClient._process_single_update (book snapshots and price changes)
+  - OrderBookManager.update_order_books
+  - OrderBookManager.compare_specific_markets
+  - ArbitrageBot.find_arbitrage_opportunities (full and incremental scans, per engine)
+
+Every case reports throughput, p50/p99 latency and the peak traced memory of one call. The
+results are written as JSON (with the commit, parameters and environment) so
+runs can be compared across commits with benchmarks/compare.py.
+
+    python -m benchmarks.suite --markets 1000,10000 --depth 10 --update-rate 0.05
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from arbitrage.arbitrage_bot import ArbitrageBot
+from benchmarks.synthetic import build_universe, generate_updates
+from polymarket import decode
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# ----------------------------------------------------------------------
+# MEASUREMENT
+# ----------------------------------------------------------------------
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name, setup, op, iterations, params, prepare=None):
+    """
+    Times `iterations` calls of op(state, i) and, in a second traced pass, the
+    largest peak memory a single call allocates. setup() builds a fresh state
+    for each pass so both passes do the same work; prepare(state, i), if
+    given, runs before each call outside the timing and the memory peak (e.g.
+    to apply the updates a scan consumes).
+
+    Returns:
+        dict: One result row.
+    """
+    state = setup()
+    samples = []
+    for i in range(iterations):
+        if prepare is not None:
+            prepare(state, i)
+        t0 = time.perf_counter_ns()
+        op(state, i)
+        samples.append(time.perf_counter_ns() - t0)
+
+    state = setup()
+    tracemalloc.start()
+    try:
+        peak = 0
+        for i in range(iterations):
+            if prepare is not None:
+                prepare(state, i)
+            # Measured from right before the call, so nothing prepare (or an earlier call) allocated counts
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            op(state, i)
+            _, call_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, call_peak - before)
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    elapsed = sum(samples) / 1e9
+    return {
+        "case": name,
+        **params,
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed > 0 else 0.0,
+        "mean_us": elapsed * 1e6 / iterations,
+        "p50_us": _percentile(samples, 0.50) / 1000,
+        "p99_us": _percentile(samples, 0.99) / 1000,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+# ----------------------------------------------------------------------
+# CASES
+# ----------------------------------------------------------------------
+
+def run_cases(n_markets, depth, update_rate, n_messages, scan_repeat, seed):
+    """Runs every case for one universe size and returns the result rows."""
+    params = {"markets": n_markets, "depth": depth, "update_rate": update_rate}
+    rows = []
+
+    def universe():
+        return build_universe(n_markets, depth=depth, seed=seed)
+
+    def with_messages(snapshot_rate):
+        def setup():
+            poly_mapping, _, client, _, manager = universe()
+            messages = generate_updates(random.Random(seed), poly_mapping, n_messages, depth, snapshot_rate)
+            return client, manager, messages
+        return setup
+
+    # --- Ingestion ---
+    rows.append(measure("process_single_update[book]", with_messages(1.0),
+                        lambda s, i: s[0]._process_single_update(s[2][i]), n_messages, params))
+    rows.append(measure("process_single_update[price_change]", with_messages(0.0),
+                        lambda s, i: s[0]._process_single_update(s[2][i]), n_messages, params))
+
+    # --- Book store ---
+    rows.append(measure("update_order_books", lambda: universe()[4],
+                        lambda manager, i: manager.update_order_books(), scan_repeat, params))
+    rows.append(measure("compare_specific_markets", lambda: universe()[4],
+                        lambda manager, i: manager.compare_specific_markets(), scan_repeat, params))
+
+    # --- Detection ---
+    # Incremental scans: before each timed scan, update_rate of the markets
+    # receive a message (applied outside the timing); the scan then evaluates
+    # the dirty set, as the event-driven main loop does.
+    updates_per_scan = max(1, int(n_markets * update_rate))
+
+    for engine in ArbitrageBot.SCAN_ENGINES:
+        def full_setup(engine=engine):
+            manager = universe()[4]
+            return ArbitrageBot(manager, engine=engine)
+        rows.append(measure(f"find_arbitrage_opportunities[{engine},full]", full_setup,
+                            lambda bot, i: bot.find_arbitrage_opportunities(), scan_repeat, params))
+
+        def incremental_setup(engine=engine):
+            poly_mapping, _, client, _, manager = universe()
+            bot = ArbitrageBot(manager, engine=engine)
+            bot.find_arbitrage_opportunities()
+            manager.drain_dirty()
+            messages = generate_updates(random.Random(seed), poly_mapping, updates_per_scan * scan_repeat, depth, 0.1)
+            return bot, client, manager, messages, [None]
+
+        def apply_batch(state, i):
+            bot, client, manager, messages, dirty = state
+            for message in messages[i * updates_per_scan:(i + 1) * updates_per_scan]:
+                client._process_single_update(message)
+            dirty[0] = manager.drain_dirty()
+
+        rows.append(measure(f"find_arbitrage_opportunities[{engine},incremental]", incremental_setup,
+                            lambda s, i: s[0].find_arbitrage_opportunities(s[4][0]), scan_repeat, params,
+                            prepare=apply_batch))
+
+    return rows
+
+
+# ----------------------------------------------------------------------
+# RESULTS
+# ----------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy_version,
+        "json_backend": decode.get_json_backend(),
+    }
+
+
+def print_rows(rows):
+    print(f"\n{'case':<48}{'markets':>9}{'ops/s':>13}{'p50 us':>11}{'p99 us':>11}{'peak KB':>11}")
+    for row in rows:
+        print(f"{row['case']:<48}{row['markets']:>9}{row['ops_per_sec']:>13,.0f}"
+              f"{row['p50_us']:>11.1f}{row['p99_us']:>11.1f}{row['peak_memory_kb']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", default="1000,10000", help="Comma-separated universe sizes")
+    parser.add_argument("--depth", type=int, default=10, help="Price levels per book side")
+    parser.add_argument("--update-rate", type=float, default=0.05,
+                        help="Fraction of markets updated between two incremental scans")
+    parser.add_argument("--messages", type=int, default=20000, help="Messages per ingestion case")
+    parser.add_argument("--repeat", type=int, default=50, help="Calls per book store / scan case")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    env = environment()
+    rows = []
+    for n_markets in (int(n) for n in args.markets.split(",")):
+        print(f"Running {n_markets} markets, depth {args.depth}, update rate {args.update_rate}...")
+        rows.extend(run_cases(n_markets, args.depth, args.update_rate, args.messages, args.repeat, args.seed))
+    print_rows(rows)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{env['commit']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"environment": env, "parameters": vars(args), "results": rows}, f, indent=2)
+    print(f"\nResults written to {out}")
+
+
+if __name__ == "__main__":
+    main()
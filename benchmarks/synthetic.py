@@ -0,0 +1,133 @@
+# File: benchmarks/synthetic.py
+
+import random
+
+from data.order_book import OrderBookManager
+from data.price_levels import PriceLevels
+from polymarket.polymarket_client import PolymarketClient
+
+# Probability that a synthetic market is quoted so that it crosses (is an arb)
+DEFAULT_ARB_RATE = 0.02
+
+
+class StaticVenueClient:
+    """A stand-in for a REST venue client (e.g. LimitlessClient) serving fixed books."""
+    def __init__(self, order_books):
+        self.order_books = order_books
+        self.on_book_update = None
+
+    def fetch_all_order_books(self):
+        return self.order_books
+
+
+def _levels(rng, best, depth, step, descending):
+    """Builds `depth` (price, size) levels walking away from `best` in `step` increments."""
+    levels = []
+    for k in range(depth):
+        price = round(best - k * step if descending else best + k * step, 4)
+        if not 0.0 < price < 1.0:
+            break
+        levels.append((price, float(rng.randint(5, 500))))
+    return levels
+
+
+def make_poly_book_message(rng, asset_id, mid, depth, tick=0.01):
+    """A Polymarket 'book' WebSocket message around a mid price."""
+    bids = _levels(rng, round(mid - tick, 2), depth, tick, descending=True)
+    asks = _levels(rng, round(mid + tick, 2), depth, tick, descending=False)
+    return {
+        "event_type": "book",
+        "asset_id": asset_id,
+        "bids": [{"price": f"{p:.2f}", "size": f"{s:.2f}"} for p, s in bids],
+        "asks": [{"price": f"{p:.2f}", "size": f"{s:.2f}"} for p, s in asks],
+    }
+
+
+def make_price_change_message(rng, asset_ids, tick=0.01, max_changes=3):
+    """A Polymarket 'price_change' message touching 1..max_changes levels of the given assets."""
+    changes = []
+    for _ in range(rng.randint(1, max_changes)):
+        price = round(rng.randint(1, int(1 / tick) - 1) * tick, 2)
+        size = 0 if rng.random() < 0.2 else rng.randint(5, 500)
+        changes.append({
+            "asset_id": rng.choice(asset_ids),
+            "price": f"{price:.2f}",
+            "size": f"{size:.2f}",
+            "side": "BUY" if rng.random() < 0.5 else "SELL",
+        })
+    return {"event_type": "price_change", "price_changes": changes}
+
+
+def generate_updates(rng, poly_mapping, n_messages, depth=10, snapshot_rate=0.1):
+    """
+    Generates a stream of Polymarket update messages (dicts) over a universe's
+    tokens: full 'book' snapshots with probability `snapshot_rate`, otherwise
+    'price_change' deltas on one market's YES/NO tokens.
+    """
+    markets = list(poly_mapping.values())
+    messages = []
+    for _ in range(n_messages):
+        market = rng.choice(markets)
+        tokens = [market["yes_token_id"], market["no_token_id"]]
+        if rng.random() < snapshot_rate:
+            messages.append(make_poly_book_message(rng, rng.choice(tokens), round(rng.uniform(0.1, 0.9), 2), depth))
+        else:
+            messages.append(make_price_change_message(rng, tokens))
+    return messages
+
+
+def build_universe(n_markets, depth=10, cross_rate=0.5, arb_rate=DEFAULT_ARB_RATE, seed=7):
+    """
+    Builds a synthetic, fully populated universe.
+
+    Args:
+        n_markets: Number of binary Polymarket markets.
+        depth: Price levels per book side.
+        cross_rate: Fraction of markets also listed on the second venue.
+        arb_rate: Fraction of markets quoted so that an arbitrage exists.
+        seed: RNG seed, so runs are reproducible.
+
+    Returns:
+        (poly_mapping, venue_mapping, polymarket_client, venue_client, order_book_manager)
+    """
+    rng = random.Random(seed)
+    poly_mapping = {}
+    venue_mapping = {}
+    venue_books = {}
+    client = PolymarketClient(token_ids=[])
+
+    for m in range(n_markets):
+        slug = f"synthetic-market-{m}"
+        yes_id, no_id = f"{m}1", f"{m}0"
+        poly_mapping[slug] = {"question": f"Synthetic market {m}?", "yes_token_id": yes_id, "no_token_id": no_id}
+
+        is_arb = rng.random() < arb_rate
+        yes_mid = round(rng.uniform(0.1, 0.9), 2)
+        # An internal arb: YES and NO bids that together exceed 1.00
+        no_mid = round(1.0 - yes_mid + (0.05 if is_arb else 0.0), 2)
+        client._process_single_update(make_poly_book_message(rng, yes_id, yes_mid, depth))
+        client._process_single_update(make_poly_book_message(rng, no_id, no_mid, depth))
+
+        if rng.random() < cross_rate:
+            venue_mapping[slug] = {"pair_id": f"pair-{m}", "question": f"VENUE: Synthetic market {m}?"}
+            # A cross arb: the venue bids above the Polymarket ask
+            venue_mid = round(yes_mid + (0.06 if is_arb else rng.uniform(-0.01, 0.01)), 2)
+            venue_books[slug] = {
+                "yes": {
+                    "bids": PriceLevels(True, _levels(rng, round(venue_mid - 0.01, 2), depth, 0.01, True)),
+                    "asks": PriceLevels(False, _levels(rng, round(venue_mid + 0.01, 2), depth, 0.01, False)),
+                },
+                "no": {"bids": PriceLevels(True), "asks": PriceLevels(False)},
+            }
+
+    client.token_ids = [t for m in poly_mapping.values() for t in (m["yes_token_id"], m["no_token_id"])]
+    venue_client = StaticVenueClient(venue_books)
+    manager = OrderBookManager(client, venue_client, poly_mapping, venue_mapping)
+
+    # Link every venue book into the combined view
+    manager.update_order_books()
+    for slug in venue_books:
+        manager.on_limitless_update(slug)
+    manager.drain_dirty()
+
+    return poly_mapping, venue_mapping, client, venue_client, manager
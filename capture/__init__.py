@@ -0,0 +1,5 @@
+# capture/__init__.py
+from .recorder import CaptureRecorder
+from .replayer import CaptureReplayer, iter_records
+
+__all__ = ['CaptureRecorder', 'CaptureReplayer', 'iter_records']
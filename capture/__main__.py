@@ -0,0 +1,4 @@
+# capture/__main__.py
+from capture.replayer import main
+
+main()
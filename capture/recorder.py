@@ -0,0 +1,120 @@
+# File: capture/recorder.py
+
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- CAPTURE SETTINGS ---
+DEFAULT_SEGMENT_BYTES = 256 * 1024 * 1024   # Roll to a new segment after this much (uncompressed) data...
+DEFAULT_SEGMENT_SECONDS = 15 * 60           # ...or after this long, whichever comes first
+COMPRESS_LEVEL = 6
+WRITE_BATCH = 1000                          # Max records written per wake-up of the writer thread
+SEGMENT_PREFIX = "capture-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+class CaptureRecorder:
+    """
+    Appends raw venue market data to compressed, segmented capture files.
+
+    Every record is one JSON line:
+        {"ts": receive time (epoch seconds), "src": venue, "key": str or null, "data": raw payload}
+    where `data` is the WebSocket frame or REST response body exactly as
+    received (and `key` e.g. the Limitless pair_id a response belongs to).
+    Records with src "meta" hold session context such as the market mappings,
+    so a capture can be replayed on its own (see capture/replayer.py).
+
+    record() only timestamps the payload and puts it on a queue, so it is
+    cheap on the hot path and safe from any thread; a background thread does
+    the JSON encoding, compression and segment rotation.
+    """
+    def __init__(self, directory, segment_bytes=DEFAULT_SEGMENT_BYTES, segment_seconds=DEFAULT_SEGMENT_SECONDS):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        self.records_written = 0
+        self.segments = []
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._segment_started = 0.0
+        self._segment_size = 0
+        self._thread = threading.Thread(target=self._write_forever, name="capture-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Capturing raw market data to {directory}")
+
+    # ----------------------------------------------------------------------
+    # HOT PATH
+    # ----------------------------------------------------------------------
+
+    def record(self, source, data, key=None):
+        """Queues one raw payload (str or bytes) with its receive timestamp."""
+        self._queue.put((time.time(), source, key, data))
+
+    def record_meta(self, name, value):
+        """Stores JSON-serialisable session context (e.g. a market mapping) under `name`."""
+        self._queue.put((time.time(), "meta", name, value))
+
+    def close(self):
+        """Flushes every queued record, closes the current segment and stops the writer."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    # ----------------------------------------------------------------------
+    # WRITER THREAD
+    # ----------------------------------------------------------------------
+
+    def _write_forever(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not None and len(batch) < WRITE_BATCH:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            for record in batch:
+                if record is None:
+                    self._close_segment()
+                    return
+                try:
+                    self._write(record)
+                except Exception as e:
+                    logger.error(f"Failed to write capture record: {e}")
+
+    def _write(self, record):
+        ts, source, key, data = record
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", errors="replace")
+
+        if self._file is None or self._segment_size >= self.segment_bytes or ts - self._segment_started >= self.segment_seconds:
+            self._open_segment(ts)
+
+        line = json.dumps({"ts": ts, "src": source, "key": key, "data": data}, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._segment_size += len(line)
+        self.records_written += 1
+
+    def _open_segment(self, ts):
+        self._close_segment()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(ts))
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{stamp}-{len(self.segments):05d}{SEGMENT_SUFFIX}")
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL)
+        self._segment_started = ts
+        self._segment_size = 0
+        self.segments.append(path)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
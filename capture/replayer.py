@@ -0,0 +1,179 @@
+# File: capture/replayer.py
+"""
+Replays a market data capture through the real venue handlers and the
+arbitrage scan, as fast as possible or paced like the original session.
+
+    python -m capture captures/session1 --speed 0     # as fast as possible
+    python -m capture captures/session1 --speed 1     # real time
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import inspect
+import json
+import logging
+import os
+import time
+import zlib
+
+from capture.recorder import SEGMENT_PREFIX, SEGMENT_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+
+def list_segments(directory):
+    """Returns a capture's segment files in recording order."""
+    return sorted(glob.glob(os.path.join(directory, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")))
+
+
+def iter_records(directory):
+    """
+    Yields every record ({'ts', 'src', 'key', 'data'}) of a capture in order.
+    A segment cut short (e.g. the recorder was killed) is read up to the
+    last complete record.
+    """
+    for path in list_segments(directory):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping truncated record in {path}")
+        except (EOFError, OSError, zlib.error) as e:
+            logger.warning(f"Capture segment {path} ends early: {e}")
+
+
+class CaptureReplayer:
+    """
+    Feeds captured frames and responses back through per-venue handlers.
+
+    A handler is called as handler(data, key) with the raw payload exactly as
+    recorded; it may be a coroutine function. attach_clients wires the
+    standard client entry points (PolymarketClient._on_message,
+    KalshiClient._on_message, LimitlessClient.apply_recorded_response).
+    """
+    def __init__(self, directory, speed=None):
+        """
+        Args:
+            directory: Capture directory written by CaptureRecorder.
+            speed: None/0 replays as fast as possible; 1.0 keeps the original
+                timing, 2.0 runs twice as fast, and so on.
+        """
+        self.directory = directory
+        self.speed = speed or None
+        self.handlers = {}
+
+    def attach(self, source, handler):
+        self.handlers[source] = handler
+
+    def attach_clients(self, polymarket_client=None, limitless_client=None, kalshi_client=None):
+        if polymarket_client is not None:
+            self.attach("polymarket", lambda data, key: polymarket_client._on_message(data))
+        if limitless_client is not None:
+            self.attach("limitless", lambda data, key: limitless_client.apply_recorded_response(key, data))
+        if kalshi_client is not None:
+            self.attach("kalshi", lambda data, key: kalshi_client._on_message(None, data))
+
+    def load_meta(self):
+        """Returns the capture's session context ({name: value}) from its leading meta records."""
+        meta = {}
+        for record in iter_records(self.directory):
+            if record["src"] != "meta":
+                break
+            meta[record["key"]] = record["data"]
+        return meta
+
+    async def run(self, on_record=None):
+        """
+        Replays the capture.
+
+        Args:
+            on_record: Optional callback() invoked after each replayed record
+                (e.g. to run the arbitrage scan on the changed markets).
+
+        Returns:
+            dict: records replayed per source, wall time and records/sec.
+        """
+        counts = {}
+        first_ts = None
+        started = time.perf_counter()
+
+        for record in iter_records(self.directory):
+            handler = self.handlers.get(record["src"])
+            if handler is None:
+                continue
+
+            if self.speed is not None:
+                if first_ts is None:
+                    first_ts = record["ts"]
+                delay = (record["ts"] - first_ts) / self.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            result = handler(record["data"], record["key"])
+            if inspect.isawaitable(result):
+                await result
+            if on_record is not None:
+                on_record()
+            counts[record["src"]] = counts.get(record["src"], 0) + 1
+
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        return {"records": counts, "seconds": elapsed, "rate": total / elapsed if elapsed > 0 else 0.0}
+
+
+async def _replay_session(args):
+    # Imported here so reading a capture needs none of the venue dependencies
+    from arbitrage.arbitrage_bot import ArbitrageBot
+    from data.order_book import OrderBookManager
+    from limitless import LimitlessClient
+    from polymarket.polymarket_client import PolymarketClient
+    logging.getLogger().setLevel(logging.WARNING)
+
+    replayer = CaptureReplayer(args.directory, speed=args.speed)
+    meta = replayer.load_meta()
+    poly_mapping = meta.get("polymarket_mapping", {})
+    limitless_mapping = meta.get("limitless_mapping", {})
+    kalshi_mapping = meta.get("kalshi_mapping", {})
+
+    polymarket_client = PolymarketClient(token_ids=poly_mapping)
+    limitless_client = LimitlessClient(market_mapping=limitless_mapping)
+    kalshi_client = None
+    if kalshi_mapping:
+        from kalshi import KalshiClient
+        kalshi_client = KalshiClient(market_tickers=kalshi_mapping)
+
+    manager = OrderBookManager(polymarket_client, limitless_client, poly_mapping, limitless_mapping,
+                               kalshi_client=kalshi_client, kalshi_mapping=kalshi_mapping)
+    bot = ArbitrageBot(manager, engine=args.engine)
+    replayer.attach_clients(polymarket_client, limitless_client, kalshi_client)
+
+    scan_seconds = 0.0
+
+    def scan_changed():
+        nonlocal scan_seconds
+        dirty = manager.drain_dirty()
+        if not dirty:
+            return
+        start = time.perf_counter()
+        bot.find_arbitrage_opportunities(dirty)
+        scan_seconds += time.perf_counter() - start
+
+    stats = await replayer.run(on_record=scan_changed)
+    total = sum(stats["records"].values())
+    print(f"Replayed {total} records ({', '.join(f'{k}={v}' for k, v in stats['records'].items())}) "
+          f"in {stats['seconds']:.2f}s ({stats['rate']:,.0f} records/s)")
+    print(f"Detection: {scan_seconds * 1000:.1f}ms total, {len(bot.opportunities)} open opportunities at the end")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--speed", type=float, default=0, help="0 = as fast as possible, 1 = real time")
+    parser.add_argument("--engine", default="python", choices=("python", "numpy"))
+    args = parser.parse_args()
+
+    asyncio.run(_replay_session(args))
@@ -1,4 +1,6 @@
 # data/__init__.py
 from .order_book import OrderBookManager
+from .poll_scheduler import AdaptivePollScheduler
+from .price_levels import PriceLevels
 
-__all__ = ['OrderBookManager']
\ No newline at end of file
+__all__ = ['AdaptivePollScheduler', 'OrderBookManager', 'PriceLevels']
\ No newline at end of file
@@ -1,6 +1,9 @@
 # File: data/order_book.py
 
+import asyncio
 import logging
+import threading
+import time
 from threading import Lock
 from typing import Dict, Any, List, Tuple
 
@@ -10,25 +13,55 @@ logger = logging.getLogger(__name__)
 OrderBook = List[Tuple[float, float]]
 
 class OrderBookManager:
-    def __init__(self, polymarket_client, limitless_client, poly_mapping, limitless_mapping):
+    def __init__(self, polymarket_client, limitless_client, poly_mapping, limitless_mapping,
+                 kalshi_client=None, kalshi_mapping=None):
         """
-        Initializes OrderBookManager to manage data from Polymarket and Limitless/Kalshi.
+        Initializes OrderBookManager to manage data from Polymarket, Limitless and Kalshi.
         
         Args:
             polymarket_client: Polymarket client instance.
-            limitless_client: Limitless/Kalshi client instance (can be None).
+            limitless_client: Limitless client instance (can be None).
             poly_mapping: { market_slug: { 'yes_token_id': str, 'no_token_id': str, 'question': str } }
             limitless_mapping: { market_slug: { 'pair_id': str, 'question': str } } or None
+            kalshi_client: Kalshi client instance (can be None).
+            kalshi_mapping: { market_slug: { 'ticker': str, 'question': str } } or None
         """
         self.polymarket_client = polymarket_client
         self.limitless_client = limitless_client
+        self.kalshi_client = kalshi_client
         self.poly_mapping = poly_mapping if poly_mapping else {}
         self.limitless_mapping = limitless_mapping if limitless_mapping else {}
+        self.kalshi_mapping = kalshi_mapping if kalshi_mapping else {}
         
-        self.market_info = {}       # { slug: { 'question': str, 'on_poly': bool, 'on_limitless': bool } }
-        self.combined_order_books = {} # Master storage for normalized data
+        self.market_info = {}       # { slug: { 'question': str, 'on_poly': bool, 'on_limitless': bool, 'on_kalshi': bool } }
+        self.combined_order_books = {} # Master storage for normalized data (live, sorted books)
         self.lock = Lock()
         
+        # Slugs whose venue books have not been linked into the combined view yet
+        self._pending_poly = set()
+        self._pending_limitless = set()
+        self._pending_kalshi = set()
+        
+        # --- Change Tracking ---
+        # Every book change bumps the market's version and marks it dirty; the
+        # scan loop sleeps on _changed_event and only evaluates dirty markets.
+        self.versions = {}          # { slug: int }
+        self._dirty = set()
+        self._asset_to_slug = {}    # { polymarket token_id: slug }
+        self._ticker_to_slug = {}   # { kalshi ticker: slug }
+        self._loop = None
+        self._loop_thread_id = None
+        self._changed_event = None
+        self._wake_scheduled = False
+        
+        # --- Latency Tracing ---
+        # The first change of a market since the last drain is traced as
+        # (venue, received_at, changed_at) on the monotonic clock; drain_dirty
+        # hands the traces of the drained markets to the scan (get_trace).
+        self._trace = {}
+        self.last_trace = {}
+        self.metrics = None         # Optional monitoring.BotMetrics (ingest latency per venue)
+        
         # --- Market Matching Check ---
         # A market is tracked if it exists in either mapping. 
         # A cross-platform check is possible only if the SLUG exists in BOTH.
@@ -37,100 +70,242 @@ class OrderBookManager:
             self.market_info[slug] = {
                 'question': data.get('question', slug), 
                 'on_poly': True, 
-                'on_limitless': is_limitless
+                'on_limitless': is_limitless,
+                'on_kalshi': slug in self.kalshi_mapping
             }
         
-        for slug, data in self.limitless_mapping.items():
-            if slug not in self.market_info:
-                self.market_info[slug] = {
-                    'question': data.get('question', slug), 
-                    'on_poly': False, 
-                    'on_limitless': True
-                }
+        for venue_key, mapping in (('on_limitless', self.limitless_mapping), ('on_kalshi', self.kalshi_mapping)):
+            for slug, data in mapping.items():
+                if slug not in self.market_info:
+                    self.market_info[slug] = {
+                        'question': data.get('question', slug), 
+                        'on_poly': False, 
+                        'on_limitless': False,
+                        'on_kalshi': False
+                    }
+                self.market_info[slug][venue_key] = True
+        
+        for slug, info in self.market_info.items():
+            self.combined_order_books[slug] = {}
+            self.versions[slug] = 0
+            if info['on_poly']:
+                self._pending_poly.add(slug)
+            if info['on_limitless']:
+                self._pending_limitless.add(slug)
+            if info['on_kalshi']:
+                self._pending_kalshi.add(slug)
+        
+        for slug, data in self.poly_mapping.items():
+            self._asset_to_slug[data['yes_token_id']] = slug
+            self._asset_to_slug[data['no_token_id']] = slug
+        for slug, data in self.kalshi_mapping.items():
+            self._ticker_to_slug[data['ticker']] = slug
+        
+        # Subscribe to venue change notifications (clients call back with their own keys)
+        if self.polymarket_client is not None:
+            self.polymarket_client.on_book_update = self.on_polymarket_update
+        if self.limitless_client is not None:
+            self.limitless_client.on_book_update = self.on_limitless_update
+        if self.kalshi_client is not None:
+            self.kalshi_client.on_book_update = self.on_kalshi_update
         
         logger.info(f"OrderBookManager initialized for {len(self.market_info)} total markets.")
         
-        # Count common markets
-        common_count = sum(1 for info in self.market_info.values() if info['on_poly'] and info['on_limitless'])
-        if common_count > 0:
-            logger.info(f"✅ Cross-platform markets detected: {common_count} markets on both platforms.")
-        else:
+        # Count common markets (listed on Polymarket and the other venue), per venue
+        self.cross_slugs = {
+            venue: {slug for slug, info in self.market_info.items() if info['on_poly'] and info[f'on_{venue}']}
+            for venue in ('limitless', 'kalshi')
+        }
+        self.common_slugs = self.cross_slugs['limitless']
+        for venue, slugs in self.cross_slugs.items():
+            if slugs:
+                logger.info(f"✅ Cross-platform markets detected: {len(slugs)} markets on both Polymarket and {venue.capitalize()}.")
+        if not any(self.cross_slugs.values()):
             logger.warning("No common market slugs found for cross-platform arbitrage checks.")
 
     def update_order_books(self):
-        """Pulls the latest data from all clients and updates the internal structure."""
-        
-        # 1. Get Polymarket data (already running in the background via WebSocket)
-        poly_books_raw = self.polymarket_client.get_order_books()
+        """
+        Pulls the latest data from all clients and updates the internal structure.
         
-        # 2. Get Limitless data (via REST poll, or empty dict if client is None)
-        limitless_books_raw = {}
-        if self.limitless_client:
+        Venue clients keep one long-lived, sorted book per asset and update it in
+        place, so the combined view only has to link each market's books once.
+        Polymarket books are linked as soon as their first update arrives (see
+        on_polymarket_update). Limitless reports changed books back through
+        on_limitless_update; if its client is polling in the background
+        (LimitlessClient.start_polling) nothing is fetched here, otherwise this
+        call polls it synchronously.
+        """
+        if self.limitless_client and not getattr(self.limitless_client, "is_polling", False):
             try:
-                limitless_books_raw = self.limitless_client.fetch_all_order_books()
+                self.limitless_client.fetch_all_order_books()
             except Exception as e:
                 logger.error(f"Error fetching Limitless order books: {e}")
-                limitless_books_raw = {}
         
+        # Catch any Polymarket/Kalshi books that arrived before the callback was installed
+        if self._pending_poly:
+            for slug in list(self._pending_poly):
+                self._link_polymarket(slug)
+        if self._pending_kalshi:
+            for slug in list(self._pending_kalshi):
+                self.on_kalshi_update(self.kalshi_mapping[slug]['ticker'])
+
+    # ----------------------------------------------------------------------
+    # CHANGE TRACKING
+    # ----------------------------------------------------------------------
+
+    def on_polymarket_update(self, asset_id, received_at=None):
+        """
+        Called by PolymarketClient after an asset's book changed, with the
+        monotonic receive time of the frame that changed it.
+        """
+        slug = self._asset_to_slug.get(asset_id)
+        if slug is None:
+            return
+        if slug in self._pending_poly:
+            self._link_polymarket(slug, received_at)   # Marks the market dirty once linked
+            return
+        self.mark_dirty(slug, "polymarket", received_at)
+
+    def on_limitless_update(self, slug, received_at=None):
+        """Called by LimitlessClient after a pair's book changed."""
+        if slug in self._pending_limitless:
+            books = self.limitless_client.order_books
+            if slug not in books:
+                return
+            with self.lock:
+                self.combined_order_books[slug]['limitless'] = books[slug]
+                self._pending_limitless.discard(slug)
+        self.mark_dirty(slug, "limitless", received_at)
+
+    def on_kalshi_update(self, ticker, received_at=None):
+        """Called by KalshiClient after a ticker's book changed."""
+        slug = self._ticker_to_slug.get(ticker)
+        if slug is None:
+            return
+        if slug in self._pending_kalshi:
+            book = self.kalshi_client.get_book(ticker)
+            if book is None:
+                return
+            with self.lock:
+                self.combined_order_books[slug]['kalshi'] = book
+                self._pending_kalshi.discard(slug)
+        self.mark_dirty(slug, "kalshi", received_at)
+
+    def _link_polymarket(self, slug, received_at=None):
+        """Links a market's live YES/NO books into the combined view once both had a full snapshot."""
+        map_data = self.poly_mapping.get(slug)
+        if not map_data:
+            self._pending_poly.discard(slug)
+            return False
+        
+        client = self.polymarket_client
+        if not (client.has_snapshot(map_data['yes_token_id']) and client.has_snapshot(map_data['no_token_id'])):
+            return False
+        yes_book = client.get_book(map_data['yes_token_id'])
+        no_book = client.get_book(map_data['no_token_id'])
+        
+        with self.lock:
+            self.combined_order_books[slug]['polymarket'] = {
+                'yes': yes_book,
+                'no': no_book
+            }
+            self._pending_poly.discard(slug)
+        self.mark_dirty(slug, "polymarket", received_at)
+        return True
+
+    def mark_dirty(self, slug, venue=None, received_at=None):
+        """
+        Bumps a market's version and wakes the scan loop. self.lock only guards
+        the versions, the dirty set and the traces, so a venue callback running
+        off the loop (e.g. the synchronous Limitless fetch) can mark a market;
+        the books themselves are not locked and are only written on the loop.
+        
+        Args:
+            venue: Venue whose book changed (for tracing).
+            received_at: Monotonic receive time of the data that changed it (default: now).
+        """
+        changed_at = time.monotonic()
+        if received_at is None:
+            received_at = changed_at
+        elif self.metrics is not None:
+            self.metrics.observe_stage("ingest", venue, changed_at - received_at)
+        
+        with self.lock:
+            self.versions[slug] = self.versions.get(slug, 0) + 1
+            if slug not in self._dirty:
+                self._dirty.add(slug)
+                self._trace[slug] = (venue, received_at, changed_at)
+            if self._wake_scheduled or self._loop is None:
+                return
+            self._wake_scheduled = True
+        
+        if threading.get_ident() == self._loop_thread_id:
+            # Called from the event loop itself (e.g. the asyncio WebSocket client): wake directly
+            self._changed_event.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._changed_event.set)
+        except RuntimeError:
+            # Event loop already closed (shutdown)
+            pass
+
+    def get_version(self, slug):
+        return self.versions.get(slug, 0)
+
+    def get_trace(self, slug):
+        """
+        Returns (venue, received_at, changed_at) of the first change of a market
+        returned by the last drain_dirty, or None if it was not in that drain.
+        """
+        return self.last_trace.get(slug)
+
+    def drain_dirty(self):
+        """Returns and clears the set of markets changed since the last drain (their traces move to last_trace)."""
         with self.lock:
-            self.combined_order_books = {}  # Clear old data
-
-            for slug, info in self.market_info.items():
-                self.combined_order_books[slug] = {}
-                
-                # A. Process Polymarket Data
-                if info.get('on_poly'):
-                    map_data = self.poly_mapping.get(slug)
-                    if map_data:
-                        yes_id, no_id = map_data['yes_token_id'], map_data['no_token_id']
-                        
-                        yes_book = poly_books_raw.get(yes_id)
-                        no_book = poly_books_raw.get(no_id)
-                        
-                        if yes_book and no_book:
-                            self.combined_order_books[slug]['polymarket'] = {
-                                'yes': yes_book,
-                                'no': no_book
-                            }
-
-                # B. Process Limitless Data
-                if info.get('on_limitless') and slug in limitless_books_raw:
-                    limitless_book = limitless_books_raw.get(slug)
-                    
-                    if limitless_book:
-                        self.combined_order_books[slug]['limitless'] = {
-                            'yes': limitless_book.get('yes', {'bids': [], 'asks': []}),
-                            'no': limitless_book.get('no', {'bids': [], 'asks': []})
-                        }
+            dirty, self._dirty = self._dirty, set()
+            self.last_trace, self._trace = self._trace, {}
+            self._wake_scheduled = False
+            if self._changed_event is not None:
+                self._changed_event.clear()
+        return dirty
+
+    async def wait_for_changes(self, timeout=None):
+        """
+        Sleeps until at least one market is dirty (or the timeout expires) and
+        returns the drained dirty set, which may be empty on timeout.
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            self._changed_event = asyncio.Event()
+        
+        if not self._dirty:
+            try:
+                await asyncio.wait_for(self._changed_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.drain_dirty()
 
     def compare_specific_markets(self) -> Dict[str, Dict[str, Any]]:
         """
         Returns structured order book data for all markets, grouped by platform.
         
+        The returned dict is the live combined view: book sides are PriceLevels
+        that are already sorted best-first, so nothing is copied or sorted here.
+        Treat it as read-only, and only read it on the event loop that feeds
+        the books.
+        
         Output format:
         { 
           market_slug: { 
             "polymarket": { "yes": {...}, "no": {...} },
-            "limitless": { "yes": {...}, "no": {...} }
+            "limitless": { "yes": {...}, "no": {...} },
+            "kalshi": { "yes": {...}, "no": {...} }
           }
+        (a venue key is only present once that venue's book exists)
         }
         """
-        with self.lock:
-            structured = {}
-            for slug, platform_data in self.combined_order_books.items():
-                structured[slug] = {}
-                for platform, data in platform_data.items():
-                    structured[slug][platform] = {
-                        'yes': {
-                            'bids': sorted(data['yes'].get('bids', []), reverse=True),
-                            'asks': sorted(data['yes'].get('asks', []))
-                        },
-                        'no': {
-                            'bids': sorted(data['no'].get('bids', []), reverse=True),
-                            'asks': sorted(data['no'].get('asks', []))
-                        }
-                    }
-            return structured
+        return self.combined_order_books
     
     def get_market_info(self, market_slug):
         """Returns info dict for a specific market."""
@@ -140,10 +315,10 @@ class OrderBookManager:
         """Returns list of market slugs being tracked."""
         return list(self.market_info.keys())
     
-    def get_common_market_slugs(self):
+    def get_common_market_slugs(self, venue="limitless"):
         """
-        Returns a list of market slugs that exist on BOTH Polymarket and Limitless.
+        Returns a list of market slugs that exist on BOTH Polymarket and the
+        given venue ('limitless' or 'kalshi').
         This is needed for cross-platform arbitrage checks.
         """
-        return [slug for slug, info in self.market_info.items() 
-                if info.get('on_poly') and info.get('on_limitless')]
\ No newline at end of file
+        return list(self.cross_slugs.get(venue, ()))
\ No newline at end of file
@@ -0,0 +1,181 @@
+# File: data/poll_scheduler.py
+
+import heapq
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# --- SCHEDULER SETTINGS ---
+DEFAULT_MAX_RPS = 20.0          # Global request budget across all pairs
+DEFAULT_MIN_INTERVAL = 0.25     # Fastest a single pair is ever polled, in seconds
+DEFAULT_MAX_INTERVAL = 10.0     # Slowest a single pair is ever polled, in seconds
+VOLATILITY_ALPHA = 0.3          # EWMA weight of the newest mid-price move
+VOLATILITY_SCALE = 0.01         # A 1-cent average move per poll counts as fully "hot"
+QUIET_HORIZON = 30.0            # A pair unchanged for this long counts as fully "cold"
+PROXIMITY_SCALE = 0.05          # A pair within 5 cents of a profitable cross starts heating up
+
+
+class _PairState:
+    __slots__ = ("interval", "next_due", "last_change", "last_mid", "volatility", "gap", "in_flight", "polls")
+
+    def __init__(self, interval, now):
+        self.interval = interval
+        self.next_due = now
+        self.last_change = None     # Last time the book changed (the first poll only establishes it)
+        self.last_mid = None
+        self.volatility = 0.0
+        self.gap = None
+        self.in_flight = False
+        self.polls = 0
+
+
+class AdaptivePollScheduler:
+    """
+    Decides when each pair of a REST-only venue is polled next.
+
+    Every pair gets its own interval, interpolated (geometrically) between
+    min_interval and max_interval by a "heat" score in [0, 1], the maximum of:
+      - volatility: an EWMA of how far the pair's mid moved per poll,
+      - recency: how recently the pair's book last changed,
+      - proximity: how close the pair is to a profitable cross (the price gap
+        still missing after fees, as reported by the caller).
+
+    On top of that a token bucket enforces a global requests-per-second budget:
+    when more pairs are due than the budget allows, the most overdue go first
+    and the rest stay due for the next call.
+
+    All times are caller-supplied (e.g. loop.time()), so the scheduler does
+    no I/O and is easy to drive from an event loop.
+    """
+    def __init__(self, max_rps=DEFAULT_MAX_RPS, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL):
+        self.max_rps = max_rps
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.pairs = {}             # { key: _PairState }
+        self._heap = []             # (next_due, key), lazily invalidated
+        self._tokens = max_rps
+        self._refilled_at = None
+        self.requests_issued = 0
+
+    # ----------------------------------------------------------------------
+    # REGISTRATION
+    # ----------------------------------------------------------------------
+
+    def add(self, key, now):
+        """Registers a pair; it is due immediately."""
+        if key not in self.pairs:
+            self.pairs[key] = _PairState(self.min_interval, now)
+            heapq.heappush(self._heap, (now, key))
+
+    def remove(self, key):
+        self.pairs.pop(key, None)
+
+    # ----------------------------------------------------------------------
+    # SCHEDULING
+    # ----------------------------------------------------------------------
+
+    def take_due(self, now):
+        """
+        Returns the pairs to poll now (most overdue first), limited by the
+        request budget, and marks them in flight until record_result.
+        """
+        self._refill(now)
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now and self._tokens >= 1.0:
+            next_due, key = heapq.heappop(heap)
+            state = self.pairs.get(key)
+            if state is None or state.in_flight or state.next_due != next_due:
+                continue    # stale heap entry
+            state.in_flight = True
+            self._tokens -= 1.0
+            due.append(key)
+        self.requests_issued += len(due)
+        return due
+
+    def next_wakeup(self, now):
+        """Returns when take_due can next return something (a loop time, or None if nothing is scheduled)."""
+        heap = self._heap
+        while heap:
+            next_due, key = heap[0]
+            state = self.pairs.get(key)
+            if state is not None and not state.in_flight and state.next_due == next_due:
+                break
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        wakeup = heap[0][0]
+        if self._tokens < 1.0:
+            wakeup = max(wakeup, now + (1.0 - self._tokens) / self.max_rps)
+        return wakeup
+
+    def record_result(self, key, now, changed, mid=None, gap=None):
+        """
+        Feeds back the outcome of one poll and schedules the pair's next one.
+
+        Args:
+            key: The pair polled.
+            now: Completion time.
+            changed: Whether the pair's book changed.
+            mid: The book's new mid price (None if one side is empty).
+            gap: Price still missing (after fees) for a profitable cross; 0 or
+                less means a cross is profitable now, None means unknown.
+        """
+        state = self.pairs.get(key)
+        if state is None:
+            return
+        state.in_flight = False
+        state.polls += 1
+        if changed and state.polls > 1:
+            state.last_change = now
+        if mid is not None:
+            if state.last_mid is not None:
+                move = abs(mid - state.last_mid)
+                state.volatility += VOLATILITY_ALPHA * (move - state.volatility)
+            state.last_mid = mid
+        state.gap = gap
+
+        state.interval = self._interval_for(state, now)
+        state.next_due = now + state.interval
+        heapq.heappush(self._heap, (state.next_due, key))
+
+    def _interval_for(self, state, now):
+        volatility_heat = min(1.0, state.volatility / VOLATILITY_SCALE)
+        recency_heat = 0.0
+        if state.last_change is not None:
+            recency_heat = 1.0 - min(1.0, (now - state.last_change) / QUIET_HORIZON)
+        proximity_heat = 0.0
+        if state.gap is not None:
+            proximity_heat = 1.0 - min(1.0, max(0.0, state.gap) / PROXIMITY_SCALE)
+
+        heat = max(volatility_heat, recency_heat, proximity_heat)
+        return math.exp(math.log(self.max_interval) * (1.0 - heat) + math.log(self.min_interval) * heat)
+
+    def _refill(self, now):
+        if self._refilled_at is not None:
+            self._tokens = min(self.max_rps, self._tokens + (now - self._refilled_at) * self.max_rps)
+        self._refilled_at = now
+
+    # ----------------------------------------------------------------------
+    # STATS
+    # ----------------------------------------------------------------------
+
+    def get_interval(self, key):
+        state = self.pairs.get(key)
+        return state.interval if state else None
+
+    def stats(self):
+        """Summary of the current schedule: pair count, hot pairs and the implied request rate."""
+        intervals = [state.interval for state in self.pairs.values()]
+        if not intervals:
+            return {"pairs": 0, "hot": 0, "min_interval": 0.0, "max_interval": 0.0, "planned_rps": 0.0, "requests": self.requests_issued}
+        planned = sum(1.0 / interval for interval in intervals)
+        return {
+            "pairs": len(intervals),
+            "hot": sum(1 for interval in intervals if interval <= 2 * self.min_interval),
+            "min_interval": min(intervals),
+            "max_interval": max(intervals),
+            "planned_rps": min(planned, self.max_rps),
+            "requests": self.requests_issued,
+        }
@@ -0,0 +1,140 @@
+# File: data/price_levels.py
+
+import logging
+from bisect import bisect_left
+from itertools import accumulate
+from operator import mul
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PriceLevels:
+    """
+    One side (bids or asks) of an L2 order book, kept sorted at write time.
+
+    Sizes live in a {price: size} dict and the prices in an ascending list, so:
+      - modifying an existing level is an O(1) dict write,
+      - adding/removing a level is an O(log n) bisect plus one list memmove,
+      - the best level is O(1) (the end of the list for bids, the start for asks),
+      - cumulative depth (prefix sums of size and notional, for VWAP sizing)
+        is rebuilt on the first read after a change and cached until the next one.
+
+    The object behaves like a read-only list of (price, size) tuples ordered
+    best-first, so existing code that does `bids[0][0]`, `len(asks)` or
+    `for price, size in bids` keeps working without copying or sorting.
+    """
+    __slots__ = ("descending", "_sizes", "_prices", "_depth")
+
+    def __init__(self, descending: bool, levels: Iterable[Tuple[float, float]] = ()):
+        """
+        Args:
+            descending: True for bids (best = highest price), False for asks.
+            levels: Optional initial (price, size) levels in any order.
+        """
+        self.descending = descending
+        self._sizes: Dict[float, float] = {}
+        self._prices: List[float] = []
+        self._depth = None
+        if levels:
+            self.replace(levels)
+
+    # ----------------------------------------------------------------------
+    # WRITES
+    # ----------------------------------------------------------------------
+
+    def replace(self, levels: Iterable[Tuple[float, float]]):
+        """Replaces the whole side with a fresh snapshot (used for full 'book' messages)."""
+        self._sizes = {price: size for price, size in levels if size > 0}
+        self._prices = sorted(self._sizes)
+        self._depth = None
+
+    def replace_sizes(self, sizes: Dict[float, float]):
+        """
+        Replaces the whole side with a ready-made {price: size} dict of positive
+        sizes, taking ownership of it (no per-level tuples or copies).
+        """
+        self._sizes = sizes
+        self._prices = sorted(sizes)
+        self._depth = None
+
+    def set(self, price: float, size: float):
+        """Sets the aggregate size at a price level. A size of 0 removes the level."""
+        self._depth = None
+        if size > 0:
+            if price not in self._sizes:
+                prices = self._prices
+                prices.insert(bisect_left(prices, price), price)
+            self._sizes[price] = size
+        elif self._sizes.pop(price, None) is not None:
+            prices = self._prices
+            del prices[bisect_left(prices, price)]
+
+    def clear(self):
+        self._sizes.clear()
+        self._prices.clear()
+        self._depth = None
+
+    # ----------------------------------------------------------------------
+    # READS
+    # ----------------------------------------------------------------------
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        """Returns the best (price, size) level, or None if the side is empty."""
+        if not self._prices:
+            return None
+        price = self._prices[-1] if self.descending else self._prices[0]
+        return price, self._sizes.get(price, 0.0)
+
+    def size_at(self, price: float) -> float:
+        return self._sizes.get(price, 0.0)
+
+    def cumulative(self) -> Tuple[List[float], List[float], List[float]]:
+        """
+        Returns best-first (prices, cumulative sizes, cumulative notionals):
+        cumulative sizes[i] is the size of levels 0..i and cumulative
+        notionals[i] the sum of price * size over them. Cached until the next
+        write; callers must not modify the lists.
+        """
+        depth = self._depth
+        if depth is None:
+            prices = self._prices[::-1] if self.descending else self._prices[:]
+            sizes = list(map(self._sizes.__getitem__, prices))
+            depth = self._depth = (prices, list(accumulate(sizes)), list(accumulate(map(mul, prices, sizes))))
+        return depth
+
+    def __len__(self):
+        return len(self._prices)
+
+    def __bool__(self):
+        return bool(self._prices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+
+        n = len(self._prices)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("price level index out of range")
+
+        price = self._prices[n - 1 - index] if self.descending else self._prices[index]
+        return price, self._sizes.get(price, 0.0)
+
+    def __iter__(self):
+        sizes = self._sizes
+        prices = reversed(self._prices) if self.descending else self._prices
+        for price in prices:
+            yield price, sizes.get(price, 0.0)
+
+    def __eq__(self, other):
+        if isinstance(other, PriceLevels):
+            return self.descending == other.descending and self._sizes == other._sizes
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        side = "bids" if self.descending else "asks"
+        return f"PriceLevels({side}, {list(self)[:5]}{'...' if len(self) > 5 else ''})"
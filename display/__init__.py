@@ -0,0 +1,4 @@
+# display/__init__.py
+from .sink import DISPLAY_MODES, DisplaySink
+
+__all__ = ['DISPLAY_MODES', 'DisplaySink']
@@ -0,0 +1,176 @@
+# File: display/sink.py
+
+import logging
+import queue
+import shutil
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- DISPLAY SETTINGS ---
+DISPLAY_MODES = ("terminal", "headless")
+DEFAULT_MAX_FPS = 2.0           # Redraws per second, at most
+FULL_REPAINT_SECONDS = 5.0      # Redraw every row this often (log lines printed to the terminal shift the frame)
+
+# --- ANSI SEQUENCES ---
+_CLEAR_SCREEN = "\x1b[H\x1b[2J"
+_CLEAR_LINE_END = "\x1b[K"
+_CLEAR_SCREEN_END = "\x1b[J"
+_HIDE_CURSOR = "\x1b[?25l"
+_SHOW_CURSOR = "\x1b[?25h"
+
+_STOP = object()
+
+
+def _move_to(row):
+    return f"\x1b[{row + 1};1H"
+
+
+class DisplaySink:
+    """
+    Draws the bot's opportunities to the terminal from a background thread.
+
+    The detection loop only calls submit(), which puts a shallow copy of the
+    opportunities on a one-slot queue (a newer copy replaces one that was not
+    drawn yet) and returns. Ranking, formatting and terminal I/O all happen
+    on the display thread, at most `max_fps` times per second. Every frame is
+    diffed against the previous one and only the rows that changed are
+    rewritten in place (ANSI cursor moves), in a single write.
+
+    In "headless" mode no thread is started and submit() returns right away,
+    so nothing but the logs reaches the terminal.
+    """
+    def __init__(self, render, mode="terminal", max_fps=DEFAULT_MAX_FPS, stream=None):
+        """
+        Args:
+            render: Callable(opportunities) -> list of text lines, run on the display thread
+                (e.g. ArbitrageBot.format_opportunities).
+            mode: "terminal" or "headless".
+            max_fps: Max redraws per second.
+            stream: Where frames are written (default: sys.stdout).
+        """
+        if mode not in DISPLAY_MODES:
+            raise ValueError(f"Unknown display mode '{mode}', expected one of {DISPLAY_MODES}")
+        self.render = render
+        self.mode = mode
+        self.frame_interval = 1.0 / max_fps
+        self.stream = stream if stream is not None else sys.stdout
+
+        self.frames_drawn = 0
+        self.frames_dropped = 0     # Submitted states replaced before they were drawn
+        self._rows = None           # Lines currently on screen (None = unknown, repaint everything)
+        self._width = None
+        self._next_repaint = 0.0
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = None
+
+    @property
+    def headless(self):
+        return self.mode == "headless"
+
+    def start(self):
+        if not self.headless and self._thread is None:
+            self._thread = threading.Thread(target=self._draw_forever, name="display", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Draws nothing more, restores the cursor and waits for the display thread."""
+        if self._thread is not None:
+            self._put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    # ----------------------------------------------------------------------
+    # DETECTION SIDE
+    # ----------------------------------------------------------------------
+
+    def submit(self, opportunities):
+        """Hands the latest opportunities to the display thread. Never blocks."""
+        if self._thread is not None:
+            self._put(list(opportunities))
+
+    def _put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.frames_dropped += 1
+                except queue.Empty:
+                    pass
+
+    # ----------------------------------------------------------------------
+    # DISPLAY THREAD
+    # ----------------------------------------------------------------------
+
+    def _draw_forever(self):
+        self._write(_HIDE_CURSOR)
+        next_frame = 0.0
+        try:
+            while True:
+                item = self._queue.get()
+                wait = next_frame - time.monotonic()
+                if wait > 0 and item is not _STOP:
+                    # Frame rate cap: anything submitted meanwhile replaces this state
+                    time.sleep(wait)
+                    try:
+                        item = self._queue.get_nowait()
+                        self.frames_dropped += 1
+                    except queue.Empty:
+                        pass
+                if item is _STOP:
+                    return
+                next_frame = time.monotonic() + self.frame_interval
+                try:
+                    self._draw(self.render(item))
+                except Exception as e:
+                    logger.error(f"Failed to draw the display: {e}")
+        finally:
+            self._write(_SHOW_CURSOR)
+
+    def _draw(self, lines):
+        size = shutil.get_terminal_size()
+        lines = self._fit(lines, size.columns, size.lines)
+
+        now = time.monotonic()
+        previous = self._rows
+        parts = []
+        if previous is None or size.columns != self._width or now >= self._next_repaint:
+            parts.append(_CLEAR_SCREEN)
+            previous = []
+            self._width = size.columns
+            self._next_repaint = now + FULL_REPAINT_SECONDS
+
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                parts.append(f"{_move_to(row)}{line}{_CLEAR_LINE_END}")
+        if len(lines) < len(previous):
+            parts.append(f"{_move_to(len(lines))}{_CLEAR_SCREEN_END}")
+
+        if parts:
+            # Park the cursor under the frame, where log lines will be printed
+            parts.append(_move_to(len(lines)))
+            self._write("".join(parts))
+        self._rows = lines
+        self.frames_drawn += 1
+
+    @staticmethod
+    def _fit(lines, width, height):
+        """Cuts the frame to the terminal, so every line stays on its own row."""
+        max_rows = max(height - 1, 1)
+        if len(lines) > max_rows:
+            hidden = len(lines) - max_rows + 1
+            lines = lines[:max_rows - 1] + [f"... {hidden} more lines"]
+        return [line[:width - 1] for line in lines]
+
+    def _write(self, text):
+        try:
+            self.stream.write(text)
+            self.stream.flush()
+        except (OSError, ValueError):
+            pass
@@ -1,14 +1,30 @@
 import requests
 import logging
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http_session import MAX_RETRIES, create_session, get_with_retry
+from market_cache import parse_timestamp
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
-GAMMA_BASE_URL = "https://gamma-api.polymarket.com"
-CLOB_BASE_URL = "https://clob.polymarket.com"
+# Overridable from the environment, e.g. to point discovery at the local mocks (python -m mocks)
+GAMMA_BASE_URL = os.getenv("GAMMA_BASE_URL", "https://gamma-api.polymarket.com")
+CLOB_BASE_URL = os.getenv("CLOB_BASE_URL", "https://clob.polymarket.com")
+
+# Concurrent discovery settings
+DEFAULT_CONCURRENCY = 16      # Max in-flight /markets/{id} requests
+PROGRESS_LOG_EVERY = 500      # Log a progress line every N completed markets
+LIST_PAGE_SIZE = 500          # Markets per page when paging the /markets list
+INCREMENTAL_PAGE_SIZE = 100   # Markets per page when pulling recent changes for the cache
+CACHE_VENUE = "polymarket"    # Venue key used in the on-disk MarketCache
+EVENT_CACHE_VENUE = "polymarket_events"  # Cached negRisk event members, keyed by event id
+EVENT_CACHE_MAX_AGE_SECONDS = 60 * 60    # Re-fetch an event's members once they are older than this
+
 
 def get_orderbook_prices(token_id):
     """
@@ -37,51 +53,200 @@ def get_orderbook_prices(token_id):
         return None, None
 
 
-def fetch_market_details(market_id):
+def parse_market(market_data):
+    """
+    Normalizes a raw Gamma market object (from either /markets or /markets/{id})
+    into the dictionary used throughout discovery.
+    Returns None if the token IDs cannot be parsed.
+    """
+    market_id = market_data.get('id')
+    
+    # Parse token IDs if they're JSON strings
+    clob_token_ids = market_data.get('clobTokenIds')
+    if isinstance(clob_token_ids, str):
+        try:
+            clob_token_ids = json.loads(clob_token_ids)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse clobTokenIds for market {market_id}")
+            return None
+    
+    # Parse outcomes if they're JSON strings
+    outcomes = market_data.get('outcomes', [])
+    if isinstance(outcomes, str):
+        try:
+            outcomes = json.loads(outcomes)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse outcomes for market {market_id}")
+            outcomes = []
+    
+    # A market belongs to (at most) one event; negRisk events group mutually exclusive markets
+    events = market_data.get('events') or []
+    event = events[0] if events else {}
+    
+    return {
+        'id': market_data.get('id'),
+        'question': market_data.get('question'),
+        'slug': market_data.get('slug'),
+        'outcomes': outcomes,
+        'clobTokenIds': clob_token_ids,
+        'active': market_data.get('active', False),
+        'closed': market_data.get('closed', True),
+        'liquidity': market_data.get('liquidityNum') or 0,
+        'volume24hr': market_data.get('volume24hr') or 0,
+        'updatedAt': market_data.get('updatedAt'),
+        'endDate': market_data.get('endDate'),
+        'groupItemTitle': market_data.get('groupItemTitle'),
+        'eventId': event.get('id'),
+        'eventSlug': event.get('slug'),
+        'eventTitle': event.get('title'),
+        'negRisk': bool(market_data.get('negRisk') or event.get('negRisk')),
+        'negRiskAugmented': bool(event.get('negRiskAugmented'))
+    }
+
+
+def fetch_market_details(market_id, session=None, max_retries=MAX_RETRIES):
     """
     Fetches detailed market data including token IDs for a single market.
     Returns a dictionary with market info, or None on error.
+    
+    Args:
+        market_id: The Gamma market ID.
+        session: Optional pooled requests.Session (see create_session).
+        max_retries: Attempts before the market is given up on.
     """
     market_detail_url = f"{GAMMA_BASE_URL}/markets/{market_id}"
     
     try:
-        response = requests.get(market_detail_url, timeout=10)
-        response.raise_for_status()
+        response = get_with_retry(market_detail_url, session=session, max_retries=max_retries)
         market_data = response.json()
         
-        # Parse token IDs if they're JSON strings
-        clob_token_ids = market_data.get('clobTokenIds')
-        if isinstance(clob_token_ids, str):
-            try:
-                clob_token_ids = json.loads(clob_token_ids)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse clobTokenIds for market {market_id}")
-                return None
-        
-        # Parse outcomes if they're JSON strings
-        outcomes = market_data.get('outcomes', [])
-        if isinstance(outcomes, str):
-            try:
-                outcomes = json.loads(outcomes)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse outcomes for market {market_id}")
-                outcomes = []
-        
-        return {
-            'id': market_data.get('id'),
-            'question': market_data.get('question'),
-            'slug': market_data.get('slug'),
-            'outcomes': outcomes,
-            'clobTokenIds': clob_token_ids,
-            'active': market_data.get('active', False),
-            'closed': market_data.get('closed', True),
-            'liquidity': market_data.get('liquidityNum', 0),
-            'volume24hr': market_data.get('volume24hr', 0)
-        }
+        return parse_market(market_data)
         
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching market {market_id}: {e}")
         return None
+    except ValueError as e:
+        logger.error(f"Error parsing market {market_id}: {e}")
+        return None
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def fetch_market_details_concurrent(market_ids, concurrency=DEFAULT_CONCURRENCY, max_retries=MAX_RETRIES):
+    """
+    Fetches market details for many markets using a bounded worker pool that
+    shares one keep-alive session.
+    
+    Args:
+        market_ids: Iterable of Gamma market IDs.
+        concurrency: Maximum number of requests in flight at once.
+        max_retries: Attempts per market before it is counted as failed.
+    
+    Returns:
+        List of market detail dictionaries (failed markets are omitted).
+    """
+    market_ids = list(market_ids)
+    total = len(market_ids)
+    if total == 0:
+        return []
+    
+    concurrency = max(1, int(concurrency))
+    session = create_session(pool_size=concurrency)
+    results = []
+    latencies = []
+    failures = 0
+    
+    def timed_fetch(market_id):
+        start = time.perf_counter()
+        details = fetch_market_details(market_id, session=session, max_retries=max_retries)
+        return details, time.perf_counter() - start
+    
+    logger.info(f"Fetching details for {total} markets with concurrency={concurrency}...")
+    started = time.perf_counter()
+    
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(timed_fetch, market_id) for market_id in market_ids]
+            
+            for done, future in enumerate(as_completed(futures), start=1):
+                details, latency = future.result()
+                latencies.append(latency)
+                
+                if details:
+                    results.append(details)
+                else:
+                    failures += 1
+                
+                if done % PROGRESS_LOG_EVERY == 0 and done < total:
+                    elapsed = time.perf_counter() - started
+                    logger.info(f"Progress: {done}/{total} markets ({done / elapsed:.1f} req/s, {failures} failed)")
+    finally:
+        session.close()
+    
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    logger.info(
+        f"Fetched {len(results)}/{total} markets in {elapsed:.2f}s "
+        f"({total / elapsed if elapsed > 0 else 0:.1f} req/s, {failures} failed) | "
+        f"latency p50={_percentile(latencies, 50) * 1000:.0f}ms "
+        f"p95={_percentile(latencies, 95) * 1000:.0f}ms "
+        f"max={latencies[-1] * 1000:.0f}ms"
+    )
+    return results
+
+
+def _to_bot_mapping_entry(market_details):
+    """
+    Converts a parsed market into the bot's mapping entry.
+    Returns None for anything that is not a binary (Yes/No) market.
+    """
+    if not market_details or not market_details.get('clobTokenIds'):
+        return None
+        
+    # Only process binary markets (2 outcomes)
+    if len(market_details.get('outcomes', [])) != 2 or len(market_details.get('clobTokenIds', [])) != 2:
+        return None
+        
+    outcomes = market_details['outcomes']
+    token_ids = market_details['clobTokenIds']
+    
+    # Determine which token is YES and which is NO (same logic as before)
+    yes_idx = 0
+    no_idx = 1
+    for i, outcome in enumerate(outcomes):
+        outcome_lower = str(outcome).lower()
+        if outcome_lower == 'yes':
+            yes_idx = i
+            no_idx = 1 - i
+        elif outcome_lower == 'no':
+            no_idx = i
+            yes_idx = 1 - i
+    
+    entry = {
+        "question": market_details['question'],
+        "yes_token_id": token_ids[yes_idx],
+        "no_token_id": token_ids[no_idx],
+        "liquidity": market_details.get('liquidity', 0),
+        "volume24hr": market_details.get('volume24hr', 0)
+    }
+    # Used to match the market to other venues' listings (see matching/)
+    if market_details.get('endDate'):
+        entry["end_date"] = market_details['endDate']
+    if market_details.get('groupItemTitle'):
+        entry["outcome_title"] = market_details['groupItemTitle']
+    # Members of a negRisk event: exactly one of them resolves YES (see arbitrage/event_index.py)
+    if market_details.get('negRisk') and market_details.get('eventId'):
+        entry["event_id"] = market_details['eventId']
+        entry["event_slug"] = market_details.get('eventSlug') or market_details['eventId']
+        entry["event_title"] = market_details.get('eventTitle') or entry["event_slug"]
+        entry["neg_risk_augmented"] = market_details.get('negRiskAugmented', False)
+    return entry
 
 
 def fetch_event_markets(event_slug, min_liquidity=0, only_active=True):
@@ -131,15 +296,10 @@ def fetch_event_markets(event_slug, min_liquidity=0, only_active=True):
     
     # Step 3: Fetch detailed data for each market
     detailed_markets = []
+    market_ids = [m.get('id') for m in all_markets if m.get('id')]
     
-    for market_summary in all_markets:
-        market_id = market_summary.get('id')
-        if not market_id:
-            continue
-            
-        market_details = fetch_market_details(market_id)
-        
-        if market_details and market_details.get('clobTokenIds'):
+    for market_details in fetch_market_details_concurrent(market_ids):
+        if market_details.get('clobTokenIds'):
             # Apply filters
             if min_liquidity > 0 and market_details.get('liquidity', 0) < min_liquidity:
                 continue
@@ -150,67 +310,169 @@ def fetch_event_markets(event_slug, min_liquidity=0, only_active=True):
     return detailed_markets
 
 
-def get_market_mapping_for_bot(market_ids=None, min_liquidity=0):
+def fetch_event_member_markets(event_id, session=None):
+    """
+    Fetches every active, non-closed market of one event (any liquidity),
+    paging the /markets list until a short page.
+    Returns a list of parsed markets, or None if any page failed (a partial
+    list would make the event look complete).
+    """
+    params = {"event_id": event_id, "closed": "false", "active": "true"}
+    markets = []
+    try:
+        for markets_list in iter_market_pages(params, session=session, raise_errors=True):
+            for raw_market in markets_list:
+                if raw_market.get('active', False) and not raw_market.get('closed', True):
+                    market = parse_market(raw_market)
+                    if market:
+                        markets.append(market)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.warning(f"Error fetching the markets of event {event_id}: {e}")
+        return None
+    return markets
+
+
+def _cached_event_members(cache, event_id, slugs):
+    """
+    Returns the cached members of an event, or None if they must be re-fetched:
+    nothing cached, older than EVENT_CACHE_MAX_AGE_SECONDS, or missing one of
+    the event's markets already in the mapping (a member added since).
+    """
+    if cache is None:
+        return None
+    record = cache.records(EVENT_CACHE_VENUE).get(str(event_id))
+    if not record or time.time() - record.get("fetched_at", 0) >= EVENT_CACHE_MAX_AGE_SECONDS:
+        return None
+    members = record.get("members", [])
+    if not slugs <= {m['slug'] for m in members}:
+        return None
+    return members
+
+
+def complete_neg_risk_events(mapping, concurrency=DEFAULT_CONCURRENCY, cache=None):
+    """
+    Adds the missing members of every negRisk event in the mapping, whatever
+    their liquidity, so an event's outcomes can be traded as a basket, and
+    stamps each member with its event's active market count (event_size).
+    Events that could not be fetched keep no event_size, which marks them
+    incomplete (see arbitrage/event_index.py).
+    
+    Args:
+        mapping: The bot mapping (see get_market_mapping_for_bot), updated in place.
+        concurrency: Maximum number of event requests in flight at once.
+        cache: Optional MarketCache. Event members fetched within
+            EVENT_CACHE_MAX_AGE_SECONDS are served from it instead of re-fetched
+            (not saved here; the caller saves it).
+    
+    Returns:
+        The number of markets added.
+    """
+    event_slugs = {}
+    for slug, entry in mapping.items():
+        if entry.get("event_id"):
+            event_slugs.setdefault(str(entry["event_id"]), set()).add(slug)
+    if not event_slugs:
+        return 0
+    
+    started = time.perf_counter()
+    members_of = {}
+    for event_id, slugs in event_slugs.items():
+        members = _cached_event_members(cache, event_id, slugs)
+        if members is not None:
+            members_of[event_id] = members
+    to_fetch = [event_id for event_id in event_slugs if event_id not in members_of]
+    
+    failed = 0
+    if to_fetch:
+        concurrency = max(1, int(concurrency))
+        session = create_session(pool_size=concurrency)
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {executor.submit(fetch_event_member_markets, event_id, session): event_id for event_id in to_fetch}
+                for future in as_completed(futures):
+                    event_id = futures[future]
+                    members = future.result()
+                    if members is None:
+                        failed += 1
+                        continue
+                    members_of[event_id] = members
+                    if cache is not None:
+                        cache.upsert(EVENT_CACHE_VENUE, event_id, {"fetched_at": time.time(), "members": members})
+        finally:
+            session.close()
+    
+    if cache is not None:
+        # Events no longer in the mapping (resolved, or below the liquidity filter)
+        for event_id in list(cache.records(EVENT_CACHE_VENUE)):
+            if event_id not in event_slugs:
+                cache.remove(EVENT_CACHE_VENUE, event_id)
+    
+    added = 0
+    for members in members_of.values():
+        entries = {m['slug']: _to_bot_mapping_entry(m) for m in members}
+        entries = {slug: entry for slug, entry in entries.items() if entry and entry.get("event_id")}
+        for slug, entry in entries.items():
+            if slug not in mapping:
+                mapping[slug] = entry
+                added += 1
+            mapping[slug]["event_size"] = len(entries)
+    
+    logger.info(f"Completed {len(event_slugs) - failed}/{len(event_slugs)} negRisk events with {added} more markets "
+                f"({len(event_slugs) - len(to_fetch)} from cache, {len(to_fetch)} fetched) "
+                f"in {time.perf_counter() - started:.2f}s.")
+    return added
+
+
+def get_market_mapping_for_bot(market_ids=None, min_liquidity=0, concurrency=DEFAULT_CONCURRENCY, cache=None,
+                               complete_events=False):
     """
     Fetches markets and formats them for the bot's POLYMARKET_MAPPING structure.
-    Only includes binary (Yes/No) markets.
+    Only includes binary (Yes/No) markets; members of negRisk events also
+    carry their event (event_id, event_slug, event_title).
     
     Args:
         market_ids: A list of market IDs to scan. If None or empty, all active Polymarket IDs are fetched.
         min_liquidity: Minimum liquidity filter.
+        concurrency: Maximum number of market detail requests in flight at once
+            (only used when explicit market_ids are given).
+        cache: Optional MarketCache. When given, the full-universe scan is served
+            from the cache and only markets updated since the last run are re-fetched.
+        complete_events: Also fetch every member of the negRisk events found
+            (see complete_neg_risk_events; members are cached too when cache is given).
         
     Returns:
         The bot-ready market mapping dictionary.
     """
-    # 1. Determine which markets to scan
+    # 1. Bulk path: build the mapping straight from the paged /markets list.
+    # The list payload already carries tokens, outcomes and liquidity, so no
+    # per-market detail request is needed.
     if not market_ids:
-        market_ids = fetch_all_active_market_ids()
+        if cache is not None:
+            markets = refresh_market_cache(cache, min_liquidity=min_liquidity)
+        else:
+            markets = fetch_active_markets(min_liquidity=min_liquidity)
+    else:
+        # 2. Explicit IDs: fetch detailed data for each market concurrently
+        markets = fetch_market_details_concurrent(market_ids, concurrency=concurrency)
     
-    if not market_ids:
-        logger.error("No market IDs to process.")
+    if not markets:
+        logger.error("No markets to process.")
         return {}
         
-    # 2. Fetch detailed data for each market
     mapping = {}
     
-    for market_id in market_ids:
-        market_details = fetch_market_details(market_id)
-        
-        if not market_details or not market_details.get('clobTokenIds'):
-            continue
-            
+    for market_details in markets:
         # Apply filters
         if min_liquidity > 0 and market_details.get('liquidity', 0) < min_liquidity:
             continue
-            
-        # Only process binary markets (2 outcomes)
-        if len(market_details.get('outcomes', [])) != 2 or len(market_details.get('clobTokenIds', [])) != 2:
-            continue
-            
-        outcomes = market_details['outcomes']
-        token_ids = market_details['clobTokenIds']
-        
-        # Determine which token is YES and which is NO (same logic as before)
-        yes_idx = 0
-        no_idx = 1
-        for i, outcome in enumerate(outcomes):
-            outcome_lower = str(outcome).lower()
-            if outcome_lower == 'yes':
-                yes_idx = i
-                no_idx = 1 - i
-            elif outcome_lower == 'no':
-                no_idx = i
-                yes_idx = 1 - i
         
-        mapping[market_details['slug']] = {
-            "question": market_details['question'],
-            "yes_token_id": token_ids[yes_idx],
-            "no_token_id": token_ids[no_idx],
-            "liquidity": market_details.get('liquidity', 0),
-            "volume24hr": market_details.get('volume24hr', 0)
-        }
+        entry = _to_bot_mapping_entry(market_details)
+        if entry:
+            mapping[market_details['slug']] = entry
 
     logger.info(f"Successfully processed {len(mapping)} binary markets matching criteria.")
+    if complete_events:
+        complete_neg_risk_events(mapping, concurrency=concurrency, cache=cache)
     return mapping    
 
     markets = fetch_event_markets(event_slug, min_liquidity=min_liquidity)
@@ -247,45 +509,202 @@ def get_market_mapping_for_bot(market_ids=None, min_liquidity=0):
         }
     
     return mapping
-def fetch_all_active_market_ids():
+def iter_market_pages(params=None, page_size=LIST_PAGE_SIZE, session=None, raise_errors=False):
     """
-    Fetches the IDs of all active, non-closed markets on Polymarket.
-    This is necessary because the /markets endpoint typically requires filters.
+    Pages through the Gamma /markets list endpoint using limit/offset and
+    yields each page as a list of raw market objects.
+    
+    Args:
+        params: Extra query parameters (filters) applied to every page.
+        page_size: Number of markets requested per page.
+        session: Optional pooled requests.Session.
+        raise_errors: Re-raise a failed request instead of logging it and
+            ending the iteration, for callers that must not act on a partial list.
     """
-    all_market_ids = set()
-    page = 1
-    page_size = 50 # Standard limit for many APIs
-
-    logger.info("Fetching list of all active market IDs...")
+    markets_url = f"{GAMMA_BASE_URL}/markets"
+    offset = 0
     
-    # Loop until no more markets are returned
     while True:
+        page_params = dict(params or {})
+        page_params.update({"limit": page_size, "offset": offset})
+        
         try:
-            # We use a broad search to retrieve all active markets
-            markets_url = f"{GAMMA_BASE_URL}/markets?closed=false&page={page}&per_page={page_size}"
-            response = requests.get(markets_url, timeout=10)
-            response.raise_for_status()
-            
+            response = get_with_retry(markets_url, session=session, params=page_params)
             markets_data = response.json()
-            # The API response structure might contain a 'markets' key or be a list itself
-            markets_list = markets_data if isinstance(markets_data, list) else markets_data.get('markets', [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error fetching markets list at offset {offset}: {e}")
+            return
+        
+        # The API response structure might contain a 'markets' key or be a list itself
+        markets_list = markets_data if isinstance(markets_data, list) else markets_data.get('markets', [])
+        
+        if not markets_list:
+            return # Exit the loop if no markets were returned
+        
+        yield markets_list
+        
+        # Check if we've reached the end of the results
+        if len(markets_list) < page_size:
+            return
+        
+        offset += len(markets_list)
+
+
+def fetch_active_markets(min_liquidity=0, page_size=LIST_PAGE_SIZE):
+    """
+    Fetches every active, non-closed market in bulk from the paged /markets list.
+    The closed/active and liquidity filters are applied server-side, so only
+    markets we would keep are transferred.
+    
+    Args:
+        min_liquidity: Minimum liquidity filter (pushed down as liquidity_num_min).
+        page_size: Number of markets requested per page.
+    
+    Returns:
+        List of parsed market dictionaries (see parse_market).
+    """
+    params = {"closed": "false", "active": "true"}
+    if min_liquidity > 0:
+        params["liquidity_num_min"] = min_liquidity
+    
+    logger.info(f"Fetching active markets in bulk (min liquidity ${min_liquidity:,.0f})...")
+    started = time.perf_counter()
+    markets = []
+    pages = 0
+    
+    with create_session(pool_size=1) as session:
+        for markets_list in iter_market_pages(params, page_size=page_size, session=session):
+            pages += 1
+            for raw_market in markets_list:
+                if not raw_market.get('active', False) or raw_market.get('closed', True):
+                    continue
+                market = parse_market(raw_market)
+                if market:
+                    markets.append(market)
+    
+    logger.info(f"Fetched {len(markets)} active markets in {pages} requests ({time.perf_counter() - started:.2f}s).")
+    return markets
 
-            if not markets_list:
-                break # Exit the loop if no markets were returned
 
-            for market in markets_list:
-                if market.get('active', False) and not market.get('closed', True):
-                    all_market_ids.add(market['id'])
+def refresh_market_cache(cache, min_liquidity=0):
+    """
+    Brings the cached Polymarket universe up to date and returns the active markets.
+    
+    Cold start (empty, stale, or filtered more strictly than requested): a full
+    bulk download replaces the cache. Warm start: the /markets list is paged in
+    updatedAt-descending order (without the closed filter, so closures are seen
+    too) until records older than the newest cached updatedAt are reached. The
+    first page is revalidated with its ETag, so an unchanged universe costs a
+    single 304 response. The ETag and the newest updatedAt are only stored once
+    the paging reached known records, so an interrupted refresh is redone.
+    
+    Args:
+        cache: A MarketCache instance (not saved here; the caller saves it).
+        min_liquidity: Minimum liquidity filter.
+    
+    Returns:
+        List of parsed market dictionaries (see parse_market).
+    """
+    cached_min_liquidity = cache.get_meta(CACHE_VENUE, "min_liquidity")
+    
+    if (not cache.is_fresh(CACHE_VENUE)
+            or cached_min_liquidity is None
+            or cached_min_liquidity > min_liquidity):
+        markets = fetch_active_markets(min_liquidity=min_liquidity)
+        if markets:
+            cache.replace_all(CACHE_VENUE, {m['id']: m for m in markets})
+            cache.set_meta(CACHE_VENUE, "high_water", max(parse_timestamp(m.get('updatedAt')) for m in markets))
+            cache.set_meta(CACHE_VENUE, "min_liquidity", min_liquidity)
+            cache.set_meta(CACHE_VENUE, "full_sync_at", time.time())
+            cache.set_meta(CACHE_VENUE, "list_etag", None)
+        return markets
+    
+    started = time.perf_counter()
+    high_water = cache.get_meta(CACHE_VENUE, "high_water", 0)
+    new_high_water = high_water
+    markets_url = f"{GAMMA_BASE_URL}/markets"
+    params = {"order": "updatedAt", "ascending": "false", "limit": INCREMENTAL_PAGE_SIZE, "offset": 0}
+    changed = removed = requests_made = 0
+    completed = False       # Paged down to known records (or got a 304): only then is the refresh complete
+    validators = None       # First page response, whose ETag is only stored once the refresh completed
+    
+    with create_session(pool_size=1) as session:
+        while True:
+            # Only the first page is revalidated: its ETag changes whenever any market changes
+            headers = cache.conditional_headers(CACHE_VENUE) if params["offset"] == 0 else None
+            try:
+                response = get_with_retry(markets_url, session=session, params=params, headers=headers)
+                requests_made += 1
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Incremental market refresh failed, serving cached data: {e}")
+                break
             
-            # Check if we've reached the end of the results
-            if len(markets_list) < page_size:
+            if response.status_code == 304:
+                completed = True
+                break
+            if params["offset"] == 0:
+                validators = response
+            
+            try:
+                markets_data = response.json()
+            except ValueError as e:
+                logger.error(f"Error parsing incremental market refresh: {e}")
                 break
+            markets_list = markets_data if isinstance(markets_data, list) else markets_data.get('markets', [])
+            
+            reached_known = False
+            for raw_market in markets_list:
+                updated_at = parse_timestamp(raw_market.get('updatedAt'))
+                if updated_at <= high_water:
+                    reached_known = True
+                    break
+                new_high_water = max(new_high_water, updated_at)
                 
-            page += 1
+                if raw_market.get('active', False) and not raw_market.get('closed', True):
+                    market = parse_market(raw_market)
+                    if market:
+                        cache.upsert(CACHE_VENUE, market['id'], market)
+                        changed += 1
+                else:
+                    cache.remove(CACHE_VENUE, raw_market.get('id'))
+                    removed += 1
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching active market IDs on page {page}: {e}")
-            break
+            if reached_known or len(markets_list) < INCREMENTAL_PAGE_SIZE:
+                completed = True
+                break
+            params["offset"] += len(markets_list)
+    
+    if completed:
+        if validators is not None:
+            cache.store_validators(CACHE_VENUE, validators)
+        cache.set_meta(CACHE_VENUE, "high_water", new_high_water)
+    else:
+        # Older changes were not reached: keep the old high-water mark and ETag so the next run pages them again
+        logger.warning("Incremental market refresh incomplete, it will be retried from the same point next run.")
+    markets = [m for m in cache.records(CACHE_VENUE).values() if m.get('liquidity', 0) >= min_liquidity]
+    logger.info(
+        f"Market cache refreshed in {(time.perf_counter() - started) * 1000:.0f}ms with {requests_made} requests: "
+        f"{changed} updated, {removed} removed, {len(markets)} active markets."
+    )
+    return markets
+
+
+def fetch_all_active_market_ids():
+    """
+    Fetches the IDs of all active, non-closed markets on Polymarket.
+    This is necessary because the /markets endpoint typically requires filters.
+    """
+    all_market_ids = set()
+
+    logger.info("Fetching list of all active market IDs...")
+    
+    # We use a broad search to retrieve all active markets
+    for markets_list in iter_market_pages({"closed": "false", "active": "true"}):
+        for market in markets_list:
+            if market.get('active', False) and not market.get('closed', True):
+                all_market_ids.add(market['id'])
             
     logger.info(f"Found {len(all_market_ids)} total active market IDs.")
     return list(all_market_ids)
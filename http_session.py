@@ -0,0 +1,55 @@
+# File: http_session.py
+
+import logging
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# --- HTTP SETTINGS ---
+DEFAULT_POOL_SIZE = 16        # Keep-alive connections kept per host
+MAX_RETRIES = 3               # Attempts per request before giving up
+RETRY_BACKOFF_SECONDS = 0.5   # Base delay, doubled after every failed attempt
+REQUEST_TIMEOUT = 10
+
+# Status codes worth retrying (rate limiting and transient server errors)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    Creates a requests.Session whose connection pool is large enough to keep
+    one keep-alive connection per worker, so concurrent fetches reuse sockets
+    instead of paying a TCP/TLS handshake per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_with_retry(url, session=None, params=None, headers=None, max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF_SECONDS):
+    """
+    GETs a URL, retrying connection errors and retryable status codes with
+    exponential backoff. Returns the response or raises the last error.
+    """
+    http = session or requests
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            response = http.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries:
+                raise requests.exceptions.HTTPError(f"{response.status_code} for {url}", response=response)
+            response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            if attempt >= max_retries or (status is not None and status not in RETRYABLE_STATUS_CODES):
+                raise
+            delay = backoff * (2 ** (attempt - 1))
+            logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt}/{max_retries}): {e}")
+            time.sleep(delay)
@@ -1,27 +1,93 @@
 import asyncio
 import json
 import base64
+import logging
 import time
 import os
 from dotenv import load_dotenv # type: ignore
 from cryptography.hazmat.primitives import serialization, hashes # type: ignore
 from cryptography.hazmat.primitives.asymmetric import padding # type: ignore
 import websockets # type: ignore
+from data.price_levels import PriceLevels
+
+logger = logging.getLogger(__name__)
+
+# --- CONNECTION SETTINGS ---
+KALSHI_PRODUCTION_WS_URL = "wss://api.elections.kalshi.com/trade-api/ws/v2"
+KALSHI_WS_URL = os.getenv("KALSHI_WS_URL", KALSHI_PRODUCTION_WS_URL)
+KALSHI_WS_PATH = "/trade-api/ws/v2"
+SUBSCRIBE_BATCH_SIZE = 200    # Tickers per subscribe command
+RECONNECT_DELAY = 1.0         # First reconnect delay in seconds...
+MAX_RECONNECT_DELAY = 30.0    # ...doubled after each failure up to this cap
 
 class KalshiClient:
-    def __init__(self):
+    """
+    Kalshi order book client (orderbook_delta channel), native to asyncio.
+
+    Kalshi quotes in cents and only publishes bids: "yes" levels are YES bids
+    and "no" levels are NO bids. A NO bid at c cents is a YES ask at 100 - c
+    (and vice versa), so every ticker's book is kept in the same shape and
+    price scale as the other venues:
+        { 'yes': {'bids': PriceLevels, 'asks': PriceLevels}, 'no': {...} }
+    in dollars (0-1), with the asks of one outcome mirrored from the bids of
+    the other. Books are long-lived and updated in place, best price is O(1).
+
+    Each subscription numbers its messages (seq). A gap means a delta was
+    lost, so the subscription's books are cleared and its tickers are
+    resubscribed, which makes Kalshi send fresh snapshots. Books are cleared
+    the same way when the connection drops, and deltas are ignored for a
+    ticker until its snapshot arrived.
+    """
+    def __init__(self, market_tickers=None, ws_url=None):
+        """
+        Args:
+            market_tickers: Market mapping ({slug: {'ticker': str, ...}}) or a list of Kalshi market tickers.
+            ws_url: WebSocket URL (default KALSHI_WS_URL, i.e. $KALSHI_WS_URL or the live API).
+                Only the live API requires credentials; other endpoints (e.g. the
+                local mocks) are connected to unauthenticated when none are set.
+        """
         load_dotenv()
         self.key_id = os.getenv("KALSHI_API_KEY")
         self.key_file = os.getenv("KALSHI_PRIVATE_KEY")
-        self.ws_url = "wss://api.elections.kalshi.com/trade-api/ws/v2"
+        self.ws_url = ws_url or KALSHI_WS_URL
+        self.private_key = self._load_private_key() if self.key_file else None
+
+        if market_tickers is None:
+            self.tickers = []
+        elif isinstance(market_tickers, dict):
+            self.tickers = [m['ticker'] for m in market_tickers.values()]
+        else:
+            self.tickers = list(market_tickers)
+        logger.info(f"KalshiClient initialized with {len(self.tickers)} market tickers.")
+
         self.order_books = {}
-        self.private_key = self._load_private_key()
+        self.update_count = 0
+        self.gap_count = 0
+        self.resubscribe_count = 0
+        self.reconnect_count = 0
+        self.is_running = False
+        # Optional callback(ticker, received_at) invoked after a ticker's book
+        # changed; received_at is the monotonic receive time of the frame
+        self.on_book_update = None
+        self.received_at = None
+        self.message_count = 0
+        self.bytes_received = 0
+        # Optional capture.CaptureRecorder receiving every raw frame
+        self.recorder = None
+
+        self.ws = None
+        self._task = None
+        self._next_command_id = 1
+        self._pending_subscriptions = {}  # { command id: [tickers] } until Kalshi acks with a sid
+        self._sid_tickers = {}            # { sid: [tickers] }
+        self._sid_seq = {}                # { sid: last seq seen }
+        self._snapshotted = set()         # Tickers whose book was seeded by a snapshot on the current subscription
 
     def _load_private_key(self):
         with open(self.key_file, "rb") as key_file:
             return serialization.load_pem_private_key(key_file.read(), password=None)
 
-    def _get_auth_headers(self, path="/trade-api/ws/v2"):
+    def _get_auth_headers(self, path=KALSHI_WS_PATH):
         current_time_ms = int(time.time() * 1000)
         timestamp_str = str(current_time_ms)
         message = timestamp_str + "GET" + path
@@ -37,39 +103,202 @@ class KalshiClient:
             "KALSHI-ACCESS-TIMESTAMP": timestamp_str,
         }
 
-    def _update_order_book(self, ticker, snapshot=None, delta=None):
-        if ticker not in self.order_books:
-            self.order_books[ticker] = {"yes": {}, "no": {}}
-        if snapshot:
-            self.order_books[ticker]["yes"] = {price: qty for price, qty in snapshot.get("yes", [])}
-            self.order_books[ticker]["no"] = {price: qty for price, qty in snapshot.get("no", [])}
-        elif delta:
-            side = delta["side"]
-            price = delta["price"]
-            delta_qty = delta["delta"]
-            current_qty = self.order_books[ticker][side].get(price, 0)
-            new_qty = current_qty + delta_qty
-            if new_qty <= 0:
-                self.order_books[ticker][side].pop(price, None)
-            else:
-                self.order_books[ticker][side][price] = new_qty
+    # ----------------------------------------------------------------------
+    # CONNECTION LIFECYCLE (asyncio)
+    # ----------------------------------------------------------------------
+
+    def start(self):
+        """Starts the connection task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="kalshi-ws")
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.is_running = False
 
     async def run(self):
-        headers = self._get_auth_headers()
-        market_tickers = ["KXELONTWEETS-25APR11-324.5"]
-        async with websockets.connect(self.ws_url, extra_headers=headers, ping_interval=10) as websocket:
-            subscription_message = json.dumps({
-                "id": 1,
-                "cmd": "subscribe",
-                "params": {"channels": ["orderbook_delta"], "market_tickers": market_tickers}
-            })
-            await websocket.send(subscription_message)
-            async for message in websocket:
-                data = json.loads(message)
-                if data.get("type") in ["orderbook_snapshot", "orderbook_delta"]:
-                    ticker = data["msg"]["market_ticker"]
-                    self._update_order_book(ticker, snapshot=data["msg"] if data["type"] == "orderbook_snapshot" else None,
-                                            delta=data["msg"] if data["type"] == "orderbook_delta" else None)
+        """Connects, subscribes and processes messages forever, reconnecting with backoff."""
+        if self.private_key is None:
+            if self.ws_url == KALSHI_PRODUCTION_WS_URL:
+                logger.error("Kalshi credentials missing (KALSHI_API_KEY / KALSHI_PRIVATE_KEY), not connecting.")
+                return
+            logger.warning(f"Kalshi credentials missing, connecting to {self.ws_url} unauthenticated.")
+
+        delay = RECONNECT_DELAY
+        while True:
+            logger.info("Connecting to Kalshi WebSocket...")
+            try:
+                headers = self._get_auth_headers() if self.private_key is not None else None
+                async with websockets.connect(self.ws_url, additional_headers=headers, ping_interval=10) as websocket:
+                    self.ws = websocket
+                    self._pending_subscriptions.clear()
+                    self._sid_tickers.clear()
+                    self._sid_seq.clear()
+                    await self._subscribe(websocket, self.tickers)
+                    self.is_running = True
+                    delay = RECONNECT_DELAY
+
+                    async for message in websocket:
+                        self.message_count += 1
+                        self.bytes_received += len(message)
+                        await self._on_message(websocket, message)
+
+                logger.warning(f"Kalshi WebSocket closed: code={websocket.close_code}, msg={websocket.close_reason}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Kalshi WebSocket error: {e}")
+            finally:
+                self.is_running = False
+                self.ws = None
+                # No deltas arrive until the next connection's snapshots: never scan the old quotes meanwhile
+                self._clear_books(list(self.order_books))
+
+            self.reconnect_count += 1
+            logger.info(f"Reconnecting to Kalshi in {delay:.0f} seconds...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _send_command(self, websocket, cmd, params):
+        command_id = self._next_command_id
+        self._next_command_id += 1
+        await websocket.send(json.dumps({"id": command_id, "cmd": cmd, "params": params}))
+        return command_id
+
+    async def _subscribe(self, websocket, tickers):
+        for i in range(0, len(tickers), SUBSCRIBE_BATCH_SIZE):
+            batch = tickers[i:i + SUBSCRIBE_BATCH_SIZE]
+            command_id = await self._send_command(websocket, "subscribe",
+                                                  {"channels": ["orderbook_delta"], "market_tickers": batch})
+            self._pending_subscriptions[command_id] = batch
+        logger.info(f"Subscribed to {len(tickers)} Kalshi tickers")
+
+    async def _resubscribe(self, websocket, sid):
+        """Drops a subscription whose sequence broke and subscribes its tickers again (fresh snapshots)."""
+        tickers = self._sid_tickers.pop(sid, [])
+        self._sid_seq.pop(sid, None)
+        self.resubscribe_count += 1
+
+        # Never leave a book that missed a delta behind while the snapshot is on its way
+        self._clear_books(tickers)
+
+        if websocket is None:
+            return  # Replaying a capture: the recorded session's own re-snapshot follows
+        await self._send_command(websocket, "unsubscribe", {"sids": [sid]})
+        await self._subscribe(websocket, tickers)
+
+    def _clear_books(self, tickers):
+        """Empties the tickers' books (notifying the listener of those that had quotes) until their next snapshot."""
+        for ticker in tickers:
+            self._snapshotted.discard(ticker)
+            book = self.order_books.get(ticker)
+            if book is not None and any(book[outcome][side] for outcome in ("yes", "no") for side in ("bids", "asks")):
+                for outcome in ("yes", "no"):
+                    book[outcome]["bids"].clear()
+                    book[outcome]["asks"].clear()
+                self._notify_book_update(ticker)
+
+    # ----------------------------------------------------------------------
+    # MESSAGE HANDLING
+    # ----------------------------------------------------------------------
+
+    async def _on_message(self, websocket, message):
+        self.received_at = time.monotonic()
+        if self.recorder is not None:
+            self.recorder.record("kalshi", message)
+        try:
+            data = json.loads(message)
+            msg_type = data.get("type")
+
+            if msg_type == "subscribed":
+                sid = data["msg"]["sid"]
+                self._sid_tickers[sid] = self._pending_subscriptions.pop(data.get("id"), [])
+                return
+            if msg_type == "error":
+                logger.error(f"Kalshi error: {data.get('msg')}")
+                return
+            if msg_type not in ("orderbook_snapshot", "orderbook_delta"):
+                return
+
+            sid = data.get("sid")
+            if sid is not None:
+                if sid not in self._sid_tickers:
+                    return  # Late message of a dropped subscription
+                seq = data.get("seq")
+                last_seq = self._sid_seq.get(sid)
+                if seq is not None and last_seq is not None and seq != last_seq + 1:
+                    self.gap_count += 1
+                    logger.warning(f"Kalshi sequence gap on sid {sid}: expected {last_seq + 1}, got {seq}. Re-snapshotting {len(self._sid_tickers[sid])} tickers.")
+                    await self._resubscribe(websocket, sid)
+                    return
+                if seq is not None:
+                    self._sid_seq[sid] = seq
+
+            msg = data["msg"]
+            ticker = msg["market_ticker"]
+            if msg_type == "orderbook_snapshot":
+                self._apply_snapshot(ticker, msg)
+                self._snapshotted.add(ticker)
+            elif ticker in self._snapshotted:
+                self._apply_delta(ticker, msg)
+            else:
+                return  # No snapshot to apply it to yet: a few deltas are not a book
+            self.update_count += 1
+            self._notify_book_update(ticker)
+
+        except Exception as e:
+            logger.error(f"Error processing Kalshi message: {e}")
+
+    def _apply_snapshot(self, ticker, msg):
+        """Replaces a ticker's book with a snapshot ([[price_cents, quantity], ...] per outcome)."""
+        book = self._get_or_create_book(ticker)
+        for outcome, other in (("yes", "no"), ("no", "yes")):
+            levels = {cents: quantity for cents, quantity in (msg.get(outcome) or []) if quantity > 0}
+            book[outcome]["bids"].replace_sizes({cents / 100: quantity for cents, quantity in levels.items()})
+            book[other]["asks"].replace_sizes({(100 - cents) / 100: quantity for cents, quantity in levels.items()})
+
+    def _apply_delta(self, ticker, msg):
+        """Applies a quantity change at one bid level, and mirrors it onto the other outcome's asks."""
+        book = self._get_or_create_book(ticker)
+        outcome = msg["side"]
+        other = "no" if outcome == "yes" else "yes"
+        cents = msg["price"]
+
+        bids = book[outcome]["bids"]
+        quantity = bids.size_at(cents / 100) + msg["delta"]
+        bids.set(cents / 100, quantity)                          # quantity <= 0 removes the level
+        book[other]["asks"].set((100 - cents) / 100, quantity)
+
+    def _get_or_create_book(self, ticker):
+        """Returns the live book for a ticker, creating empty sides on first use."""
+        book = self.order_books.get(ticker)
+        if book is None:
+            book = {
+                "yes": {"bids": PriceLevels(descending=True), "asks": PriceLevels(descending=False)},
+                "no": {"bids": PriceLevels(descending=True), "asks": PriceLevels(descending=False)},
+            }
+            self.order_books[ticker] = book
+        return book
+
+    def _notify_book_update(self, ticker):
+        """Tells the listener (OrderBookManager) that a ticker's book changed."""
+        if self.on_book_update is not None:
+            try:
+                self.on_book_update(ticker, self.received_at)
+            except Exception as e:
+                logger.error(f"Book update callback failed for {ticker}: {e}")
+
+    # ----------------------------------------------------------------------
+    # READ ACCESS
+    # ----------------------------------------------------------------------
 
     def get_order_books(self):
-        return self.order_books
\ No newline at end of file
+        return self.order_books
+
+    def get_book(self, ticker):
+        """Returns the live book for one ticker ({'yes': {...}, 'no': {...}}) or None."""
+        return self.order_books.get(ticker)
@@ -0,0 +1,93 @@
+import logging
+import os
+import time
+
+import requests
+
+from http_session import create_session, get_with_retry
+from matching import MarketMatcher, kalshi_listings, polymarket_listings
+
+logger = logging.getLogger(__name__)
+
+# Public (unauthenticated) Kalshi REST API, overridable from the environment
+KALSHI_REST_URL = os.getenv("KALSHI_REST_URL", "https://api.elections.kalshi.com/trade-api/v2")
+PAGE_SIZE = 1000              # Markets per page (the API maximum)
+MAX_PAGES = 200               # Safety stop for the cursor walk
+CACHE_VENUE = "kalshi"        # Venue key used in the on-disk MarketCache
+# Fields of a raw market kept in the cache (what the matcher reads)
+CACHED_FIELDS = ("ticker", "event_ticker", "title", "subtitle", "yes_sub_title", "status",
+                 "close_time", "expected_expiration_time", "expiration_time")
+
+
+def fetch_kalshi_markets(cache=None):
+    """
+    Fetches every open Kalshi market by walking the /markets cursor.
+    
+    With a MarketCache, a complete walk replaces the cached markets, and a
+    failed one serves them instead.
+    
+    Returns:
+        list: Raw market dicts, or None on error with nothing cached.
+    """
+    cached_markets = list(cache.records(CACHE_VENUE).values()) if cache is not None else []
+    url = f"{KALSHI_REST_URL}/markets"
+    logger.info(f"Fetching open markets from Kalshi: {url}")
+    
+    started = time.perf_counter()
+    markets = []
+    cursor = None
+    session = create_session(pool_size=1)
+    try:
+        for _ in range(MAX_PAGES):
+            params = {"status": "open", "limit": PAGE_SIZE}
+            if cursor:
+                params["cursor"] = cursor
+            data = get_with_retry(url, session=session, params=params, headers={"accept": "application/json"}).json()
+            markets.extend(data.get("markets") or [])
+            cursor = data.get("cursor")
+            if not cursor:
+                break
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"Error fetching Kalshi markets: {e}")
+        return cached_markets or None
+    finally:
+        session.close()
+    
+    logger.info(f"Kalshi: fetched {len(markets)} open markets in {time.perf_counter() - started:.2f}s.")
+    if cache is not None and markets:
+        cache.replace_all(CACHE_VENUE, {
+            market["ticker"]: {field: market.get(field) for field in CACHED_FIELDS}
+            for market in markets if market.get("ticker")
+        })
+        cache.set_meta(CACHE_VENUE, "full_sync_at", time.time())
+    return markets
+
+
+def fetch_kalshi_market_mapping(polymarket_mapping, cache=None, matcher=None):
+    """
+    Fetches the open Kalshi markets and matches them to Polymarket markets
+    (see matching/), producing the bot's KALSHI_MARKET_MAPPING.
+    
+    Args:
+        polymarket_mapping: The Polymarket bot mapping (see gamma_fetch.get_market_mapping_for_bot).
+        cache: Optional MarketCache for the Kalshi markets.
+        matcher: Optional MarketMatcher already synced with polymarket_mapping
+            (and loaded from the cache); a fresh one is built if None.
+    
+    Returns:
+        dict: { polymarket slug: {'ticker', 'question'} }, or empty dict on error.
+    """
+    raw_markets = fetch_kalshi_markets(cache=cache)
+    if not raw_markets:
+        logger.warning("Kalshi: no markets to match.")
+        return {}
+    
+    if matcher is None:
+        matcher = MarketMatcher()
+        matcher.sync("polymarket", polymarket_listings(polymarket_mapping))
+    matcher.sync("kalshi", kalshi_listings(raw_markets))
+    matched = matcher.match("kalshi")
+    
+    market_mapping = {slug: listing.entry for slug, listing in matched.items() if slug in polymarket_mapping}
+    logger.info(f"Kalshi: matched {len(market_mapping)} of {len(raw_markets)} markets to Polymarket markets.")
+    return market_mapping
@@ -1,23 +1,71 @@
+import asyncio
+import json
+import os
+import time
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from data.price_levels import PriceLevels
+from http_session import create_session
 
 logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION (Based on Limitlex structure) ---
-LIMITLEX_BASE_URL = "https://limitlex.com/api" 
+LIMITLEX_BASE_URL = os.getenv("LIMITLESS_BASE_URL", "https://limitlex.com/api")
 ORDER_BOOK_ENDPOINT = "/public/order_book"
 
+# --- POLLING SETTINGS ---
+POLL_CONCURRENCY = 16         # Max order book requests in flight at once
+REQUEST_DEADLINE = 2.0        # Seconds before a single order book request is abandoned
+DEFAULT_POLL_INTERVAL = 0.5   # Seconds between the starts of two polling rounds
+STATS_LOG_INTERVAL = 60       # Seconds between scheduler stats log lines (adaptive mode)
+
 class LimitlessClient:
     """
     A client to fetch public order book data from Limitless (Limitlex) via REST API.
+    
+    Books can be fetched synchronously (fetch_all_order_books) or polled in the
+    background on the event loop (start_polling): requests then run on a small
+    thread pool sharing one keep-alive connection pool, at most `concurrency`
+    at a time and each under a deadline, and every result is written into the
+    live books as soon as it arrives, so a slow pair never blocks the scan loop.
+    
+    With an AdaptivePollScheduler, background polling is per pair instead of
+    in fixed rounds: each pair_id is re-polled on its own interval (faster when
+    volatile, recently changed or close to a profitable cross) within a global
+    requests-per-second budget.
     """
-    def __init__(self, market_mapping=None):
+    def __init__(self, market_mapping=None, concurrency=POLL_CONCURRENCY, request_deadline=REQUEST_DEADLINE,
+                 scheduler=None, base_url=None):
         """
         Initialize with a mapping from your internal market slugs to Limitless pair_ids.
         market_mapping: dict { 'my_slug': {'pair_id': str, ...} }
+        concurrency: Max order book requests in flight during a polling round.
+        request_deadline: Seconds after which a pending request counts as failed.
+        scheduler: Optional AdaptivePollScheduler for per-pair background polling.
+        base_url: API root (default LIMITLEX_BASE_URL, i.e. $LIMITLESS_BASE_URL or the live API).
         """
+        self.base_url = base_url or LIMITLEX_BASE_URL
         self.market_mapping = market_mapping if market_mapping is not None else {}
         self.order_books = {} # Storage: { slug: { 'yes': {'bids': [], 'asks': []}, 'no': {...} } }
+        self.on_book_update = None # Optional callback(slug, received_at) invoked when a pair's book changed
+        
+        self.concurrency = concurrency
+        self.request_deadline = request_deadline
+        self.session = create_session(pool_size=concurrency)
+        self.scheduler = scheduler
+        self.recorder = None       # Optional capture.CaptureRecorder receiving every raw response
+        self._pair_to_slug = None  # Built on first replayed response
+        # Optional callback(slug) -> price gap to a profitable cross (see
+        # ArbitrageBot.cross_gap); pairs close to an arb are polled faster
+        self.cross_gap_fn = None
+        self._executor = None
+        self._semaphore = None
+        self._poll_task = None
+        self.poll_count = 0
+        self.request_count = 0
+        self.timeout_count = 0
+        self.last_poll_seconds = 0.0
         logger.info(f"LimitlessClient initialized with {len(self.market_mapping)} market IDs.")
         
     def _safe_float(self, value):
@@ -41,51 +89,25 @@ class LimitlessClient:
         Fetches the order book for a single pair_id from the Limitless API.
         
         :param pair_id: The unique ID for the trading pair on Limitless.
-        :return: A dictionary: {'bids': [(price, size), ...], 'asks': [(price, size), ...]} 
-                 or None if the fetch fails.
+        :return: A dictionary: {'bids': [(price, size), ...], 'asks': [(price, size), ...], 'received_at': float}
+                 (received_at: monotonic time the response arrived) or None if the fetch fails.
         """
-        api_url = f"{LIMITLEX_BASE_URL}{ORDER_BOOK_ENDPOINT}"
+        api_url = f"{self.base_url}{ORDER_BOOK_ENDPOINT}"
         params = {'pair_id': pair_id}
         
         try:
-            response = requests.get(api_url, params=params, timeout=5)
+            self.request_count += 1
+            response = self.session.get(api_url, params=params, timeout=self.request_deadline)
+            received_at = time.monotonic()
             response.raise_for_status()
+            if self.recorder is not None:
+                self.recorder.record("limitless", response.text, key=pair_id)
             data = response.json()
             
-            if data.get('error'):
-                logger.error(f"Limitless API error for {pair_id}: {data['error'].get('message', 'Unknown error')}")
-                return None
-            
-            # Defensive check for the top-level 'result' key
-            result = data.get('result', {})
-            
-            # --- CRITICAL FIX: Isolate list comprehensions with try/except ---
-            try:
-                # Sanity check: Ensure 'bids' and 'asks' are lists if they exist
-                bids_data = result.get('bids')
-                if bids_data is None or not isinstance(bids_data, list):
-                    bids_data = []
-
-                asks_data = result.get('asks')
-                if asks_data is None or not isinstance(asks_data, list):
-                    asks_data = []
-
-                # FINAL, ROBUST FIX: Use the sanitized data structures.
-                bids = [(self._safe_float(b['price']), self._safe_float(b.get('size', b.get('amount_1', 0)))) 
-                        for b in bids_data
-                        if isinstance(b, dict) and 'price' in b]
-                
-                asks = [(self._safe_float(a['price']), self._safe_float(a.get('size', a.get('amount_1', 0)))) 
-                        for a in asks_data
-                        if isinstance(a, dict) and 'price' in a]
-            
-            except Exception as e:
-                 # Catch any remaining iteration or key error explicitly here.
-                logger.error(f"Error during list comprehension for {pair_id}: {e}")
-                return None
-            # ------------------------------------------------------------------
-
-            return {'bids': bids, 'asks': asks}
+            book_data = self._parse_orderbook(pair_id, data)
+            if book_data is not None:
+                book_data['received_at'] = received_at
+            return book_data
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to fetch Limitless order book for {pair_id}: {e}")
@@ -94,46 +116,308 @@ class LimitlessClient:
             # This block should now only catch errors in the initial response.json() or data access.
             logger.error(f"Error processing initial Limitless response for {pair_id}: {e}")
             return None
+
+    def _parse_orderbook(self, pair_id, data):
+        """Turns a decoded order book response into {'bids': [(price, size)], 'asks': [...]} (None on an API error)."""
+        if data.get('error'):
+            logger.error(f"Limitless API error for {pair_id}: {data['error'].get('message', 'Unknown error')}")
+            return None
+        
+        # Defensive check for the top-level 'result' key
+        result = data.get('result', {})
+        
+        # --- CRITICAL FIX: Isolate list comprehensions with try/except ---
+        try:
+            # Sanity check: Ensure 'bids' and 'asks' are lists if they exist
+            bids_data = result.get('bids')
+            if bids_data is None or not isinstance(bids_data, list):
+                bids_data = []
+
+            asks_data = result.get('asks')
+            if asks_data is None or not isinstance(asks_data, list):
+                asks_data = []
+
+            # FINAL, ROBUST FIX: Use the sanitized data structures.
+            bids = [(self._safe_float(b['price']), self._safe_float(b.get('size', b.get('amount_1', 0)))) 
+                    for b in bids_data
+                    if isinstance(b, dict) and 'price' in b]
+            
+            asks = [(self._safe_float(a['price']), self._safe_float(a.get('size', a.get('amount_1', 0)))) 
+                    for a in asks_data
+                    if isinstance(a, dict) and 'price' in a]
+        
+        except Exception as e:
+             # Catch any remaining iteration or key error explicitly here.
+            logger.error(f"Error during list comprehension for {pair_id}: {e}")
+            return None
+        # ------------------------------------------------------------------
+
+        return {'bids': bids, 'asks': asks}
+
+    def apply_recorded_response(self, pair_id, text):
+        """Feeds a captured raw order book response (see capture/) through the normal parse/store path."""
+        if self._pair_to_slug is None:
+            self._pair_to_slug = {pair_id: slug for slug, pair_id in self._tracked_pairs()}
+        internal_slug = self._pair_to_slug.get(pair_id)
+        if internal_slug is None:
+            return False
+        received_at = time.monotonic()
+        try:
+            book_data = self._parse_orderbook(pair_id, json.loads(text))
+            if book_data is not None:
+                book_data['received_at'] = received_at
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error processing recorded Limitless response for {pair_id}: {e}")
+            book_data = None
+        return self._store_book(internal_slug, book_data)
             
 # ... (rest of the file remains the same) ...
 
     def fetch_all_order_books(self):
         """
         Fetches and updates real order books for all tracked pairs by utilizing
-        the robust fetch_orderbook helper method.
+        the robust fetch_orderbook helper method. Books are long-lived objects
+        updated in place, so the returned dict is the same on every call.
+        
+        This blocks until every pair has been fetched; inside the event loop use
+        poll_all_order_books / start_polling instead.
         
         Returns:
             dict: { slug: { 'yes': {'bids': [...], 'asks': [...]}, 'no': {...} } }
         """
-        new_books = {}
+        pairs = self._tracked_pairs()
+        if not pairs:
+            return self.order_books
+
+        updated = 0
+        for internal_slug, pair_id in pairs:
+            # Call the robust single-market fetcher
+            book_data = self.fetch_orderbook(pair_id)
+            self._store_book(internal_slug, book_data)
+            updated += bool(book_data)
+
+        logger.info(f"Limitless: Updated {updated}/{len(self.market_mapping)} order books from API.")
+        return self.order_books
+
+    # ----------------------------------------------------------------------
+    # BACKGROUND POLLING (asyncio)
+    # ----------------------------------------------------------------------
+
+    @property
+    def is_polling(self):
+        """True while the background polling task is running."""
+        return self._poll_task is not None and not self._poll_task.done()
+
+    async def poll_all_order_books(self):
+        """
+        Fetches every tracked pair concurrently without blocking the event loop.
+        Each book is written (and on_book_update fired) on the loop as soon as
+        its own request completes; a request that misses its deadline counts
+        as a failed fetch.
         
+        Returns:
+            int: Number of pairs fetched successfully.
+        """
+        pairs = self._tracked_pairs()
+        if not pairs:
+            return 0
+
+        async def poll_pair(internal_slug, pair_id):
+            book_data = await self._fetch_with_deadline(pair_id)
+            self._store_book(internal_slug, book_data)
+            return bool(book_data)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(*(poll_pair(slug, pair_id) for slug, pair_id in pairs))
+        self.last_poll_seconds = loop.time() - started
+        self.poll_count += 1
+
+        updated = sum(results)
+        logger.info(f"Limitless: Updated {updated}/{len(pairs)} order books from API in {self.last_poll_seconds * 1000:.0f}ms.")
+        return updated
+
+    async def _fetch_with_deadline(self, pair_id):
+        """Runs fetch_orderbook on the worker pool under the request deadline. Returns None on failure."""
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="limitless-poll")
+            # The semaphore keeps queued requests out of the executor, so the
+            # deadline only covers time actually spent on the request.
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        semaphore = self._semaphore
+        await semaphore.acquire()
+        try:
+            future = self._executor.submit(self.fetch_orderbook, pair_id)
+        except BaseException:
+            semaphore.release()
+            raise
+        # The slot is freed when the worker thread is, not when the deadline
+        # gives up on the request: an abandoned request still occupies its thread
+        future.add_done_callback(lambda _: _release_threadsafe(loop, semaphore))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.request_deadline)
+        except asyncio.TimeoutError:
+            self.timeout_count += 1
+            logger.warning(f"Limitless order book for {pair_id} missed its {self.request_deadline}s deadline")
+            return None
+
+    def start_polling(self, interval=DEFAULT_POLL_INTERVAL):
+        """
+        Starts background polling as a task on the running event loop: every
+        pair every `interval` seconds, or per pair through the scheduler if
+        one was given (interval is then unused).
+        """
+        if not self.is_polling:
+            poller = self._poll_scheduled() if self.scheduler is not None else self._poll_forever(interval)
+            self._poll_task = asyncio.create_task(poller, name="limitless-poll")
+        return self._poll_task
+
+    async def stop_polling(self):
+        """Cancels the polling task and releases the worker threads."""
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+    async def _poll_forever(self, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await self.poll_all_order_books()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error polling Limitless order books: {e}")
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    async def _poll_scheduled(self):
+        """Polls each pair whenever the scheduler says it is due, one task per request."""
+        loop = asyncio.get_running_loop()
+        scheduler = self.scheduler
+        slugs = {}
+        for internal_slug, pair_id in self._tracked_pairs():
+            slugs[pair_id] = internal_slug
+            scheduler.add(pair_id, loop.time())
+
+        in_flight = set()
+        next_stats = loop.time() + STATS_LOG_INTERVAL
+        try:
+            while True:
+                now = loop.time()
+                for pair_id in scheduler.take_due(now):
+                    task = asyncio.create_task(self._poll_scheduled_pair(slugs[pair_id], pair_id))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+
+                if now >= next_stats:
+                    stats = scheduler.stats()
+                    logger.info(
+                        f"Limitless scheduler: {stats['pairs']} pairs, {stats['hot']} hot | "
+                        f"intervals {stats['min_interval']:.2f}-{stats['max_interval']:.2f}s | "
+                        f"~{stats['planned_rps']:.1f} req/s | {stats['requests']} requests")
+                    next_stats = now + STATS_LOG_INTERVAL
+
+                # Results reschedule their pair at least min_interval ahead,
+                # so never sleep longer than that
+                wakeup = scheduler.next_wakeup(loop.time())
+                delay = scheduler.min_interval if wakeup is None else wakeup - loop.time()
+                await asyncio.sleep(min(max(0.0, delay), scheduler.min_interval))
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _poll_scheduled_pair(self, internal_slug, pair_id):
+        loop = asyncio.get_running_loop()
+        changed, mid, gap = False, None, None
+        try:
+            book_data = await self._fetch_with_deadline(pair_id)
+            changed = self._store_book(internal_slug, book_data)
+            mid = self._mid_price(self.order_books[internal_slug])
+            if self.cross_gap_fn is not None:
+                gap = self.cross_gap_fn(internal_slug)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error polling Limitless pair {pair_id}: {e}")
+        finally:
+            self.scheduler.record_result(pair_id, loop.time(), changed, mid=mid, gap=gap)
+
+    # ----------------------------------------------------------------------
+    # BOOK STORE
+    # ----------------------------------------------------------------------
+
+    def _tracked_pairs(self):
+        """Returns [(slug, pair_id)] for every mapped market with a pair_id."""
         if not self.market_mapping:
             logger.warning("No Limitless markets to fetch (empty market_mapping)")
-            return new_books
+            return []
 
+        pairs = []
         for internal_slug, data in self.market_mapping.items():
             if not data or 'pair_id' not in data:
                 logger.warning(f"Invalid market data for {internal_slug}: missing 'pair_id'")
                 continue
-                
-            pair_id = data['pair_id']
-            
-            # Call the robust single-market fetcher
-            book_data = self.fetch_orderbook(pair_id)
+            pairs.append((internal_slug, data['pair_id']))
+        return pairs
+
+    def _store_book(self, internal_slug, book_data):
+        """
+        Writes a fetch result into the slug's live book and notifies the
+        listener if it changed. Returns True if the book changed.
+        """
+        book = self._get_or_create_book(internal_slug)
+
+        if book_data:
+            # Update the live book in place so readers holding it see the new levels
+            changed = self._apply_book(book, book_data.get('bids', []), book_data.get('asks', []))
+        else:
+            # Never leave a stale book behind after a failed poll
+            changed = self._apply_book(book, [], [])
+        
+        if changed and self.on_book_update is not None:
+            self.on_book_update(internal_slug, book_data.get('received_at') if book_data else None)
+        return changed
+
+    @staticmethod
+    def _mid_price(book):
+        """Mid of the YES side, or None if either side is empty."""
+        bids, asks = book["yes"]["bids"], book["yes"]["asks"]
+        if not bids or not asks:
+            return None
+        return (bids[0][0] + asks[0][0]) / 2
+
+    def _apply_book(self, book, bids, asks):
+        """Replaces the YES sides of a live book. Returns True if anything changed."""
+        new_bids = PriceLevels(descending=True, levels=bids)
+        new_asks = PriceLevels(descending=False, levels=asks)
+        if book["yes"]["bids"] == new_bids and book["yes"]["asks"] == new_asks:
+            return False
+        book["yes"]["bids"].replace(new_bids)
+        book["yes"]["asks"].replace(new_asks)
+        return True
+
+    def _get_or_create_book(self, internal_slug):
+        """Returns the live, sorted book for a slug, creating empty sides on first use."""
+        book = self.order_books.get(internal_slug)
+        if book is None:
+            book = {
+                "yes": {"bids": PriceLevels(descending=True), "asks": PriceLevels(descending=False)},
+                "no": {"bids": PriceLevels(descending=True), "asks": PriceLevels(descending=False)},
+            }
+            self.order_books[internal_slug] = book
+        return book
+
 
-            if book_data:
-                # Map and store the successfully parsed book
-                new_books[internal_slug] = {
-                    "yes": {
-                        "bids": book_data.get('bids', []),
-                        "asks": book_data.get('asks', [])
-                    },
-                    "no": {
-                        "bids": [], 
-                        "asks": []
-                    }
-                }
-
-        logger.info(f"Limitless: Updated {len(new_books)}/{len(self.market_mapping)} order books from API.")
-        self.order_books = new_books
-        return self.order_books
\ No newline at end of file
+def _release_threadsafe(loop, semaphore):
+    """Releases an asyncio semaphore from any thread (a no-op once its loop is closed)."""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        pass
@@ -1,83 +1,99 @@
 import requests
 import logging
+import os
+import time
+
+from matching import MarketMatcher, limitless_listings, polymarket_listings
 
 logger = logging.getLogger(__name__)
 
-# Base URL identified from the documentation
-LIMITLESS_BASE_URL = "https://limitlex.com/api"
+# Base URL identified from the documentation (overridable, e.g. for the local mocks)
+LIMITLESS_BASE_URL = os.getenv("LIMITLESS_BASE_URL", "https://limitlex.com/api")
+# Venue key used in the on-disk MarketCache
+CACHE_VENUE = "limitless"
 
-def fetch_limitless_market_mapping():
+def fetch_limitless_pairs(cache=None):
     """
-    Fetches all active exchange pairs from the Limitlex /pairs public endpoint
-    and maps a subset of the first pairs found to our Polymarket test slugs.
-    This creates the necessary overlap for cross-platform arbitrage checks to work.
+    Fetches all active exchange pairs from the Limitlex /pairs public endpoint.
+    
+    With a MarketCache, the request is revalidated with the stored ETag /
+    Last-Modified headers: a 304 (or a network failure) serves the cached pairs,
+    and a 200 replaces the cached pairs keyed by pair id.
     
     Returns:
-        dict: Mapping of polymarket slugs to limitless pair data, or empty dict on error
+        list: Raw pair dicts in API order, or None on error with nothing cached.
     """
     endpoint = "/public/pairs"
     url = LIMITLESS_BASE_URL + endpoint
+    cached_pairs = list(cache.records(CACHE_VENUE).values()) if cache is not None else []
+    headers = cache.conditional_headers(CACHE_VENUE) if cached_pairs and cache.is_fresh(CACHE_VENUE) else {}
     
     logger.info(f"Fetching active markets from Limitless: {url}")
 
     try:
-        response = requests.get(url, timeout=10)
+        response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
+        if response.status_code == 304:
+            logger.info(f"Limitless: pairs unchanged (304), using {len(cached_pairs)} cached pairs.")
+            return cached_pairs
         data = response.json()
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching Limitless market pairs: {e}")
-        return {}  # Return empty dict instead of None
+        return cached_pairs or None
     except Exception as e:
         logger.error(f"Unexpected error parsing Limitless response: {e}")
-        return {}  # Return empty dict instead of None
+        return cached_pairs or None
     
     # Check if the result structure matches the documentation
     if not data.get('result') or 'data' not in data['result']:
         logger.error("Limitless API returned unexpected structure.")
-        return {}  # Already returns empty dict, good
+        return cached_pairs or None
         
     raw_pairs = data['result']['data']
     
+    if cache is not None and raw_pairs:
+        cache.replace_all(CACHE_VENUE, {pair['id']: pair for pair in raw_pairs if pair.get('id')})
+        cache.store_validators(CACHE_VENUE, response)
+        cache.set_meta(CACHE_VENUE, "full_sync_at", time.time())
+    
+    return raw_pairs
+
+
+def fetch_limitless_market_mapping(polymarket_mapping, cache=None, matcher=None):
+    """
+    Fetches all active exchange pairs from the Limitlex /pairs public endpoint
+    and matches them to Polymarket markets by question, end date and outcome
+    (see matching/), so cross-platform checks compare the same market.
+    
+    Args:
+        polymarket_mapping: The Polymarket bot mapping (see gamma_fetch.get_market_mapping_for_bot).
+        cache: Optional MarketCache used to revalidate the pair list.
+        matcher: Optional MarketMatcher already synced with polymarket_mapping
+            (and loaded from the cache); a fresh one is built if None.
+    
+    Returns:
+        dict: Mapping of polymarket slugs to limitless pair data, or empty dict on error
+    """
+    raw_pairs = fetch_limitless_pairs(cache=cache)
+    
+    if raw_pairs is None:
+        return {}  # Return empty dict instead of None
+    
     if not raw_pairs:
         logger.warning("Limitless API returned no pairs.")
         return {}
     
     logger.info(f"Limitless: Found {len(raw_pairs)} active exchange pairs.")
 
-    # --- Market Translation: Mapping Polymarket Slugs to Real Limitlex Pairs ---
-    
-    # 1. Define the specific Polymarket slugs we want to test/map
-    POLYMARKET_TEST_SLUGS = [
-        "fed-rate-hike-in-2025",
-        "tether-insolvent-in-2025",
-        "russia-x-ukraine-ceasefire-in-2025",
-        "weed-rescheduled-in-2025",
-        "fed-emergency-rate-cut-in-2025",
-    ]
-    
-    # 2. Map these Polymarket slugs to the first few real Limitlex Pair IDs
-    market_mapping = {}
+    # --- Market Translation: Matching Limitlex Pairs to Polymarket Slugs ---
+    if matcher is None:
+        matcher = MarketMatcher()
+        matcher.sync("polymarket", polymarket_listings(polymarket_mapping))
+    matcher.sync("limitless", limitless_listings(raw_pairs))
+    matched = matcher.match("limitless")
     
-    for i, pair in enumerate(raw_pairs):
-        if i >= len(POLYMARKET_TEST_SLUGS):
-            break  # Stop after mapping the desired number of test markets
-            
-        poly_slug = POLYMARKET_TEST_SLUGS[i]
-        
-        # Validate that the pair has required fields
-        if not pair.get('id'):
-            logger.warning(f"Skipping pair at index {i} - missing 'id' field")
-            continue
-        
-        # We use the Polymarket slug as the key (which is what the OrderBookManager expects)
-        # but the data for the market is a real Limitlex pair.
-        market_mapping[poly_slug] = {
-            "pair_id": pair['id'],
-            "currency_id_1": pair.get('currency_id_1'),
-            "currency_id_2": pair.get('currency_id_2'),
-            # Give it a descriptive name for logging/printing
-            "question": f"LIMITLEX: {poly_slug.replace('-', ' ').title()}",  # Changed to 'question' for consistency
-        }
+    # We use the Polymarket slug as the key (which is what the OrderBookManager expects)
+    market_mapping = {slug: listing.entry for slug, listing in matched.items() if slug in polymarket_mapping}
 
-    logger.info(f"Limitless: Successfully mapped {len(market_mapping)} Polymarket slugs to real exchange pairs for cross-arb checks.")
-    return market_mapping
\ No newline at end of file
+    logger.info(f"Limitless: Successfully matched {len(market_mapping)} Polymarket slugs to real exchange pairs for cross-arb checks.")
+    return market_mapping
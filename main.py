@@ -1,14 +1,26 @@
 import asyncio
+import json
 import os
 import logging
 import sys
+import time
 from polymarket import PolymarketClient
 from data.order_book import OrderBookManager 
 from polymarket.polymarket_client import PolymarketClient 
 from arbitrage.arbitrage_bot import ArbitrageBot 
+from arbitrage.opportunity_log import OpportunityLog
+from arbitrage.parallel_scanner import BookRelay, ShardedScanner, partition_mappings
 from gamma_fetch import get_market_mapping_for_bot 
 from limitless_fetch import fetch_limitless_market_mapping
+from kalshi_fetch import fetch_kalshi_market_mapping
+from matching import MarketMatcher, polymarket_listings
 from limitless import LimitlessClient
+from kalshi import KalshiClient
+from market_cache import DEFAULT_CACHE_PATH, MarketCache
+from data.poll_scheduler import AdaptivePollScheduler
+from capture import CaptureRecorder
+from monitoring import BotMetrics, MetricsServer
+from display import DisplaySink
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -18,14 +30,63 @@ logger = logging.getLogger(__name__)
 # REMOVED: EVENT_SLUG (no longer needed since we scan all markets)
 # Set a minimum liquidity threshold (in USD) to filter out inactive markets
 MIN_LIQUIDITY = 1000 
+# Max concurrent Gamma requests during market discovery
+DISCOVERY_CONCURRENCY = 32
+# Also track every outcome of the negRisk events found (whatever its liquidity), so events can be bought as a full basket
+COMPLETE_NEG_RISK_EVENTS = True
+# How often Limitless (REST only) is polled in the background, in seconds
+LIMITLESS_POLL_INTERVAL = 0.5
+# Poll each Limitless pair on its own adaptive interval (hot pairs faster) instead of every pair every LIMITLESS_POLL_INTERVAL
+LIMITLESS_ADAPTIVE_POLLING = True
+# Global Limitless request budget for adaptive polling, in requests per second
+LIMITLESS_MAX_RPS = 20
+# Max tokens per Polymarket WebSocket connection (the universe is split across connections)
+WS_SHARD_SIZE = 500
+# Kalshi markets to compare against Polymarket: { polymarket slug: {'ticker': 'KX...', 'question': str} }.
+# Kalshi is only connected when this is non-empty (needs KALSHI_API_KEY / KALSHI_PRIVATE_KEY in .env)
+KALSHI_MARKET_MAPPING = {}
+# ...or read from a JSON file of the same shape (e.g. the one written by the local mocks, `python -m mocks`)
+KALSHI_MAPPING_FILE = os.getenv("ARB_KALSHI_MAPPING_FILE")
+# With neither, match the open Kalshi markets to the Polymarket ones (only worth it with Kalshi credentials)
+KALSHI_MATCHING = bool(os.getenv("KALSHI_API_KEY"))
+# On-disk market metadata cache (point it elsewhere when running against the mocks)
+MARKET_CACHE_PATH = os.getenv("ARB_MARKET_CACHE_PATH", DEFAULT_CACHE_PATH)
+# Arbitrage scan engine: "python" (scalar checks) or "numpy" (vectorized, for large universes)
+SCAN_ENGINE = "python"
+# Split the markets across this many worker processes, each with its own Polymarket connections and scan (Limitless and Kalshi stay connected once, here); 0 or 1 keeps everything in this process
+SCAN_WORKERS = int(os.getenv("ARB_SCAN_WORKERS", "0"))
+# Set ARB_CAPTURE_DIR to record every raw venue frame/response there (replay with `python -m capture DIR`)
+CAPTURE_DIR = os.getenv("ARB_CAPTURE_DIR")
+# Every opportunity found is logged to rotating columnar files here (export: `python -m arbitrage.opportunity_log DIR out.csv`); empty disables it
+OPPORTUNITY_LOG_DIR = os.getenv("ARB_OPPORTUNITY_LOG_DIR", os.path.join("logs", "opportunities"))
+# Disk cap of that directory, across runs: the oldest files are removed beyond it
+OPPORTUNITY_LOG_MAX_MB = float(os.getenv("ARB_OPPORTUNITY_LOG_MAX_MB", "500"))
+# Local Prometheus-style metrics endpoint (http://127.0.0.1:<port>/metrics); 0 disables it
+METRICS_PORT = int(os.getenv("ARB_METRICS_PORT", "9108"))
+# "terminal" draws the ranked opportunities from a background thread; "headless" prints nothing but the logs
+DISPLAY_MODE = os.getenv("ARB_DISPLAY", "terminal")
+# Max screen redraws per second (detection itself is event driven and never waits for the screen)
+DISPLAY_MAX_FPS = 2
+# Max time the main loop waits for a book change before re-scanning anyway, in seconds
+IDLE_TIMEOUT = 0.5
 
 async def run_arbitrage_bot():
     """
     Orchestrates the dynamic market fetching, client connection, and arbitrage loop.
     """
+    started = time.perf_counter()
+    kalshi_mapping = KALSHI_MARKET_MAPPING
+    if KALSHI_MAPPING_FILE:
+        with open(KALSHI_MAPPING_FILE) as f:
+            kalshi_mapping = json.load(f)
+
     # 1. Fetch dynamic market mapping and tokens using gamma_fetch
+    # Market metadata is cached on disk, so a warm start only re-fetches what changed.
+    market_cache = MarketCache(MARKET_CACHE_PATH)
     logger.info(f"Step 1: Fetching market mapping for ALL active markets...")
-    market_mapping = get_market_mapping_for_bot(market_ids=None, min_liquidity=MIN_LIQUIDITY)
+    market_mapping = get_market_mapping_for_bot(market_ids=None, min_liquidity=MIN_LIQUIDITY, concurrency=DISCOVERY_CONCURRENCY, cache=market_cache,
+                                                complete_events=COMPLETE_NEG_RISK_EVENTS)
+    market_cache.save()
     
     if not market_mapping:
         # FIXED: Removed the reference to EVENT_SLUG since we are scanning all markets
@@ -36,24 +97,62 @@ async def run_arbitrage_bot():
     token_count = market_count * 2
     logger.info(f"✅ Found {market_count} markets (total {token_count} tokens) to monitor.")
 
+    # 1.5 Dynamic Limitless (and Kalshi) Mapping
+    # Other venues' markets are matched to the Polymarket ones through an inverted token index;
+    # match scores are cached, so a warm start only scores the markets that are new since the last run.
+    logger.info("Step 1.5: Matching Limitless (and Kalshi) markets to Polymarket...")
+    matcher = MarketMatcher()
+    matcher.load(market_cache)
+    matcher.sync("polymarket", polymarket_listings(market_mapping))
+    limitless_mapping = fetch_limitless_market_mapping(market_mapping, cache=market_cache, matcher=matcher)
+    logger.info(f"✅ Found {len(limitless_mapping)} markets on Limitless to compare.")
+    if not kalshi_mapping and KALSHI_MATCHING:
+        kalshi_mapping = fetch_kalshi_market_mapping(market_mapping, cache=market_cache, matcher=matcher)
+        logger.info(f"✅ Found {len(kalshi_mapping)} markets on Kalshi to compare.")
+    matcher.save(market_cache)
+    market_cache.save()
+
+    if SCAN_WORKERS > 1:
+        await run_sharded_bot(market_mapping, limitless_mapping, kalshi_mapping, started)
+        return
+
+    # 1.9 Optional raw market data capture (mappings first, so the capture can be replayed on its own).
+    # Attached before any client starts, so the initial book snapshots are captured too.
+    recorder = None
+    if CAPTURE_DIR:
+        recorder = CaptureRecorder(CAPTURE_DIR)
+        recorder.record_meta("polymarket_mapping", market_mapping)
+        recorder.record_meta("limitless_mapping", limitless_mapping)
+        recorder.record_meta("kalshi_mapping", kalshi_mapping)
+
     # 2. Initialize Polymarket Client with the fetched tokens
-    polymarket_client = PolymarketClient(token_ids=market_mapping)
-    polymarket_client.run()
+    # The client runs as tasks on this event loop (no background threads)
+    polymarket_client = PolymarketClient(token_ids=market_mapping, shard_size=WS_SHARD_SIZE)
+    polymarket_client.recorder = recorder
+    polymarket_client.start()
 
     # Wait for the WebSocket to connect and receive initial data
-    if not polymarket_client.wait_for_initial_data(timeout=60):
+    if not await polymarket_client.wait_for_initial_data(timeout=60):
         logger.error("🚨 Failed to receive initial Polymarket data from WebSocket, check your .env credentials or network.")
+        await polymarket_client.stop()
+        if recorder is not None:
+            recorder.close()
         return
+    logger.info(f"✅ Initial Polymarket books received after {time.perf_counter() - started:.2f}s")
     
-   # 2.5 Dynamic Limitless Mapping
-    logger.info("Step 2.5: Fetching dynamic Limitless market mapping...")
-    limitless_mapping = fetch_limitless_market_mapping()
-    logger.info(f"✅ Found {len(limitless_mapping)} markets on Limitless to compare.")
-
     # 2.6 Instantiate the Limitless Client
     # FIXED: Initialize the LimitlessClient with the dynamic mapping. 
     # This client will then handle fetching (or stubbing) the price data.
-    limitless_client = LimitlessClient(market_mapping=limitless_mapping) # <--- NEW LINE
+    scheduler = AdaptivePollScheduler(max_rps=LIMITLESS_MAX_RPS) if LIMITLESS_ADAPTIVE_POLLING else None
+    limitless_client = LimitlessClient(market_mapping=limitless_mapping, scheduler=scheduler) # <--- NEW LINE
+    limitless_client.recorder = recorder
+
+    # 2.7 Kalshi (WebSocket) for the configured markets
+    kalshi_client = None
+    if kalshi_mapping:
+        kalshi_client = KalshiClient(market_tickers=kalshi_mapping)
+        kalshi_client.recorder = recorder
+        kalshi_client.start()
 
     # 3. Initialize OrderBookManager
     # FIXED: Pass the instantiated client instead of None
@@ -61,32 +160,161 @@ async def run_arbitrage_bot():
         polymarket_client, 
         limitless_client, # <--- CHANGED FROM None
         market_mapping, 
-        limitless_mapping
+        limitless_mapping,
+        kalshi_client=kalshi_client,
+        kalshi_mapping=kalshi_mapping
     )
-    arb_bot = ArbitrageBot(order_book_manager)
+    arb_bot = ArbitrageBot(order_book_manager, engine=SCAN_ENGINE)
+    # Pairs close to a profitable cross get polled faster
+    limitless_client.cross_gap_fn = arb_bot.cross_gap
+
+    # 3.5 Opportunity log, latency histograms and connection stats
+    metrics_server = attach_outputs(arb_bot, polymarket_client=polymarket_client, limitless_client=limitless_client,
+                                    kalshi_client=kalshi_client)
 
     await asyncio.sleep(1) # Wait briefly for stable connection
 
+    # Fill the Limitless books once, then keep polling them in the background
+    await limitless_client.poll_all_order_books()
+    order_book_manager.update_order_books()
+    limitless_client.start_polling(LIMITLESS_POLL_INTERVAL)
+    arb_bot.find_arbitrage_opportunities()
+    order_book_manager.drain_dirty()
+    logger.info(f"✅ Startup complete in {time.perf_counter() - started:.2f}s ({market_count} markets, "
+                f"{len(limitless_mapping)} Limitless, {len(kalshi_mapping)} Kalshi)")
+    display = DisplaySink(arb_bot.format_opportunities, mode=DISPLAY_MODE, max_fps=DISPLAY_MAX_FPS).start()
+
     try:
         while True:
-            # Clear screen for cleaner output
-            os.system("cls" if os.name == "nt" else "clear")
-
-            order_book_manager.update_order_books()
+            # Sleep until a venue reports a book change; both venues feed the
+            # book store from their own tasks, so nothing here blocks on I/O
+            dirty = await order_book_manager.wait_for_changes(timeout=IDLE_TIMEOUT)
             
-            # Find and print opportunities for ALL markets
-            arb_bot.find_arbitrage_opportunities()
-            arb_bot.print_opportunities()
+            # Evaluate only the markets whose books changed
+            arb_bot.find_arbitrage_opportunities(dirty)
             
-            # Print a summary of ALL tracked markets
-            # arb_bot.print_market_summary()
+            # Hand the results to the display thread; it redraws at its own capped rate
+            display.submit(arb_bot.opportunities)
+
+    except KeyboardInterrupt:
+        logger.info("Bot stopped manually.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+    finally:
+        display.stop()
+        await limitless_client.stop_polling()
+        if kalshi_client is not None:
+            await kalshi_client.stop()
+        await polymarket_client.stop()
+        if recorder is not None:
+            recorder.close()
+        close_outputs(arb_bot, metrics_server)
 
-            await asyncio.sleep(0.5) 
 
+def attach_outputs(arb_bot, polymarket_client=None, limitless_client=None, kalshi_client=None):
+    """
+    Gives the bot its opportunity log and metrics (watching the given venue
+    clients, if any; polymarket_client only needs get_shard_stats). Returns
+    the metrics server, or None.
+    """
+    if OPPORTUNITY_LOG_DIR:
+        arb_bot.opp_log = OpportunityLog(OPPORTUNITY_LOG_DIR, max_bytes=int(OPPORTUNITY_LOG_MAX_MB * 1024 * 1024))
+    if not METRICS_PORT:
+        return None
+    
+    metrics = BotMetrics()
+    metrics.watch_clients(polymarket_client=polymarket_client, limitless_client=limitless_client,
+                          kalshi_client=kalshi_client)
+    arb_bot.order_book_manager.metrics = metrics
+    arb_bot.metrics = metrics
+    arb_bot.lifecycle.metrics = metrics
+    try:
+        metrics_server = MetricsServer(metrics.registry, port=METRICS_PORT).start()
+        logger.info(f"📈 Metrics available at {metrics_server.url}")
+        return metrics_server
+    except OSError as e:
+        logger.error(f"Could not start the metrics endpoint on port {METRICS_PORT}: {e}")
+        return None
+
+
+def close_outputs(arb_bot, metrics_server):
+    """Logs the opportunity lifetimes and closes the opportunity log and metrics server."""
+    stats = arb_bot.lifecycle.duration_stats()
+    if stats:
+        logger.info(f"📊 {stats['count']} opportunities closed | half-life {stats['half_life']:.1f}s | "
+                    f"mean {stats['mean']:.1f}s | p90 {stats['p90']:.1f}s | max {stats['max']:.1f}s")
+    if arb_bot.opp_log is not None:
+        arb_bot.opp_log.close()
+    if metrics_server is not None:
+        metrics_server.stop()
+
+
+async def run_sharded_bot(market_mapping, limitless_mapping, kalshi_mapping, started):
+    """
+    Sharded mode (SCAN_WORKERS > 1): the markets are split across worker
+    processes, each connecting to Polymarket for its own markets and scanning
+    them (see arbitrage/parallel_scanner.py). This process keeps the single
+    Limitless poller and Kalshi connection and relays their books to the
+    workers, then merges the workers' results into one ranked list, which it
+    shows, logs and exports as metrics.
+    """
+    if CAPTURE_DIR:
+        logger.warning("Raw data capture is not available with scan workers, ignoring ARB_CAPTURE_DIR.")
+    
+    # The parent's bot never scans: it holds the merged opportunities and their lifecycles
+    order_book_manager = OrderBookManager(None, None, market_mapping, limitless_mapping, kalshi_mapping=kalshi_mapping)
+    arb_bot = ArbitrageBot(order_book_manager)
+    
+    # One set of Limitless/Kalshi connections for every worker
+    scheduler = AdaptivePollScheduler(max_rps=LIMITLESS_MAX_RPS) if LIMITLESS_ADAPTIVE_POLLING else None
+    limitless_client = LimitlessClient(market_mapping=limitless_mapping, scheduler=scheduler)
+    kalshi_client = None
+    if kalshi_mapping:
+        kalshi_client = KalshiClient(market_tickers=kalshi_mapping)
+        kalshi_client.start()
+    
+    shards = partition_mappings(market_mapping, SCAN_WORKERS, limitless_mapping, kalshi_mapping)
+    config = {"engine": SCAN_ENGINE, "ws_shard_size": WS_SHARD_SIZE, "idle_timeout": IDLE_TIMEOUT}
+    scanner = ShardedScanner(arb_bot, [dict(config, mappings=shard) for shard in shards])
+    # The Polymarket connections live in the workers: their stats come with the reports
+    metrics_server = attach_outputs(arb_bot, polymarket_client=scanner, limitless_client=limitless_client,
+                                    kalshi_client=kalshi_client)
+    relay = BookRelay(scanner.inboxes, {
+        "limitless": {slug: k for k, shard in enumerate(shards) for slug in shard[1]},
+        "kalshi": {entry['ticker']: k for k, shard in enumerate(shards) for entry in shard[2].values()},
+    })
+    relay.attach("limitless", limitless_client)
+    relay.attach("kalshi", kalshi_client)
+    # The workers scan, so the poll priorities come from the gaps they report
+    limitless_client.cross_gap_fn = scanner.gaps.get
+    
+    await limitless_client.poll_all_order_books()
+    scanner.start()
+    relay.publish_all()
+    limitless_client.start_polling(LIMITLESS_POLL_INTERVAL)
+    logger.info(f"✅ Startup complete in {time.perf_counter() - started:.2f}s ({len(market_mapping)} markets on "
+                f"{SCAN_WORKERS} scan workers, {len(limitless_mapping)} Limitless, {len(kalshi_mapping)} Kalshi)")
+    display = DisplaySink(arb_bot.format_opportunities, mode=DISPLAY_MODE, max_fps=DISPLAY_MAX_FPS).start()
+    
+    try:
+        while scanner.is_alive():
+            # Worker reports arrive on a process queue: wait for them off the event loop
+            reports = await asyncio.to_thread(scanner.collect, IDLE_TIMEOUT)
+            if reports:
+                scanner.apply(reports)
+                display.submit(arb_bot.opportunities)
+        logger.error("🚨 Every scan worker exited.")
     except KeyboardInterrupt:
         logger.info("Bot stopped manually.")
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
+    finally:
+        display.stop()
+        await limitless_client.stop_polling()
+        if kalshi_client is not None:
+            await kalshi_client.stop()
+        scanner.stop()
+        close_outputs(arb_bot, metrics_server)
 
 
 async def main():
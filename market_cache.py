@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+DEFAULT_CACHE_PATH = os.path.join(".cache", "market_cache.json")
+CACHE_FORMAT_VERSION = 3     # 2: parsed markets carry their event (eventId, negRisk, ...); 3: endDate, groupItemTitle
+# Force a full re-download once a venue's cache is older than this
+CACHE_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+def parse_timestamp(value):
+    """
+    Converts an ISO-8601 timestamp (e.g. Gamma's updatedAt) into epoch seconds.
+    Returns 0.0 if the value is missing or malformed.
+    """
+    if not value:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class MarketCache:
+    """
+    A persistent, on-disk store of market/pair metadata keyed by venue and id.
+
+    Each venue keeps its own records plus a small metadata dict used for
+    revalidation (ETag / Last-Modified headers, the newest updatedAt seen,
+    and when the venue was last fully synced).
+
+    File layout:
+        { "version": 3,
+          "venues": { venue: { "meta": {...}, "records": { id: record } } } }
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.venues = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Loads the cache file if it exists. A missing or corrupt file yields an empty cache."""
+        if not os.path.exists(self.path):
+            logger.info(f"No market cache at {self.path}, starting cold.")
+            return
+
+        started = time.perf_counter()
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable market cache {self.path}: {e}")
+            return
+
+        if data.get("version") != CACHE_FORMAT_VERSION:
+            logger.warning(f"Market cache format {data.get('version')} != {CACHE_FORMAT_VERSION}, starting cold.")
+            return
+
+        self.venues = data.get("venues", {})
+        counts = ", ".join(f"{venue}={len(v.get('records', {}))}" for venue, v in self.venues.items())
+        logger.info(f"Loaded market cache in {(time.perf_counter() - started) * 1000:.1f}ms ({counts or 'empty'}).")
+
+    def save(self):
+        """Atomically writes the cache to disk (only if something changed)."""
+        if not self._dirty:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": CACHE_FORMAT_VERSION, "venues": self.venues}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(f"Failed to write market cache {self.path}: {e}")
+
+    def _venue(self, venue):
+        return self.venues.setdefault(venue, {"meta": {}, "records": {}})
+
+    # ----------------------------------------------------------------------
+    # RECORDS
+    # ----------------------------------------------------------------------
+
+    def records(self, venue):
+        """Returns the { id: record } dict for a venue (empty if nothing is cached)."""
+        return self._venue(venue)["records"]
+
+    def upsert(self, venue, record_id, record):
+        self._venue(venue)["records"][str(record_id)] = record
+        self._dirty = True
+
+    def remove(self, venue, record_id):
+        if self._venue(venue)["records"].pop(str(record_id), None) is not None:
+            self._dirty = True
+
+    def replace_all(self, venue, records):
+        """Replaces every record of a venue (used after a full re-download)."""
+        self._venue(venue)["records"] = {str(k): v for k, v in records.items()}
+        self._dirty = True
+
+    # ----------------------------------------------------------------------
+    # REVALIDATION METADATA
+    # ----------------------------------------------------------------------
+
+    def get_meta(self, venue, key, default=None):
+        return self._venue(venue)["meta"].get(key, default)
+
+    def set_meta(self, venue, key, value):
+        meta = self._venue(venue)["meta"]
+        if meta.get(key) != value:
+            meta[key] = value
+            self._dirty = True
+
+    def is_fresh(self, venue, max_age=CACHE_MAX_AGE_SECONDS):
+        """True if the venue was fully synced recently enough to be refreshed incrementally."""
+        synced_at = self.get_meta(venue, "full_sync_at", 0)
+        return bool(self.records(venue)) and (time.time() - synced_at) < max_age
+
+    def conditional_headers(self, venue, key="list"):
+        """Builds If-None-Match / If-Modified-Since headers from a stored response."""
+        headers = {}
+        etag = self.get_meta(venue, f"{key}_etag")
+        last_modified = self.get_meta(venue, f"{key}_last_modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def store_validators(self, venue, response, key="list"):
+        """Remembers the ETag / Last-Modified headers of a 200 response."""
+        self.set_meta(venue, f"{key}_etag", response.headers.get("ETag"))
+        self.set_meta(venue, f"{key}_last_modified", response.headers.get("Last-Modified"))
@@ -0,0 +1,6 @@
+# matching/__init__.py
+from .engine import BASE_VENUE, MarketMatcher
+from .listings import Listing, kalshi_listings, limitless_listings, polymarket_listings, tokenize
+
+__all__ = ['BASE_VENUE', 'Listing', 'MarketMatcher', 'kalshi_listings', 'limitless_listings',
+           'polymarket_listings', 'tokenize']
@@ -0,0 +1,304 @@
+# File: matching/engine.py
+
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- MATCHING SETTINGS ---
+BASE_VENUE = "polymarket"          # Every other venue's listings are matched against this one's
+DEFAULT_MIN_SCORE = 0.65           # Candidate pairs scoring lower are dropped
+DEFAULT_TOP_K = 3                  # Candidates kept per listing
+DEFAULT_MAX_POSTINGS = 1_000       # Tokens shared by more listings of a venue than this are not looked up
+DATE_TOLERANCE_SECONDS = 3 * 24 * 60 * 60
+DATE_MISMATCH_PENALTY = 0.5        # Score factor when both end times are known and further apart than that
+NUMBER_MISMATCH_PENALTY = 0.5      # Score factor when each side has a number (strike, year...) the other lacks
+CACHE_VENUE = "matching"           # Venue key used in the on-disk MarketCache
+
+
+class MarketMatcher:
+    """
+    Matches the listings of other venues (Limitless pairs, Kalshi tickers) to
+    Polymarket markets through an inverted index over their tokens.
+
+    Each venue's listings are indexed token -> listing ids. A listing is
+    scored only against the listings it shares an informative token with
+    (tokens listed by more than max_postings listings are skipped), so a
+    query touches a few postings lists instead of the whole other universe.
+    Those get a full score: the IDF-weighted cosine of the two token sets,
+    halved if their end times disagree or each side carries a number
+    (strike, year) that the other lacks. Every listing keeps its top_k
+    candidates above min_score; match() assigns them one-to-one, best first.
+
+    Work is incremental: sync() compares fingerprints and only re-scores what
+    changed (new or edited listings, and listings whose candidates were
+    removed), and the candidates survive restarts through save()/load().
+    """
+    def __init__(self, min_score=DEFAULT_MIN_SCORE, top_k=DEFAULT_TOP_K, max_postings=DEFAULT_MAX_POSTINGS):
+        self.min_score = min_score
+        self.top_k = top_k
+        self.max_postings = max_postings
+        self.listings = {}          # { venue: { id: Listing } }
+        self._index = {}            # { venue: { token: set(ids) } }
+        self._df = {}               # { token: listings of every venue holding it }
+        self._doc_count = 0
+        self._weights = {}          # { token: IDF weight ** 2 }, reset when the listings change
+        self._norms = {}            # { (venue, id): norm }, reset when the listings change
+        self._fingerprints = {}     # { venue: { id: fingerprint } } of the listings the candidates were scored for
+        self._candidates = {}       # { venue: { id: [(score, base id), ...] } } best first
+        self._requery = {}          # { venue: set(ids) } to score from scratch at the next match()
+        self._base_changed = set()  # Base listings added or edited since load()
+        self._matched = set()       # Venues whose candidates are up to date with the base listings
+
+    def _settings(self):
+        return [self.min_score, self.top_k, self.max_postings, DATE_MISMATCH_PENALTY, NUMBER_MISMATCH_PENALTY]
+
+    # ----------------------------------------------------------------------
+    # LISTINGS
+    # ----------------------------------------------------------------------
+
+    def sync(self, venue, listings):
+        """
+        Makes `listings` the venue's whole universe: listings that are new or
+        whose fingerprint changed are (re-)scored at the next match(),
+        listings missing from it are removed.
+
+        Returns:
+            Tuple[int, int]: (new or changed listings, removed listings).
+        """
+        started = time.perf_counter()
+        for listing in self.listings.get(venue, {}).values():
+            self._count_tokens(listing, -1)
+
+        current = {listing.id: listing for listing in listings}
+        index = {}
+        for listing in current.values():
+            self._count_tokens(listing, 1)
+            for token in listing.tokens:
+                postings = index.get(token)
+                if postings is None:
+                    postings = index[token] = set()
+                postings.add(listing.id)
+        self.listings[venue] = current
+        self._index[venue] = index
+        self._weights = {}
+        self._norms = {}
+
+        known = self._fingerprints.setdefault(venue, {})
+        changed = {listing_id for listing_id, listing in current.items() if known.get(listing_id) != listing.fingerprint}
+        removed = [listing_id for listing_id in known if listing_id not in current]
+        for listing_id in removed:
+            del known[listing_id]
+        for listing_id in changed:
+            known[listing_id] = current[listing_id].fingerprint
+
+        if venue == BASE_VENUE:
+            # Candidates pointing at a removed or edited market may hide the next best: score those again
+            stale = set(removed) | changed
+            self._base_changed |= changed
+            self._base_changed -= set(removed)
+            self._matched.clear()
+            for other, candidates in self._candidates.items():
+                requery = self._requery.setdefault(other, set())
+                requery.update(listing_id for listing_id, scored in candidates.items()
+                               if any(base_id in stale for _, base_id in scored))
+        else:
+            candidates = self._candidates.setdefault(venue, {})
+            for listing_id in removed:
+                candidates.pop(listing_id, None)
+            self._requery.setdefault(venue, set()).update(changed)
+
+        logger.info(f"Matcher: {len(current)} {venue} listings indexed ({len(changed)} new or changed, "
+                    f"{len(removed)} removed) in {(time.perf_counter() - started) * 1000:.0f}ms.")
+        return len(changed), len(removed)
+
+    def _count_tokens(self, listing, delta):
+        df = self._df
+        for token in listing.tokens:
+            df[token] = df.get(token, 0) + delta
+        self._doc_count += delta
+
+    # ----------------------------------------------------------------------
+    # SCORING
+    # ----------------------------------------------------------------------
+
+    def _weight(self, token):
+        """Squared IDF over the listings of every venue (so a score is the same in both directions)."""
+        weight = self._weights.get(token)
+        if weight is None:
+            weight = self._weights[token] = (math.log((self._doc_count + 1) / (self._df.get(token, 0) + 1)) + 1.0) ** 2
+        return weight
+
+    def _norm(self, listing):
+        key = (listing.venue, listing.id)
+        norm = self._norms.get(key)
+        if norm is None:
+            weight = self._weight
+            norm = self._norms[key] = math.sqrt(sum(weight(token) for token in listing.tokens)) or 1.0
+        return norm
+
+    def score(self, a, b):
+        """Similarity of two listings in [0, 1]."""
+        shared = a.tokens & b.tokens
+        if not shared:
+            return 0.0
+        dot = sum(self._weight(token) for token in shared)
+        return self._adjust(a, b, dot / (self._norm(a) * self._norm(b)))
+
+    @staticmethod
+    def _adjust(a, b, score):
+        if a.end_time and b.end_time and abs(a.end_time - b.end_time) > DATE_TOLERANCE_SECONDS:
+            score *= DATE_MISMATCH_PENALTY
+        if a.numbers and b.numbers and not (a.numbers <= b.numbers or b.numbers <= a.numbers):
+            score *= NUMBER_MISMATCH_PENALTY
+        return score
+
+    def _query(self, listing, venue):
+        """
+        Scores a listing against the listings of `venue` that share informative
+        tokens with it. Returns [(score, id), ...] above min_score, best first.
+
+        Only the listing's rarest tokens are looked up: a cosine is at most
+        sqrt(shared weight) / norm (the shared weight cannot exceed the other
+        listing's squared norm), so once the weight of the tokens left is below
+        (min_score * norm) ** 2, a listing sharing nothing but those cannot
+        reach min_score. The common tokens then only count towards the score.
+        """
+        index = self._index.get(venue)
+        if not index:
+            return []
+        weight = self._weight
+        max_postings = self.max_postings
+        norm = self._norm(listing)
+        min_dot = (self.min_score * norm) ** 2
+        remaining = norm * norm
+
+        found = set()
+        for token in sorted(listing.tokens, key=weight, reverse=True):
+            if remaining < min_dot:
+                break
+            remaining -= weight(token)
+            postings = index.get(token)
+            if postings and len(postings) <= max_postings:
+                found.update(postings)
+
+        tokens = listing.tokens
+        listings = self.listings[venue]
+        results = []
+        for listing_id in found:
+            other = listings[listing_id]
+            dot = sum(weight(token) for token in tokens & other.tokens)
+            if dot < min_dot:
+                continue
+            score = self._adjust(listing, other, dot / (norm * self._norm(other)))
+            if score >= self.min_score:
+                results.append((score, listing_id))
+        results.sort(reverse=True)
+        return results
+
+    def _merge(self, candidates, listing_id, score, base_id):
+        scored = [entry for entry in candidates.get(listing_id, ()) if entry[1] != base_id]
+        scored.append((score, base_id))
+        scored.sort(reverse=True)
+        candidates[listing_id] = scored[:self.top_k]
+
+    # ----------------------------------------------------------------------
+    # MATCHING
+    # ----------------------------------------------------------------------
+
+    def pairs(self, venue):
+        """
+        Brings the venue's candidates up to date and returns every scored
+        candidate pair.
+
+        Returns:
+            List[Tuple[float, str, str]]: (score, base id, venue listing id), best first.
+        """
+        started = time.perf_counter()
+        listings = self.listings.get(venue, {})
+        base = self.listings.get(BASE_VENUE, {})
+        candidates = self._candidates.setdefault(venue, {})
+        requery = self._requery.pop(venue, set())
+
+        # 1. New or affected listings: look them up in the base index
+        for listing_id in requery:
+            listing = listings.get(listing_id)
+            if listing is not None:
+                candidates[listing_id] = self._query(listing, BASE_VENUE)[:self.top_k]
+
+        # 2. New base markets: look them up in this venue's index and offer them to what they hit
+        if len(requery) < len(listings):
+            for base_id in self._base_changed:
+                listing = base.get(base_id)
+                if listing is None:
+                    continue
+                for score, listing_id in self._query(listing, venue):
+                    if listing_id not in requery:
+                        self._merge(candidates, listing_id, score, base_id)
+        self._matched.add(venue)
+
+        result = [(score, base_id, listing_id)
+                  for listing_id, scored in candidates.items() if listing_id in listings
+                  for score, base_id in scored if base_id in base]
+        result.sort(reverse=True)
+        logger.info(f"Matcher: scored {len(requery)} {venue} listings and {len(self._base_changed)} new "
+                    f"{BASE_VENUE} markets in {(time.perf_counter() - started) * 1000:.0f}ms, "
+                    f"{len(result)} candidate pairs.")
+        return result
+
+    def match(self, venue):
+        """
+        Assigns the venue's listings to base markets one-to-one, best score first.
+
+        Returns:
+            Dict[str, Listing]: Base id (Polymarket slug) -> matched venue listing.
+        """
+        listings = self.listings.get(venue, {})
+        matched = {}
+        used = set()
+        for score, base_id, listing_id in self.pairs(venue):
+            if base_id in matched or listing_id in used:
+                continue
+            matched[base_id] = listings[listing_id]
+            used.add(listing_id)
+        return matched
+
+    # ----------------------------------------------------------------------
+    # PERSISTENCE
+    # ----------------------------------------------------------------------
+
+    def load(self, cache):
+        """
+        Restores the fingerprints and candidates saved in a MarketCache, so
+        only listings that are new or changed since then get scored.
+        Ignored if they were saved under different settings.
+        """
+        records = cache.records(CACHE_VENUE)
+        if not records or cache.get_meta(CACHE_VENUE, "settings") != self._settings():
+            return
+        for key, record in records.items():
+            venue, _, listing_id = key.partition(":")
+            self._fingerprints.setdefault(venue, {})[listing_id] = record["fp"]
+            if venue != BASE_VENUE:
+                self._candidates.setdefault(venue, {})[listing_id] = [tuple(entry) for entry in record.get("c", ())]
+        logger.info(f"Matcher: restored {len(records)} scored listings from the cache.")
+
+    def save(self, cache):
+        """
+        Stores the fingerprints and candidates in a MarketCache. Venues that
+        were not matched since their last sync are left out (and fully scored
+        again next time).
+        """
+        records = {}
+        for venue, known in self._fingerprints.items():
+            if venue != BASE_VENUE and venue not in self._matched:
+                continue
+            candidates = self._candidates.get(venue, {})
+            for listing_id, fingerprint in known.items():
+                record = {"fp": fingerprint}
+                if venue != BASE_VENUE:
+                    record["c"] = [[round(score, 4), base_id] for score, base_id in candidates.get(listing_id, ())]
+                records[f"{venue}:{listing_id}"] = record
+        cache.replace_all(CACHE_VENUE, records)
+        cache.set_meta(CACHE_VENUE, "settings", self._settings())
@@ -0,0 +1,133 @@
+# File: matching/listings.py
+
+import re
+import zlib
+
+from market_cache import parse_timestamp
+
+# Words that appear in nearly every market question and say nothing about which market it is
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "before", "by", "does", "do", "for", "from", "has",
+    "have", "if", "in", "is", "it", "market", "no", "not", "of", "on", "or", "than", "that", "the",
+    "this", "to", "what", "which", "who", "will", "win", "with", "yes",
+))
+MONTHS = {
+    "january": "jan", "february": "feb", "march": "mar", "april": "apr", "june": "jun", "july": "jul",
+    "august": "aug", "september": "sep", "sept": "sep", "october": "oct", "november": "nov", "december": "dec",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3})")
+_SCALED_RE = re.compile(r"\b(\d+(?:\.\d+)?)([km])\b")
+_SCALES = {"k": 1_000, "m": 1_000_000}
+
+
+def _scale(match):
+    value = float(match.group(1)) * _SCALES[match.group(2)]
+    return f"{value:.0f}" if value.is_integer() else str(value)
+
+
+def tokenize(text):
+    """
+    Normalizes a question/title into a set of match tokens: lowercase words
+    and numbers, without stopwords, with month names shortened, simple plurals
+    folded and numbers spelled out the same way ("$100k" and "100,000" both
+    give "100000", "007" gives "7").
+    """
+    text = _THOUSANDS_RE.sub("", text.lower())
+    text = _SCALED_RE.sub(_scale, text)
+    tokens = set()
+    for word in _WORD_RE.findall(text):
+        if word in STOPWORDS:
+            continue
+        word = MONTHS.get(word, word)
+        if word.isdigit():
+            word = word.lstrip("0") or "0"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss") and not word[0].isdigit():
+            word = word[:-1]
+        tokens.add(word)
+    return frozenset(tokens)
+
+
+class Listing:
+    """
+    One market of one venue, as the matcher sees it: its match tokens, the
+    numbers among them, its end time and the bot mapping entry to emit when it
+    is matched. The fingerprint changes whenever the matched fields do.
+    """
+    __slots__ = ("venue", "id", "tokens", "numbers", "end_time", "entry", "fingerprint")
+
+    def __init__(self, venue, listing_id, text, end_time=None, entry=None):
+        """
+        Args:
+            venue: Venue name (e.g. "polymarket", "limitless", "kalshi").
+            listing_id: The venue's id (Polymarket slug, Limitless pair id, Kalshi ticker).
+            text: Everything descriptive about the market (question, slug words, outcome names...).
+            end_time: Resolution/close time in epoch seconds, if known.
+            entry: Mapping entry for the bot (see limitless_fetch, kalshi_fetch).
+        """
+        self.venue = venue
+        self.id = str(listing_id)
+        self.tokens = tokenize(text)
+        self.numbers = frozenset(token for token in self.tokens if token[0].isdigit())
+        self.end_time = end_time or None
+        self.entry = entry
+        self.fingerprint = f"{zlib.crc32(text.encode('utf-8')):08x}:{int(self.end_time or 0)}"
+
+
+def _first(record, *keys):
+    for key in keys:
+        if record.get(key):
+            return record[key]
+    return None
+
+
+# ----------------------------------------------------------------------
+# VENUE LISTINGS
+# ----------------------------------------------------------------------
+
+def polymarket_listings(mapping):
+    """Listings of a Polymarket bot mapping (see gamma_fetch.get_market_mapping_for_bot), keyed by slug."""
+    listings = []
+    for slug, entry in mapping.items():
+        parts = [entry.get("question") or "", slug.replace("-", " "),
+                 entry.get("event_title") or "", entry.get("outcome_title") or ""]
+        listings.append(Listing("polymarket", slug, " ".join(parts), parse_timestamp(entry.get("end_date"))))
+    return listings
+
+
+def limitless_listings(raw_pairs):
+    """Listings of raw Limitless pairs (see limitless_fetch.fetch_limitless_pairs), keyed by pair id."""
+    listings = []
+    for pair in raw_pairs:
+        if not pair.get('id'):
+            continue
+        title = _first(pair, "question", "title", "name", "description") or ""
+        # Without a title, the currency ids are all there is to match on
+        text = title or f"{pair.get('currency_id_1') or ''} {pair.get('currency_id_2') or ''}"
+        end_time = parse_timestamp(_first(pair, "expiration_date", "expires_at", "end_date", "deadline"))
+        entry = {
+            "pair_id": pair['id'],
+            "currency_id_1": pair.get('currency_id_1'),
+            "currency_id_2": pair.get('currency_id_2'),
+            "question": f"LIMITLEX: {title or pair['id']}",
+        }
+        listings.append(Listing("limitless", pair['id'], text, end_time, entry))
+    return listings
+
+
+def kalshi_listings(raw_markets):
+    """Listings of raw Kalshi markets (see kalshi_fetch.fetch_kalshi_markets), keyed by ticker."""
+    listings = []
+    for market in raw_markets:
+        ticker = market.get("ticker")
+        if not ticker:
+            continue
+        title = market.get("title") or ticker
+        parts = [title, market.get("subtitle") or ""]
+        if market.get("yes_sub_title") and market["yes_sub_title"] not in title:
+            parts.append(market["yes_sub_title"])
+        end_time = parse_timestamp(_first(market, "close_time", "expected_expiration_time", "expiration_time"))
+        entry = {"ticker": ticker, "question": f"KALSHI: {title}"}
+        listings.append(Listing("kalshi", ticker, " ".join(parts), end_time, entry))
+    return listings
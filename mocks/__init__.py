@@ -0,0 +1,7 @@
+# mocks/__init__.py
+from .faults import FaultProfile
+from .rest import GammaMockServer, LimitlessMockServer
+from .universe import MockUniverse
+from .ws import ClobMockServer, KalshiMockServer
+
+__all__ = ['ClobMockServer', 'FaultProfile', 'GammaMockServer', 'KalshiMockServer', 'LimitlessMockServer', 'MockUniverse']
@@ -0,0 +1,4 @@
+# mocks/__main__.py
+from mocks.runner import main
+
+main()
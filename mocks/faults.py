@@ -0,0 +1,48 @@
+# File: mocks/faults.py
+
+import random
+
+
+class FaultProfile:
+    """
+    Latency and failure injection shared by the mock servers.
+
+    REST servers delay every response by delay() and answer a share of the
+    requests with an error status; WebSocket servers delay every published
+    batch, drop connections at random and (Kalshi) skip sequence numbers.
+    """
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, disconnect_rate=0.0, gap_rate=0.0, seed=None):
+        """
+        Args:
+            latency_ms: Base delay added to every response / published batch.
+            jitter_ms: Extra uniformly distributed delay on top of latency_ms.
+            error_rate: Fraction of REST requests answered with a 429/503.
+            disconnect_rate: Expected abrupt disconnects per WebSocket connection per minute.
+            gap_rate: Fraction of Kalshi deltas published after a skipped sequence number.
+            seed: RNG seed for reproducible fault sequences.
+        """
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.disconnect_rate = disconnect_rate
+        self.gap_rate = gap_rate
+        self.rng = random.Random(seed)
+
+    def delay(self):
+        """Seconds to hold back the next response or batch."""
+        if self.jitter:
+            return self.latency + self.rng.uniform(0.0, self.jitter)
+        return self.latency
+
+    def error_status(self):
+        """An HTTP error status to answer with, or None to serve the request normally."""
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.rng.choice((429, 503))
+        return None
+
+    def should_disconnect(self, elapsed):
+        """True if a connection should be dropped now, given `elapsed` seconds since the last check."""
+        return bool(self.disconnect_rate) and self.rng.random() < self.disconnect_rate * elapsed / 60.0
+
+    def should_gap(self):
+        return bool(self.gap_rate) and self.rng.random() < self.gap_rate
@@ -0,0 +1,190 @@
+# File: mocks/rest.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from mocks.faults import FaultProfile
+
+logger = logging.getLogger(__name__)
+
+LIMITLESS_API_PREFIX = "/api"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled client sessions reuse their connections like against the live APIs
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        mock = self.server.mock
+        delay = mock.faults.delay()
+        if delay:
+            time.sleep(delay)
+
+        status = mock.faults.error_status()
+        if status is not None:
+            mock.error_count += 1
+            self._send(status, {"error": {"message": "Injected mock failure"}})
+            return
+
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            status, payload = mock.route(url.path, query)
+        except Exception as e:
+            logger.error(f"{type(mock).__name__} failed on {self.path}: {e}")
+            status, payload = 500, {"error": {"message": str(e)}}
+        mock.request_count += 1
+        self._send(status, payload, etag=status == 200)
+
+    def _send(self, status, payload, etag=False):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        tag = f'"{hashlib.md5(body).hexdigest()}"' if etag else None
+        if tag is not None and self.headers.get("If-None-Match") == tag:
+            status, body = 304, b""
+
+        self.send_response(status)
+        if tag is not None:
+            self.send_header("ETag", tag)
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _MockHTTPServer:
+    """
+    A threaded JSON-over-HTTP mock serving one venue's REST API.
+
+    Subclasses implement route(path, query) -> (status, payload). Responses
+    carry an ETag (If-None-Match is answered with a 304) and go through the
+    server's FaultProfile (latency, injected 429/503 errors).
+    """
+    def __init__(self, universe, faults=None, host="127.0.0.1", port=0):
+        self.universe = universe
+        self.faults = faults or FaultProfile()
+        self.request_count = 0
+        self.error_count = 0
+        self._httpd = ThreadingHTTPServer((host, port), _Handler, bind_and_activate=False)
+        self._httpd.request_queue_size = 128
+        self._httpd.daemon_threads = True
+        self._httpd.server_bind()
+        self._httpd.server_activate()
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=f"{type(self).__name__}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def route(self, path, query):
+        raise NotImplementedError
+
+
+class GammaMockServer(_MockHTTPServer):
+    """
+    Polymarket Gamma REST: the paged /markets list (limit/offset, closed,
+    active, liquidity_num_min, event_id, order=updatedAt), /markets/{id} and
+    /events/slug/{slug}. Also answers the CLOB REST /book?token_id= endpoint,
+    so CLOB_BASE_URL can point at the same server.
+    """
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def route(self, path, query):
+        if path == "/markets":
+            return 200, self._list_markets(query)
+        if path.startswith("/markets/"):
+            market = self.universe.markets_by_id.get(path[len("/markets/"):])
+            return (200, market) if market is not None else (404, {"error": "market not found"})
+        if path.startswith("/events/slug/"):
+            event = self.universe.events.get(path[len("/events/slug/"):])
+            return (200, event) if event is not None else (404, {"error": "event not found"})
+        if path == "/book":
+            return self._book(query.get("token_id"))
+        return 404, {"error": f"unknown path {path}"}
+
+    def _list_markets(self, query):
+        markets = self.universe.markets
+        if query.get("closed") in ("true", "false"):
+            closed = query["closed"] == "true"
+            markets = [m for m in markets if m["closed"] == closed]
+        if query.get("active") == "true":
+            markets = [m for m in markets if m["active"]]
+        if "liquidity_num_min" in query:
+            min_liquidity = float(query["liquidity_num_min"])
+            markets = [m for m in markets if m["liquidityNum"] >= min_liquidity]
+        if "event_id" in query:
+            markets = [m for m in markets if any(e["id"] == query["event_id"] for e in m["events"])]
+        if query.get("order") == "updatedAt":
+            markets = sorted(markets, key=lambda m: m["updatedAt"], reverse=query.get("ascending") != "true")
+
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 100))
+        return markets[offset:offset + limit]
+
+    def _book(self, token_id):
+        if token_id not in self.universe.token_market:
+            return 404, {"error": "No orderbook exists for the requested token id"}
+        mid = self.universe.token_mid(token_id)
+        return 200, {
+            "asset_id": token_id,
+            "bids": [{"price": f"{p:.2f}", "size": f"{s:.2f}"} for p, s in self.universe.levels(mid, True)],
+            "asks": [{"price": f"{p:.2f}", "size": f"{s:.2f}"} for p, s in self.universe.levels(mid, False)],
+        }
+
+
+class LimitlessMockServer(_MockHTTPServer):
+    """
+    Limitless (Limitlex) REST: /api/public/pairs and /api/public/order_book?pair_id=.
+    Each order book request moves the pair's price with probability
+    `change_rate`, so polls see a realistic mix of changed and unchanged books.
+    """
+    def __init__(self, universe, faults=None, host="127.0.0.1", port=0, change_rate=0.3):
+        super().__init__(universe, faults=faults, host=host, port=port)
+        self.change_rate = change_rate
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}{LIMITLESS_API_PREFIX}"
+
+    def route(self, path, query):
+        if path == f"{LIMITLESS_API_PREFIX}/public/pairs":
+            return 200, {"result": {"data": self.universe.pairs}}
+        if path == f"{LIMITLESS_API_PREFIX}/public/order_book":
+            return self._order_book(query.get("pair_id"))
+        return 404, {"error": {"message": f"Unknown path {path}"}}
+
+    def _order_book(self, pair_id):
+        slug = self.universe.pair_market.get(pair_id)
+        if slug is None:
+            return 200, {"error": {"message": f"Pair {pair_id} not found"}}
+        if self.universe.rng.random() < self.change_rate:
+            self.universe.step(slug)
+        mid = self.universe.venue_mid(slug)
+        return 200, {"result": {
+            "bids": [{"price": f"{p:.2f}", "size": f"{s}"} for p, s in self.universe.levels(mid, True)],
+            "asks": [{"price": f"{p:.2f}", "size": f"{s}"} for p, s in self.universe.levels(mid, False)],
+        }}
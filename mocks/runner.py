@@ -0,0 +1,122 @@
+# File: mocks/runner.py
+"""
+Runs local stand-ins for every venue API the bot talks to (Gamma REST + CLOB
+REST, CLOB WebSocket, Limitless REST, Kalshi WebSocket) on one synthetic
+universe, with configurable update rates, latency and failures. It prints
+the environment that points main.py at them:
+
+    python -m mocks --markets 30000 --update-rate 0.5 --latency-ms 20 --error-rate 0.01
+    # in another shell, paste the printed exports, then:
+    python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from mocks.faults import FaultProfile
+from mocks.rest import GammaMockServer, LimitlessMockServer
+from mocks.universe import MockUniverse
+from mocks.ws import ClobMockServer, KalshiMockServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT_BASE = 8800       # Gamma, Limitless, CLOB WS and Kalshi WS listen on consecutive ports
+DEFAULT_MAPPING_FILE = os.path.join(".cache", "mock_kalshi_mapping.json")
+DEFAULT_CACHE_FILE = os.path.join(".cache", "mock_market_cache.json")
+
+
+def _environment(gamma, limitless, clob, kalshi, mapping_file, cache_file):
+    """The variables main.py reads to use the mocks instead of the live APIs."""
+    return {
+        "GAMMA_BASE_URL": gamma.url,
+        "CLOB_BASE_URL": gamma.url,
+        "LIMITLESS_BASE_URL": limitless.url,
+        "POLYMARKET_WS_URL": clob.url,
+        "KALSHI_WS_URL": kalshi.url,
+        "ARB_KALSHI_MAPPING_FILE": mapping_file,
+        # A separate market cache, so mock markets never end up in the real one
+        "ARB_MARKET_CACHE_PATH": cache_file,
+    }
+
+
+async def serve(args):
+    universe = MockUniverse(args.markets, depth=args.depth, cross_rate=args.cross_rate,
+                            kalshi_rate=args.kalshi_rate, arb_rate=args.arb_rate, seed=args.seed)
+    faults = FaultProfile(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                          disconnect_rate=args.disconnect_rate, gap_rate=args.gap_rate, seed=args.seed)
+    port = args.port_base
+
+    gamma = GammaMockServer(universe, faults, host=args.host, port=port).start()
+    limitless = LimitlessMockServer(universe, faults, host=args.host, port=port + 1 if port else 0).start()
+    clob = await ClobMockServer(universe, faults, host=args.host, port=port + 2 if port else 0,
+                                update_rate=args.update_rate, snapshot_rate=args.snapshot_rate).start()
+    kalshi = await KalshiMockServer(universe, faults, host=args.host, port=port + 3 if port else 0,
+                                    update_rate=args.update_rate).start()
+
+    os.makedirs(os.path.dirname(args.kalshi_mapping) or ".", exist_ok=True)
+    with open(args.kalshi_mapping, "w") as f:
+        json.dump(universe.kalshi_mapping(), f)
+
+    print(f"Serving {universe.summary()}")
+    for name, value in _environment(gamma, limitless, clob, kalshi, args.kalshi_mapping, args.market_cache).items():
+        print(f"export {name}={value}")
+
+    try:
+        last = time.monotonic()
+        last_counts = (0, 0, 0)
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            now = time.monotonic()
+            counts = (gamma.request_count + limitless.request_count, clob.messages_sent, kalshi.messages_sent)
+            rates = [(c - p) / (now - last) for c, p in zip(counts, last_counts)]
+            logger.info(
+                f"REST {rates[0]:,.0f} req/s ({gamma.error_count + limitless.error_count} injected errors) | "
+                f"CLOB {clob.connections} conn, {rates[1]:,.0f} msg/s | "
+                f"Kalshi {kalshi.connections} conn, {rates[2]:,.0f} msg/s | "
+                f"{clob.disconnects + kalshi.disconnects} injected disconnects"
+            )
+            last, last_counts = now, counts
+    finally:
+        await clob.stop()
+        await kalshi.stop()
+        gamma.stop()
+        limitless.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=5000, help="Polymarket markets in the universe")
+    parser.add_argument("--depth", type=int, default=10, help="Price levels per book side")
+    parser.add_argument("--cross-rate", type=float, default=0.5, help="Fraction of markets listed on Limitless")
+    parser.add_argument("--kalshi-rate", type=float, default=0.2, help="Fraction of markets listed on Kalshi")
+    parser.add_argument("--arb-rate", type=float, default=0.02, help="Fraction of markets quoted as a cross-venue arb")
+    parser.add_argument("--update-rate", type=float, default=0.2,
+                        help="WebSocket messages per subscribed market per second")
+    parser.add_argument("--snapshot-rate", type=float, default=0.05,
+                        help="Fraction of CLOB updates sent as full book snapshots")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response / batch")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra delay on top of --latency-ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of REST requests failing with 429/503")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0,
+                        help="Abrupt disconnects per WebSocket connection per minute")
+    parser.add_argument("--gap-rate", type=float, default=0.0, help="Fraction of Kalshi deltas sent after a sequence gap")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port-base", type=int, default=DEFAULT_PORT_BASE,
+                        help="First of four consecutive ports (0 = any free ports)")
+    parser.add_argument("--kalshi-mapping", default=DEFAULT_MAPPING_FILE,
+                        help="Where to write the Kalshi market mapping for main.py")
+    parser.add_argument("--market-cache", default=DEFAULT_CACHE_FILE, help="Market cache path exported for main.py")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between stats lines")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("websockets").setLevel(logging.WARNING)   # One line per connection otherwise
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,132 @@
+# File: mocks/universe.py
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+TICK = 0.01
+DEFAULT_DEPTH = 10
+MARKETS_PER_EVENT = 4      # Consecutive markets grouped under one Gamma event
+CLOSED_RATE = 0.02         # Fraction of listed markets that are already closed
+ARB_SKEW = 0.06            # Price offset of the second venue on markets quoted as an arb
+
+
+class MockUniverse:
+    """
+    A deterministic synthetic market universe shared by every mock venue.
+
+    Market i is listed on Polymarket (Gamma + CLOB) as slug mock-market-<i>
+    with a YES and a NO token; a fraction of the markets is also listed as a
+    Limitless pair and as a Kalshi ticker. Every listing quotes around one
+    YES "fair" price per market, which random-walks as the mocks publish
+    updates, so the books of a market stay consistent across venues (and a
+    share of them is skewed far enough apart to be an arbitrage).
+    """
+    def __init__(self, n_markets, depth=DEFAULT_DEPTH, cross_rate=0.5, kalshi_rate=0.2, arb_rate=0.02, seed=7):
+        """
+        Args:
+            n_markets: Number of Polymarket markets (open and closed).
+            depth: Price levels per book side.
+            cross_rate: Fraction of markets also listed as a Limitless pair.
+            kalshi_rate: Fraction of markets also listed on Kalshi.
+            arb_rate: Fraction of markets whose other venues are skewed into an arb.
+            seed: RNG seed, so every run serves the same universe.
+        """
+        self.depth = depth
+        self.rng = random.Random(seed)
+        rng = self.rng
+
+        self.markets = []         # Raw Gamma market objects, in id order
+        self.markets_by_id = {}
+        self.events = {}          # { event slug: raw Gamma event }
+        self.fair = {}            # { slug: YES fair price }
+        self.skew = {}            # { slug: price offset of the other venues }
+        self.token_market = {}    # { token_id: (slug, 'yes' | 'no') }
+        self.market_tokens = {}   # { slug: (yes_token_id, no_token_id) }
+        self.pairs = []           # Raw Limitless pair objects
+        self.pair_market = {}     # { pair_id: slug }
+        self.tickers = {}         # { Kalshi ticker: slug }
+
+        updated_base = datetime.now(timezone.utc).replace(microsecond=0)
+        for i in range(n_markets):
+            slug = f"mock-market-{i:06d}"
+            yes_id, no_id = str(10 ** 18 + 2 * i), str(10 ** 18 + 2 * i + 1)
+            event_id = str(900000 + i // MARKETS_PER_EVENT)
+            event_slug = f"mock-event-{i // MARKETS_PER_EVENT:06d}"
+            question = f"Mock market {i}?"
+
+            market = {
+                "id": str(100000 + i),
+                "question": question,
+                "slug": slug,
+                "outcomes": json.dumps(["Yes", "No"]),
+                "clobTokenIds": json.dumps([yes_id, no_id]),
+                "active": True,
+                "closed": rng.random() < CLOSED_RATE,
+                "liquidityNum": round(rng.uniform(100, 500000), 2),
+                "volume24hr": round(rng.uniform(0, 100000), 2),
+                "updatedAt": (updated_base - timedelta(seconds=i)).isoformat().replace("+00:00", "Z"),
+                "events": [{"id": event_id, "slug": event_slug}],
+            }
+            self.markets.append(market)
+            self.markets_by_id[market["id"]] = market
+            event = self.events.setdefault(event_slug, {"id": event_id, "slug": event_slug,
+                                                        "title": f"Mock event {i // MARKETS_PER_EVENT}", "markets": []})
+            event["markets"].append(market)
+
+            self.fair[slug] = round(rng.uniform(0.1, 0.9), 2)
+            self.skew[slug] = ARB_SKEW if rng.random() < arb_rate else 0.0
+            self.token_market[yes_id] = (slug, "yes")
+            self.token_market[no_id] = (slug, "no")
+            self.market_tokens[slug] = (yes_id, no_id)
+
+            if rng.random() < cross_rate:
+                pair_id = str(len(self.pairs) + 1)
+                self.pairs.append({"id": pair_id, "currency_id_1": f"MOCK{i}-YES", "currency_id_2": "USD",
+                                   "name": question})
+                self.pair_market[pair_id] = slug
+            if rng.random() < kalshi_rate:
+                self.tickers[f"KXMOCK-{i:06d}"] = slug
+
+    # ----------------------------------------------------------------------
+    # PRICES
+    # ----------------------------------------------------------------------
+
+    def step(self, slug):
+        """Moves a market's fair price by at most one tick (kept inside [0.03, 0.97])."""
+        fair = self.fair[slug] + self.rng.choice((-TICK, 0.0, TICK))
+        self.fair[slug] = round(min(0.97, max(0.03, fair)), 2)
+
+    def levels(self, mid, descending):
+        """`depth` (price, size) levels walking away from one tick off `mid`."""
+        best = mid - TICK if descending else mid + TICK
+        levels = []
+        for k in range(self.depth):
+            price = round(best - k * TICK if descending else best + k * TICK, 2)
+            if not 0.0 < price < 1.0:
+                break
+            levels.append((price, self.rng.randint(5, 500)))
+        return levels
+
+    def token_mid(self, token_id):
+        slug, outcome = self.token_market[token_id]
+        fair = self.fair[slug]
+        return fair if outcome == "yes" else round(1.0 - fair, 2)
+
+    def venue_mid(self, slug):
+        """YES mid quoted by the second venues (Limitless, Kalshi), including the arb skew."""
+        return round(min(0.97, max(0.03, self.fair[slug] + self.skew[slug])), 2)
+
+    # ----------------------------------------------------------------------
+    # MAPPINGS
+    # ----------------------------------------------------------------------
+
+    def kalshi_mapping(self):
+        """The Kalshi listings as a bot mapping ({slug: {'ticker', 'question'}}, see KALSHI_MARKET_MAPPING)."""
+        questions = {market["slug"]: market["question"] for market in self.markets}
+        return {slug: {"ticker": ticker, "question": f"KALSHI: {questions[slug]}"} for ticker, slug in self.tickers.items()}
+
+    def summary(self):
+        open_markets = sum(1 for market in self.markets if not market["closed"])
+        return (f"{len(self.markets)} markets ({open_markets} open, {len(self.events)} events), "
+                f"{len(self.pairs)} Limitless pairs, {len(self.tickers)} Kalshi tickers")
@@ -0,0 +1,262 @@
+# File: mocks/ws.py
+
+import asyncio
+import json
+import logging
+import time
+
+import websockets # type: ignore
+
+from mocks.faults import FaultProfile
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_TICK = 0.05         # Seconds between two publishing rounds of a connection
+SNAPSHOT_BATCH = 100        # Polymarket book snapshots per initial array frame
+CLOB_WS_PATH = "/ws/market"
+KALSHI_WS_PATH = "/trade-api/ws/v2"
+
+
+class _MockWebSocketServer:
+    """
+    Base for the streaming mocks: serves connections on the running event loop
+    and publishes updates to each one at `update_rate` messages per subscribed
+    market per second, so the total rate scales with the subscribed universe.
+    """
+    def __init__(self, universe, faults=None, host="127.0.0.1", port=0, update_rate=0.2):
+        self.universe = universe
+        self.faults = faults or FaultProfile()
+        self.host = host
+        self.port = port
+        self.update_rate = update_rate
+        self.connections = 0
+        self.messages_sent = 0
+        self.disconnects = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle, self.host, self.port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, websocket):
+        self.connections += 1
+        try:
+            await self.serve_connection(websocket)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections -= 1
+
+    async def serve_connection(self, websocket):
+        raise NotImplementedError
+
+    async def _publish_forever(self, websocket, markets, publish):
+        """
+        Calls publish(n) every PUBLISH_TICK with the number of messages due
+        for `markets()` subscribed markets, and drops the connection when the
+        FaultProfile says so.
+        """
+        budget = 0.0
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(PUBLISH_TICK)
+            now = time.monotonic()
+            elapsed, last = now - last, now
+
+            if self.faults.should_disconnect(elapsed):
+                self.disconnects += 1
+                await websocket.close(1011, "mock disconnect")
+                return
+
+            budget += self.update_rate * markets() * elapsed
+            due = int(budget)
+            if due:
+                budget -= due
+                delay = self.faults.delay()
+                if delay:
+                    await asyncio.sleep(delay)
+                await publish(due)
+
+
+class ClobMockServer(_MockWebSocketServer):
+    """
+    Polymarket CLOB market channel: answers a subscription ({"assets_ids": [...]})
+    with "book" snapshots (as array frames, like the live feed), then streams
+    "price_change" updates, with a full "book" re-snapshot for `snapshot_rate`
+    of the updates. Answers the application-level "PING" with "PONG".
+    """
+    def __init__(self, universe, faults=None, host="127.0.0.1", port=0, update_rate=0.2, snapshot_rate=0.05):
+        super().__init__(universe, faults=faults, host=host, port=port, update_rate=update_rate)
+        self.snapshot_rate = snapshot_rate
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}{CLOB_WS_PATH}"
+
+    async def serve_connection(self, websocket):
+        subscription = json.loads(await websocket.recv())
+        tokens = [token for token in subscription.get("assets_ids", []) if token in self.universe.token_market]
+        slugs = sorted({self.universe.token_market[token][0] for token in tokens})
+
+        delay = self.faults.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        for i in range(0, len(tokens), SNAPSHOT_BATCH):
+            await websocket.send(json.dumps([self._book_message(token) for token in tokens[i:i + SNAPSHOT_BATCH]]))
+            self.messages_sent += 1
+
+        async def publish(count):
+            for _ in range(count):
+                await websocket.send(json.dumps(self._update_message(self.universe.rng.choice(slugs))))
+            self.messages_sent += count
+
+        publisher = asyncio.create_task(self._publish_forever(websocket, lambda: len(slugs), publish)) if slugs else None
+        try:
+            async for message in websocket:
+                if message == "PING":
+                    await websocket.send("PONG")
+        finally:
+            if publisher is not None:
+                publisher.cancel()
+
+    def _book_message(self, token_id):
+        mid = self.universe.token_mid(token_id)
+        return {
+            "event_type": "book",
+            "asset_id": token_id,
+            "market": self.universe.token_market[token_id][0],
+            "bids": [{"price": f"{p:.2f}", "size": f"{s:.2f}"} for p, s in self.universe.levels(mid, True)],
+            "asks": [{"price": f"{p:.2f}", "size": f"{s:.2f}"} for p, s in self.universe.levels(mid, False)],
+            "timestamp": str(int(time.time() * 1000)),
+        }
+
+    def _update_message(self, slug):
+        """A re-snapshot of one of the market's tokens, or a size change at one level near its mid."""
+        universe = self.universe
+        rng = universe.rng
+        token_id = universe.market_tokens[slug][rng.randrange(2)]
+        if rng.random() < self.snapshot_rate:
+            universe.step(slug)
+            return self._book_message(token_id)
+
+        mid = universe.token_mid(token_id)
+        bid = rng.random() < 0.5
+        offset = (rng.randrange(universe.depth) + 1) * 0.01
+        price = round(mid - offset if bid else mid + offset, 2)
+        size = 0 if rng.random() < 0.1 else rng.randint(5, 500)
+        return {
+            "event_type": "price_change",
+            "market": slug,
+            "price_changes": [{"asset_id": token_id, "price": f"{price:.2f}", "size": f"{size:.2f}",
+                               "side": "BUY" if bid else "SELL"}],
+            "timestamp": str(int(time.time() * 1000)),
+        }
+
+
+class KalshiMockServer(_MockWebSocketServer):
+    """
+    Kalshi orderbook_delta channel: acknowledges each subscribe command with
+    its own sid, sends an "orderbook_snapshot" per ticker and then streams
+    "orderbook_delta" messages, numbering every message of a subscription
+    (seq). The FaultProfile's gap_rate skips sequence numbers, which the client
+    must answer with a resubscribe. The server keeps each ticker's book: a
+    snapshot re-seeds it and deltas are applied to it, so a client that has
+    seen every message holds exactly the server's book.
+    """
+    def __init__(self, universe, faults=None, host="127.0.0.1", port=0, update_rate=0.2):
+        super().__init__(universe, faults=faults, host=host, port=port, update_rate=update_rate)
+        self._books = {}       # { ticker: {'yes': {cents: quantity}, 'no': {...}} }
+        self._next_sid = 1
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}{KALSHI_WS_PATH}"
+
+    async def serve_connection(self, websocket):
+        subscriptions = {}     # { sid: {'tickers': [...], 'seq': int} }
+
+        def subscribed_markets():
+            return sum(len(sub["tickers"]) for sub in subscriptions.values())
+
+        async def publish(count):
+            sids = list(subscriptions)
+            if not sids:
+                return
+            for _ in range(count):
+                sid = self.universe.rng.choice(sids)
+                sub = subscriptions.get(sid)
+                if sub is None:
+                    continue
+                ticker = self.universe.rng.choice(sub["tickers"])
+                await self._send(websocket, sub, sid, "orderbook_delta", self._delta(ticker))
+
+        publisher = asyncio.create_task(self._publish_forever(websocket, subscribed_markets, publish))
+        try:
+            async for message in websocket:
+                command = json.loads(message)
+                params = command.get("params", {})
+                if command.get("cmd") == "subscribe":
+                    tickers = [t for t in params.get("market_tickers", []) if t in self.universe.tickers]
+                    sid = self._next_sid
+                    self._next_sid += 1
+                    await websocket.send(json.dumps({"id": command.get("id"), "type": "subscribed",
+                                                     "msg": {"channel": "orderbook_delta", "sid": sid}}))
+                    sub = {"tickers": tickers, "seq": 0}
+                    for ticker in tickers:
+                        await self._send(websocket, sub, sid, "orderbook_snapshot", self._snapshot(ticker))
+                    if tickers:
+                        subscriptions[sid] = sub
+                elif command.get("cmd") == "unsubscribe":
+                    for sid in params.get("sids", []):
+                        subscriptions.pop(sid, None)
+                        await websocket.send(json.dumps({"id": command.get("id"), "type": "unsubscribed", "sid": sid}))
+        finally:
+            publisher.cancel()
+
+    async def _send(self, websocket, sub, sid, msg_type, msg):
+        sub["seq"] += 2 if msg_type == "orderbook_delta" and self.faults.should_gap() else 1
+        await websocket.send(json.dumps({"type": msg_type, "sid": sid, "seq": sub["seq"], "msg": msg}))
+        self.messages_sent += 1
+
+    def _snapshot(self, ticker):
+        slug = self.universe.tickers[ticker]
+        mid = self.universe.venue_mid(slug)
+        book = {
+            "yes": {round(p * 100): s for p, s in self.universe.levels(mid, True)},
+            "no": {round(p * 100): s for p, s in self.universe.levels(round(1.0 - mid, 2), True)},
+        }
+        self._books[ticker] = book
+        return {"market_ticker": ticker,
+                "yes": [[cents, quantity] for cents, quantity in book["yes"].items()],
+                "no": [[cents, quantity] for cents, quantity in book["no"].items()]}
+
+    def _delta(self, ticker):
+        """A quantity change at one bid level; never takes a level below zero."""
+        rng = self.universe.rng
+        book = self._books.get(ticker)
+        if book is None:
+            self._snapshot(ticker)
+            book = self._books[ticker]
+        side = "yes" if rng.random() < 0.5 else "no"
+        levels = book[side]
+        if levels:
+            cents = rng.choice(list(levels))
+            if rng.random() < 0.2:
+                cents = max(1, cents - rng.randint(1, 3))   # A new level behind the quote, never a crossing one
+        else:
+            mid = self.universe.venue_mid(self.universe.tickers[ticker])
+            cents = round((mid if side == "yes" else 1.0 - mid) * 100) - 1
+        quantity = levels.get(cents, 0)
+        delta = rng.randint(-quantity, 300) if quantity else rng.randint(5, 300)
+        if quantity + delta > 0:
+            levels[cents] = quantity + delta
+        else:
+            levels.pop(cents, None)
+        return {"market_ticker": ticker, "price": cents, "delta": delta, "side": side}
@@ -0,0 +1,5 @@
+# monitoring/__init__.py
+from .bot_metrics import BotMetrics
+from .metrics import MetricsRegistry, MetricsServer
+
+__all__ = ['BotMetrics', 'MetricsRegistry', 'MetricsServer']
@@ -0,0 +1,82 @@
+# File: monitoring/bot_metrics.py
+
+from monitoring.metrics import MetricsRegistry
+
+# Latency stages, each measured on monotonic clock readings:
+#   ingest      frame/response received -> book change applied (decode + apply)
+#   scan        book change applied     -> opportunity emitted (wait for the scan + scan)
+#   end_to_end  frame/response received -> opportunity emitted
+STAGES = ("ingest", "scan", "end_to_end")
+# Upper bounds (seconds) of the opportunity lifetime buckets: 100ms .. 1h
+LIFETIME_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+class BotMetrics:
+    """
+    The bot's instruments on one MetricsRegistry: per-stage, per-venue latency
+    histograms and opportunity/scan counters fed by OrderBookManager and
+    ArbitrageBot (their optional `metrics` attribute), plus scrape-time
+    connection stats (message counts, reconnects, ping RTT) of the venue
+    clients registered with watch_clients.
+    """
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.stage_latency = self.registry.histogram(
+            "arb_stage_latency_seconds", "Latency per pipeline stage and triggering venue", ("stage", "venue"))
+        self.scan_seconds = self.registry.histogram(
+            "arb_scan_seconds", "Duration of one arbitrage scan", ("mode",))
+        self.opportunities = self.registry.counter(
+            "arb_opportunities_total", "Opportunities emitted by the scans", ("kind",))
+        self.open_opportunities = self.registry.gauge(
+            "arb_open_opportunities", "Opportunities open right now")
+        self.opportunity_lifetime = self.registry.histogram(
+            "arb_opportunity_lifetime_seconds", "Time from an opportunity's first scan to the scan that no longer found it", ("kind",),
+            buckets=LIFETIME_BUCKETS)
+        self._stage_children = {}
+
+    def observe_stage(self, stage, venue, seconds):
+        key = (stage, venue)
+        child = self._stage_children.get(key)
+        if child is None:
+            child = self._stage_children[key] = self.stage_latency.labels(stage, venue or "unknown")
+        child.observe(seconds)
+
+    def observe_lifetime(self, kind, seconds):
+        self.opportunity_lifetime.labels(kind).observe(seconds)
+
+    def watch_clients(self, polymarket_client=None, limitless_client=None, kalshi_client=None):
+        """Exports the clients' own connection counters on every scrape."""
+        def collect():
+            connected, messages, received_bytes, reconnects, rtt = [], [], [], [], []
+
+            if polymarket_client is not None:
+                for stats in polymarket_client.get_shard_stats():
+                    labels = {"venue": "polymarket", "connection": str(stats["shard"])}
+                    connected.append((labels, int(stats["connected"])))
+                    messages.append((labels, stats["messages"]))
+                    received_bytes.append((labels, stats["bytes"]))
+                    reconnects.append((labels, stats["reconnects"]))
+                    if stats.get("rtt") is not None:
+                        rtt.append((labels, stats["rtt"]))
+
+            if kalshi_client is not None:
+                labels = {"venue": "kalshi", "connection": "0"}
+                connected.append((labels, int(kalshi_client.is_running)))
+                messages.append((labels, kalshi_client.message_count))
+                received_bytes.append((labels, kalshi_client.bytes_received))
+                reconnects.append((labels, kalshi_client.reconnect_count))
+                if kalshi_client.ws is not None:
+                    rtt.append((labels, kalshi_client.ws.latency))
+
+            yield "arb_ws_connected", "gauge", "1 while the WebSocket connection is subscribed", connected
+            yield "arb_ws_messages_total", "counter", "WebSocket frames received", messages
+            yield "arb_ws_received_bytes_total", "counter", "WebSocket payload bytes received", received_bytes
+            yield "arb_ws_reconnects_total", "counter", "WebSocket reconnects", reconnects
+            yield "arb_ws_rtt_seconds", "gauge", "Last ping/pong round trip time", rtt
+
+            if limitless_client is not None:
+                labels = {"venue": "limitless"}
+                yield "arb_rest_requests_total", "counter", "Order book requests sent", [(labels, limitless_client.request_count)]
+                yield "arb_rest_timeouts_total", "counter", "Order book requests that missed their deadline", [(labels, limitless_client.timeout_count)]
+
+        self.registry.add_collector(collect)
@@ -0,0 +1,74 @@
+# File: polymarket/decode.py
+
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# --- JSON BACKENDS ---
+# Tried in this order when no backend is requested; orjson and ujson are
+# optional extras, the standard library json module is always available.
+JSON_BACKENDS = ("orjson", "ujson", "json")
+# Set e.g. ARB_JSON_BACKEND=json to force a backend (useful for benchmarking)
+JSON_BACKEND_ENV = "ARB_JSON_BACKEND"
+
+
+def _import_loads(name):
+    """Returns the loads() function of a JSON backend, or None if it is not installed."""
+    if name == "json":
+        return json.loads
+    try:
+        module = __import__(name)
+    except ImportError:
+        return None
+    return module.loads
+
+
+def set_json_backend(name=None):
+    """
+    Selects the JSON backend used by loads().
+
+    Args:
+        name: 'orjson', 'ujson' or 'json'. None picks the first installed
+            backend (or the one named by $ARB_JSON_BACKEND).
+
+    Returns:
+        The name of the backend now in use.
+    """
+    global loads, backend
+
+    requested = name or os.environ.get(JSON_BACKEND_ENV)
+    candidates = (requested,) if requested else JSON_BACKENDS
+    for candidate in candidates:
+        if candidate not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON backend {candidate!r}, expected one of {JSON_BACKENDS}")
+        fn = _import_loads(candidate)
+        if fn is not None:
+            loads, backend = fn, candidate
+            return backend
+
+    logger.warning(f"JSON backend {requested!r} is not installed, falling back to json")
+    loads, backend = json.loads, "json"
+    return backend
+
+
+def get_json_backend():
+    return backend
+
+
+def levels_to_dict(raw_levels):
+    """
+    Converts raw API levels ([{"price": "0.52", "size": "100"}, ...]) straight
+    into a {price: size} dict of floats, without building (price, size) tuples.
+    Empty levels (size 0) are dropped.
+    """
+    sizes = {float(level["price"]): float(level["size"]) for level in raw_levels}
+    if 0.0 in sizes.values():
+        sizes = {price: size for price, size in sizes.items() if size > 0}
+    return sizes
+
+
+loads = json.loads
+backend = "json"
+set_json_backend()
@@ -1,68 +1,149 @@
-import websocket
-import json
-import threading
-import time
+import asyncio
 import logging
-from threading import Lock
+import os
+import time
+from types import MappingProxyType
+from data.price_levels import PriceLevels
+from polymarket import decode
+from polymarket.ws_shard import PolymarketShard, partition_by_hash, partition_by_size
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# --- CONNECTION SETTINGS ---
+POLYMARKET_WS_URL = os.getenv("POLYMARKET_WS_URL", "wss://ws-subscriptions-clob.polymarket.com/ws/market")
+INITIAL_DATA_FRACTION = 0.8   # wait_for_initial_data returns once 80% of tokens have a book snapshot
+DEFAULT_SHARD_SIZE = 500      # Max tokens subscribed on a single WebSocket connection
+STATS_LOG_INTERVAL = 60       # Seconds between per-shard stats log lines
+
 class PolymarketClient:
-    def __init__(self, token_ids=None):
-        self.ws_url = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+    """
+    Polymarket CLOB market-channel client, native to asyncio.
+
+    The token universe is split across several WebSocket connections
+    (PolymarketShard), each subscribing, keeping alive and reconnecting on its
+    own, so a reconnect only affects one shard. All shards run as tasks on the
+    caller's event loop (the same loop as the arbitrage scan) and feed one
+    shared book store, so book updates and scans never contend on a lock.
+    """
+    def __init__(self, token_ids=None, shard_size=DEFAULT_SHARD_SIZE, shard_count=None, ws_url=None):
+        """
+        Args:
+            token_ids: Market mapping ({slug: {'yes_token_id', 'no_token_id'}}) or a list of token IDs.
+            shard_size: Max tokens per connection (consecutive split). A market's
+                YES and NO tokens always share a shard.
+            shard_count: If given, use exactly this many connections and assign
+                markets to them by consistent hashing instead of shard_size.
+            ws_url: Market channel URL (default POLYMARKET_WS_URL, i.e. $POLYMARKET_WS_URL or the live feed).
+        """
+        self.ws_url = ws_url or POLYMARKET_WS_URL
+        self.shard_size = shard_size
+        self.shard_count = shard_count
         
-        # Handle token IDs
+        # Handle token IDs. Token groups keep a market's YES/NO tokens together for sharding.
         if token_ids is None:
             self.token_ids = []
+            self._token_groups = []
         elif isinstance(token_ids, dict):
-            all_tokens = []
-            for m in token_ids.values():
-                all_tokens.extend([m['yes_token_id'], m['no_token_id']])
-            self.token_ids = all_tokens
-            logger.info(f"Loaded {len(all_tokens)} tokens from {len(token_ids)} markets")
+            self._token_groups = [[m['yes_token_id'], m['no_token_id']] for m in token_ids.values()]
+            self.token_ids = [token for group in self._token_groups for token in group]
+            logger.info(f"Loaded {len(self.token_ids)} tokens from {len(token_ids)} markets")
         else:
-            self.token_ids = token_ids
+            self.token_ids = list(token_ids)
+            self._token_groups = [[token] for token in self.token_ids]
             logger.info(f"Loaded {len(token_ids)} tokens")
         
         self.order_books = {}
-        self.order_books_lock = Lock()
-        self.is_running = False
         self.update_count = 0
-        self.ws = None
-
-    def _on_open(self, ws):
-        logger.info("WebSocket opened. Subscribing to market channel...")
-        self.is_running = True
-        
-        # Subscribe using correct format from docs
-        subscription = {
-            "assets_ids": self.token_ids,  # Note: assets_ids not asset_ids
-            "type": "market"
-        }
+        self.shards = []
+        # Optional callback(asset_id, received_at) invoked after an asset's book
+        # changed; received_at is the monotonic receive time of the frame
+        self.on_book_update = None
+        self.received_at = None
+        # Optional capture.CaptureRecorder receiving every raw frame
+        self.recorder = None
         
-        ws.send(json.dumps(subscription))
-        logger.info(f"Subscribed to {len(self.token_ids)} tokens")
+        self._tasks = []
+        self._initial_data_event = None
+        self._snapshotted = set()   # Assets that received a full 'book' snapshot
+
+    @property
+    def is_running(self):
+        """True while at least one shard is connected and subscribed."""
+        return any(shard.is_running for shard in self.shards)
+
+    @property
+    def reconnect_count(self):
+        return sum(shard.reconnects for shard in self.shards)
+
+    # ----------------------------------------------------------------------
+    # CONNECTION LIFECYCLE (asyncio)
+    # ----------------------------------------------------------------------
+
+    def _build_shards(self):
+        if self.shard_count:
+            partitions = partition_by_hash(self._token_groups, self.shard_count)
+        else:
+            partitions = partition_by_size(self._token_groups, max(2, self.shard_size))
+        return [PolymarketShard(i, self.ws_url, tokens, self._on_message) for i, tokens in enumerate(partitions)]
+
+    def start(self):
+        """Starts one connection task per shard (plus a stats logger) on the running event loop."""
+        if self._tasks:
+            return self._tasks
         
-        # Start ping thread
-        def ping_loop():
-            while self.is_running:
-                try:
-                    ws.send("PING")
-                    time.sleep(10)
-                except:
-                    break
+        self._ensure_initial_data_event()
+        self.shards = self._build_shards()
+        logger.info(f"Starting {len(self.shards)} WebSocket shard(s) for {len(self.token_ids)} tokens")
         
-        ping_thread = threading.Thread(target=ping_loop, daemon=True)
-        ping_thread.start()
+        self._tasks = [asyncio.create_task(shard.run(), name=f"polymarket-ws-{shard.shard_id}") for shard in self.shards]
+        self._tasks.append(asyncio.create_task(self._log_stats_forever(), name="polymarket-ws-stats"))
+        return self._tasks
 
-    def _on_message(self, ws, message):
+    async def stop(self):
+        """Cancels every shard task (and with them their keepalive tasks) and waits for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for shard in self.shards:
+            shard.is_running = False
+
+    def get_shard_stats(self):
+        """Per-shard counters (see PolymarketShard.stats)."""
+        return [shard.stats() for shard in self.shards]
+
+    async def _log_stats_forever(self):
+        # The rate window is this logger's own: { shard: (monotonic time, messages) } at its last line
+        marks = {stats["shard"]: (stats["at"], stats["messages"]) for stats in self.get_shard_stats()}
+        while True:
+            await asyncio.sleep(STATS_LOG_INTERVAL)
+            for stats in self.get_shard_stats():
+                mark_time, mark_messages = marks.get(stats["shard"], (stats["at"], stats["messages"]))
+                elapsed = stats["at"] - mark_time
+                rate = (stats["messages"] - mark_messages) / elapsed if elapsed > 0 else 0.0
+                marks[stats["shard"]] = (stats["at"], stats["messages"])
+                logger.info(
+                    f"[shard {stats['shard']}] {'up' if stats['connected'] else 'DOWN'} | "
+                    f"{stats['tokens']} tokens | {rate:.1f} msg/s | "
+                    f"{stats['messages']} msgs | {stats['reconnects']} reconnects"
+                )
+
+    # ----------------------------------------------------------------------
+    # MESSAGE HANDLING
+    # ----------------------------------------------------------------------
+
+    def _on_message(self, message):
             try:
+                self.received_at = time.monotonic()
+                if self.recorder is not None:
+                    self.recorder.record("polymarket", message)
+                
                 # Handle PONG responses
                 if message == "PONG":
                     return
                 
-                data = json.loads(message)
+                data = decode.loads(message)
                 
                 # --- START FIX: Handle list messages ---
                 # If the message is a list, process each item in the list
@@ -84,12 +165,37 @@ class PolymarketClient:
                     logger.debug("Failed message was too short or non-string.")
 
 
+    def _get_or_create_book(self, asset_id):
+        """Returns the live book for an asset, creating empty sides on first use."""
+        book = self.order_books.get(asset_id)
+        if book is None:
+            book = {"bids": PriceLevels(descending=True), "asks": PriceLevels(descending=False)}
+            self.order_books[asset_id] = book
+        return book
+
+    def _mark_snapshotted(self, asset_id):
+        """Counts an asset towards wait_for_initial_data once its first 'book' snapshot arrived."""
+        if asset_id in self._snapshotted:
+            return
+        self._snapshotted.add(asset_id)
+        if (self._initial_data_event is not None
+                and len(self._snapshotted) >= len(self.token_ids) * INITIAL_DATA_FRACTION):
+            self._initial_data_event.set()
+
+    def _notify_book_update(self, asset_id):
+        """Tells the listener (OrderBookManager) that an asset's book changed."""
+        if self.on_book_update is not None:
+            try:
+                self.on_book_update(asset_id, self.received_at)
+            except Exception as e:
+                logger.error(f"Book update callback failed for {asset_id[:20]}...: {e}")
+
     def _process_single_update(self, data):
         """Helper function to process a single dictionary update message."""
         event_type = data.get("event_type")
         
         if event_type == "book":
-            # Full book update
+            # Full book snapshot: re-seeds both sides of the asset's book
             asset_id = str(data["asset_id"])
             
             # Note: docs say "buys" and "sells" but also show "bids" and "asks"
@@ -97,105 +203,90 @@ class PolymarketClient:
             bids_raw = data.get("bids", data.get("buys", []))
             asks_raw = data.get("asks", data.get("sells", []))
             
-            bids = [(float(b["price"]), float(b["size"])) for b in bids_raw]
-            asks = [(float(a["price"]), float(a["size"])) for a in asks_raw]
+            # Levels go straight from the decoded strings into the book's dicts
+            book = self._get_or_create_book(asset_id)
+            book["bids"].replace_sizes(decode.levels_to_dict(bids_raw))
+            book["asks"].replace_sizes(decode.levels_to_dict(asks_raw))
+            self._mark_snapshotted(asset_id)
+            self.update_count += 1
             
-            with self.order_books_lock:
-                self.order_books[asset_id] = {"bids": bids, "asks": asks}
-                self.update_count += 1
-            
-            logger.info(f"Book update #{self.update_count} for {asset_id[:20]}...: {len(bids)}b {len(asks)}a")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Book update #{self.update_count} for {asset_id[:20]}...: {len(bids_raw)}b {len(asks_raw)}a")
+            self._notify_book_update(asset_id)
         
         elif event_type == "price_change":
-            # Incremental update
-            # Polymarket sometimes wraps price_changes in an event_type block, sometimes not.
-            # Your current code seems to assume the price changes are contained in 'data'.
-            # If the list message contained a 'price_change' event, this is the correct logic.
-            for change in data.get("price_changes", []):
-                asset_id = str(change["asset_id"])
+            # Incremental L2 update: each change carries the new aggregate size
+            # at one price level (size 0 removes the level). Deltas are applied
+            # in place to the book established by the last "book" snapshot.
+            price_changes = data.get("price_changes", [])
+            touched = set()
+            
+            for change in price_changes:
+                price = change.get("price")
+                size = change.get("size")
+                if price is None or size is None:
+                    continue
                 
-                # Update best bid/ask if available
-                if "best_bid" in change and "best_ask" in change:
-                    with self.order_books_lock:
-                        if asset_id not in self.order_books:
-                            # If we don't have the book, create a stub to hold the best price
-                            self.order_books[asset_id] = {"bids": [], "asks": []}
-                        
-                        best_bid = float(change["best_bid"]) if change["best_bid"] != "0" else 0
-                        best_ask = float(change["best_ask"]) if change["best_ask"] != "0" else 0
-                        
-                        # Only keep the best price for Level 1 functionality
-                        self.order_books[asset_id]["bids"] = [(best_bid, 1.0)] if best_bid > 0 else []
-                        self.order_books[asset_id]["asks"] = [(best_ask, 1.0)] if best_ask > 0 else []
+                asset_id = str(change["asset_id"])
+                if asset_id not in self._snapshotted:
+                    # No snapshot to apply it to yet: a few deltas are not a book
+                    continue
+                book = self.order_books[asset_id]
+                side = book["bids"] if change.get("side") in ("BUY", "buy") else book["asks"]
+                side.set(float(price), float(size))
+                touched.add(asset_id)
+            self.update_count += 1
             
-            logger.debug(f"Price change for {len(data.get('price_changes', []))} assets")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Price change for {len(price_changes)} levels")
+            for asset_id in touched:
+                self._notify_book_update(asset_id)
         
         elif event_type == "last_trade_price":
             # Just log trade events
-            logger.debug(f"Trade: {data.get('asset_id', 'unknown')[:20]}... @ {data.get('price')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Trade: {data.get('asset_id', 'unknown')[:20]}... @ {data.get('price')}")
         
-        else:
+        elif logger.isEnabledFor(logging.DEBUG):
             logger.debug(f"Unknown event type: {event_type}")
-    def _on_error(self, ws, error):
-        logger.error(f"WebSocket error: {error}")
-        self.is_running = False
-
-    def _on_close(self, ws, code, msg):
-        logger.warning(f"WebSocket closed: code={code}, msg={msg}")
-        self.is_running = False
-
-    def run(self):
-        def run_forever():
-            while True:
-                if not self.is_running:
-                    logger.info("Connecting to WebSocket...")
-                    self.ws = websocket.WebSocketApp(
-                        self.ws_url,
-                        on_open=self._on_open,
-                        on_message=self._on_message,
-                        on_error=self._on_error,
-                        on_close=self._on_close,
-                    )
-                    try:
-                        self.ws.run_forever(ping_interval=30, ping_timeout=10)
-                    except Exception as e:
-                        logger.error(f"WebSocket failed: {e}")
-                    
-                    logger.info("Reconnecting in 5 seconds...")
-                    time.sleep(5)
-                else:
-                    time.sleep(1)
-        
-        thread = threading.Thread(target=run_forever, daemon=True)
-        thread.start()
-        
-        # Wait for connection
-        timeout = 10
-        start = time.time()
-        while not self.is_running and time.time() - start < timeout:
-            time.sleep(0.1)
-        
-        if not self.is_running:
-            logger.warning("WebSocket did not connect within timeout")
+
+    # ----------------------------------------------------------------------
+    # READ ACCESS
+    # ----------------------------------------------------------------------
 
     def get_order_books(self):
-        with self.order_books_lock:
-            return self.order_books.copy()
-
-    def wait_for_initial_data(self, timeout=60):
-        start = time.time()
-        while time.time() - start < timeout:
-            with self.order_books_lock:
-                if len(self.order_books) >= len(self.token_ids) * 0.8:  # 80% received
-                    logger.info(f"Initial data received for {len(self.order_books)}/{len(self.token_ids)} tokens")
-                    return True
-            time.sleep(0.1)
-        
-        with self.order_books_lock:
-            received = len(self.order_books)
+        """Returns a read-only view of the live books ({asset_id: {'bids', 'asks'}}); nothing is copied."""
+        return MappingProxyType(self.order_books)
+
+    def get_book(self, asset_id):
+        """Returns the live book for one asset ({'bids': PriceLevels, 'asks': PriceLevels}) or None."""
+        return self.order_books.get(asset_id)
+
+    def has_snapshot(self, asset_id):
+        """True once the asset's book was seeded by a full 'book' snapshot."""
+        return asset_id in self._snapshotted
+
+    def _ensure_initial_data_event(self):
+        if self._initial_data_event is None:
+            self._initial_data_event = asyncio.Event()
+            if len(self._snapshotted) >= len(self.token_ids) * INITIAL_DATA_FRACTION:
+                self._initial_data_event.set()
+        return self._initial_data_event
+
+    async def wait_for_initial_data(self, timeout=60):
+        """Waits (without polling) until books have arrived for 80% of the subscribed tokens."""
+        event = self._ensure_initial_data_event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            logger.info(f"Initial data received for {len(self._snapshotted)}/{len(self.token_ids)} tokens")
+            return True
+        except asyncio.TimeoutError:
+            pass
         
+        received = len(self._snapshotted)
         logger.error(f"Timeout: received {received}/{len(self.token_ids)} orderbooks")
         return received > 0  # Return True if we got at least some data
+
     def place_order(self, token_id: str, outcome: str, amount: float, price: float):
         """
         Simulates placing a market order on Polymarket.
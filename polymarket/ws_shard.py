@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import time
+import zlib
+from bisect import bisect_right
+import websockets # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# --- CONNECTION SETTINGS ---
+APP_PING_INTERVAL = 10        # Polymarket expects a text "PING" every ~10s
+RECONNECT_DELAY = 1.0         # First reconnect delay in seconds...
+MAX_RECONNECT_DELAY = 30.0    # ...doubled after each failure up to this cap
+VIRTUAL_NODES = 64            # Points per shard on the consistent-hash ring
+
+
+class PolymarketShard:
+    """
+    One WebSocket connection subscribed to a slice of the token universe.
+
+    Each shard connects, subscribes, keeps itself alive and reconnects on its
+    own, so a dropped connection only interrupts the tokens it carries. Frames
+    are handed to a shared handler (PolymarketClient._on_message), which owns
+    the book store.
+    """
+    def __init__(self, shard_id, ws_url, token_ids, on_message):
+        self.shard_id = shard_id
+        self.ws_url = ws_url
+        self.token_ids = list(token_ids)
+        self.on_message = on_message
+
+        self.is_running = False     # True while subscribed
+        self.ws = None
+        self.messages = 0
+        self.bytes_received = 0
+        self.reconnects = 0
+        self.connected_at = None
+        self.last_rtt = None        # Seconds between our last "PING" and Polymarket's "PONG"
+        self._ping_sent = None
+
+    # ----------------------------------------------------------------------
+    # CONNECTION LIFECYCLE
+    # ----------------------------------------------------------------------
+
+    async def run(self):
+        """Connects, subscribes and processes messages forever, reconnecting with backoff."""
+        delay = RECONNECT_DELAY
+
+        while True:
+            logger.info(f"[shard {self.shard_id}] Connecting to WebSocket...")
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=30, ping_timeout=10, max_size=None) as ws:
+                    self.ws = ws
+                    await self._subscribe(ws)
+                    delay = RECONNECT_DELAY
+
+                    keepalive_task = asyncio.create_task(self._keepalive(ws), name=f"polymarket-ws-{self.shard_id}-keepalive")
+                    try:
+                        async for message in ws:
+                            self.messages += 1
+                            self.bytes_received += len(message)
+                            if message == "PONG" and self._ping_sent is not None:
+                                self.last_rtt = time.monotonic() - self._ping_sent
+                                self._ping_sent = None
+                            self.on_message(message)
+                    finally:
+                        keepalive_task.cancel()
+
+                logger.warning(f"[shard {self.shard_id}] WebSocket closed: code={ws.close_code}, msg={ws.close_reason}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[shard {self.shard_id}] WebSocket error: {e}")
+            finally:
+                self.is_running = False
+                self.ws = None
+
+            self.reconnects += 1
+            logger.info(f"[shard {self.shard_id}] Reconnecting in {delay:.0f} seconds...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _subscribe(self, ws):
+        # Subscribe using correct format from docs
+        subscription = {
+            "assets_ids": self.token_ids,  # Note: assets_ids not asset_ids
+            "type": "market"
+        }
+
+        await ws.send(json.dumps(subscription))
+        self.is_running = True
+        self.connected_at = time.monotonic()
+        logger.info(f"[shard {self.shard_id}] Subscribed to {len(self.token_ids)} tokens")
+
+    async def _keepalive(self, ws):
+        """Sends the application-level PING Polymarket expects. Lives exactly as long as one connection."""
+        try:
+            while True:
+                await asyncio.sleep(APP_PING_INTERVAL)
+                self._ping_sent = time.monotonic()
+                await ws.send("PING")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"[shard {self.shard_id}] Keepalive stopped: {e}")
+
+    # ----------------------------------------------------------------------
+    # STATS
+    # ----------------------------------------------------------------------
+
+    def stats(self):
+        """
+        Returns this shard's running counters, read without side effects so
+        any thread (e.g. a metrics scrape) can call it. Rates are derived by
+        the reader from two readings and their monotonic "at" times.
+        """
+        return {
+            "shard": self.shard_id,
+            "tokens": len(self.token_ids),
+            "connected": self.is_running,
+            "messages": self.messages,
+            "bytes": self.bytes_received,
+            "reconnects": self.reconnects,
+            "rtt": self.last_rtt,
+            "at": time.monotonic(),
+        }
+
+
+# ----------------------------------------------------------------------
+# PARTITIONING
+# ----------------------------------------------------------------------
+
+def partition_by_size(token_groups, shard_size):
+    """
+    Splits token groups into consecutive shards of at most `shard_size` tokens.
+    A group (e.g. a market's YES and NO token) is never split across shards.
+    """
+    shards = [[]]
+    for group in token_groups:
+        if shards[-1] and len(shards[-1]) + len(group) > shard_size:
+            shards.append([])
+        shards[-1].extend(group)
+    return [shard for shard in shards if shard]
+
+
+def _hash(key):
+    return zlib.crc32(str(key).encode("utf-8"))
+
+
+def partition_by_hash(token_groups, shard_count, virtual_nodes=VIRTUAL_NODES):
+    """
+    Assigns token groups to `shard_count` shards with a consistent-hash ring,
+    keyed by each group's first token. Changing the shard count only moves the
+    groups whose ring segment changed owner.
+    """
+    ring = sorted((_hash(f"shard-{s}-{v}"), s) for s in range(shard_count) for v in range(virtual_nodes))
+    points = [point for point, _ in ring]
+    shards = [[] for _ in range(shard_count)]
+
+    for group in token_groups:
+        idx = bisect_right(points, _hash(group[0])) % len(ring)
+        shards[ring[idx][1]].extend(group)
+    return [shard for shard in shards if shard]